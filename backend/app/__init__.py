@@ -1,9 +1,18 @@
+import logging
 import os
+import time
 from flask import Flask, jsonify
-from app.common.logger import setup_logging
+from app.common.logger import restart_logging_after_fork, setup_logging
 from app.common.logging_middleware import configure_request_logging
+from app.common.cache import response_cache
+from app.common.group_commit import group_commit
+from app.common.metrics import configure_metrics
+from app.common.profiling import configure_profiling
+from app.common.replicas import RoutingSession, configure_replicas, replica_binds
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, text
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import DeclarativeBase
 
 
@@ -11,10 +20,26 @@ class Base(DeclarativeBase):
     pass
 
 
-db = SQLAlchemy(model_class=Base)
+# Shared with the async app (app.asgi)
+CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000"]
+CORS_METHODS = ["GET", "POST", "PUT", "DELETE", "OPTIONS"]
+CORS_ALLOW_HEADERS = ["Content-Type", "Authorization"]
+CORS_EXPOSE_HEADERS = ["Content-Type", "ETag", "X-Next-Cursor", "X-Total-Estimate", "X-Profile-Url"]
+
+db = SQLAlchemy(model_class=Base, session_options={"class_": RoutingSession})
+
+logger = logging.getLogger(__name__)
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores FOREIGN KEY constraints unless asked; conflict-driven creates rely on them
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
 
 
 def create_app(config_object="config.DevConfig"):
+    boot_started = time.perf_counter()
     app = Flask(__name__)
     app.config.from_object(config_object)
     
@@ -26,30 +51,91 @@ def create_app(config_object="config.DevConfig"):
     CORS(
         app,
         resources={r"/api/*": {
-            "origins": ["http://localhost:3000", "http://127.0.0.1:3000"],
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "expose_headers": ["Content-Type"],
+            "origins": CORS_ORIGINS,
+            "methods": CORS_METHODS,
+            "allow_headers": CORS_ALLOW_HEADERS,
+            "expose_headers": CORS_EXPOSE_HEADERS,
             "supports_credentials": True
         }}
     )
 
+    replica_binds(app)
     db.init_app(app)
+    response_cache.init_app(app)
+    group_commit.init_app(app)
 
     with app.app_context():
+        # Primary first, then any read replicas
+        engines = [db.engine, *(engine for key, engine in db.engines.items() if key is not None)]
+        for engine in engines:
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+
+        configure_replicas(app, db)
+        if app.config.get("SNAPSHOT_PATH"):
+            from app.common.snapshot import configure_snapshot
+
+            configure_snapshot(app)
+        if app.config.get("METRICS_ENABLED", True):
+            configure_metrics(app, engines)
+        configure_profiling(app, engines)
+
         # Import and Register Blueprints
         from app.modules.papers.routes import papers_bp
         from app.modules.authors.routes import authors_bp
+        from app.modules.changes.routes import changes_bp
 
         app.register_blueprint(papers_bp, url_prefix="/api/papers")
         app.register_blueprint(authors_bp, url_prefix="/api/authors")
+        app.register_blueprint(changes_bp, url_prefix="/api/changes")
 
         # Register global error handler
         from app.common.error_handler import register_error_handlers
 
         register_error_handlers(app)
 
-        # Create Tables (for dev/simplicity, usually migration tool handles this)
-        db.create_all()
+        # The schema is owned by migrations (scripts/migrate.py); booting a
+        # worker touches the database only when it serves a request
+        if app.config.get("SCHEMA_AUTO_CREATE", False) and not app.config.get("SNAPSHOT_PATH"):
+            if db.engine.dialect.name == "postgresql":
+                # paper_embeddings uses the pgvector column type
+                db.session.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+                db.session.commit()
+            db.create_all()
 
+    logger.info("App booted", extra={"boot_ms": round((time.perf_counter() - boot_started) * 1000, 1)})
     return app
+
+
+def init_worker(app):
+    """
+    Run in each worker process forked from a master that already created the
+    app (gunicorn's preload_app). Connections opened by the master must not be
+    shared, so every engine gets a fresh pool; the parent's connections are
+    left alone rather than closed under it.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    restart_logging_after_fork()
+
+
+def warm_worker(app):
+    """
+    Run in each worker before it accepts requests (gunicorn's post_worker_init):
+    builds the DOI filter from the table, or loads it from DOI_FILTER_PATH, so
+    the worker's first ingest request does not wait on it. If the database is
+    unavailable, the filter is built on first use instead.
+    """
+    from app.modules.papers.routes import service
+
+    with app.app_context():
+        try:
+            doi_filter = service.doi_filter
+            if doi_filter is not None:
+                doi_filter.refresh(force=True)
+        except SQLAlchemyError as e:
+            logger.warning("Could not build the DOI filter at worker start", extra={"error": str(e)})
+        finally:
+            db.session.remove()
+
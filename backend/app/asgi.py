@@ -0,0 +1,91 @@
+"""
+Async serving mode.
+
+The authors and papers APIs on async handlers (Quart) over an async engine,
+so a request waiting on the database holds no thread and one process serves
+thousands of slow clients. It covers creation, lookups and list pages; search,
+batch ingest, exports, DOI existence checks, the change feed, metrics and
+profiling are served by the WSGI app, which can run next to it against the same database and cache.
+
+    hypercorn asgi:app --workers 4 --bind 0.0.0.0:5000
+"""
+
+import logging
+
+from quart import Quart, g, jsonify, request
+from quart_cors import cors
+from sqlalchemy import text
+
+from app import CORS_ALLOW_HEADERS, CORS_EXPOSE_HEADERS, CORS_METHODS, CORS_ORIGINS, db
+from app.common.async_db import async_session, create_async_db_engine
+from app.common.cache import response_cache
+from app.common.error_handler import AppError
+from app.common.logger import setup_logging
+from app.common.logging_middleware import configure_request_logging
+
+logger = logging.getLogger(__name__)
+
+
+def register_error_handlers(app):
+    @app.errorhandler(AppError)
+    async def handle_app_error(error):
+        logger.warning(f"AppError: {error.message}", extra={"status_code": error.status_code, "payload": error.payload})
+        return jsonify(error.to_dict()), error.status_code
+
+    @app.errorhandler(404)
+    async def handle_not_found(error):
+        logger.warning(f"Resource not found: {error}", extra={"status_code": 404})
+        return jsonify({"message": "Resource not found", "status_code": 404}), 404
+
+    @app.errorhandler(500)
+    async def handle_server_error(error):
+        logger.exception(f"Internal Server Error: {error}", extra={"status_code": 500})
+        return jsonify({"message": "Internal Server Error", "status_code": 500}), 500
+
+
+def create_asgi_app(config_object="config.DevConfig"):
+    app = Quart(__name__)
+    app.config.from_object(config_object)
+
+    setup_logging(app)
+    configure_request_logging(app, request=request, g=g)
+    app = cors(
+        app,
+        allow_origin=CORS_ORIGINS,
+        allow_methods=CORS_METHODS,
+        allow_headers=CORS_ALLOW_HEADERS,
+        expose_headers=CORS_EXPOSE_HEADERS,
+        allow_credentials=True,
+    )
+    # Writes here invalidate the same cache generations as the WSGI app's
+    response_cache.init_app(app)
+    engine = create_async_db_engine(app.config)
+
+    @app.before_serving
+    async def create_tables():
+        # As in create_app: the schema is owned by migrations outside development
+        if not app.config.get("SCHEMA_AUTO_CREATE", False):
+            return
+        async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # paper_embeddings uses the pgvector column type
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            await conn.run_sync(db.metadata.create_all)
+
+    @app.teardown_appcontext
+    async def remove_session(exception):
+        # Returns the request's connection to the pool
+        await async_session.remove()
+
+    @app.after_serving
+    async def dispose_engine():
+        await engine.dispose()
+
+    from app.modules.papers.async_routes import papers_bp
+    from app.modules.authors.async_routes import authors_bp
+
+    app.register_blueprint(papers_bp, url_prefix="/api/papers")
+    app.register_blueprint(authors_bp, url_prefix="/api/authors")
+    register_error_handlers(app)
+
+    return app
@@ -0,0 +1,141 @@
+from typing import Dict, Generic, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+from sqlalchemy import Row, func, insert, select, text
+from sqlalchemy.exc import IntegrityError
+from app.common.async_db import async_session
+from app.common.base_repository import chunked, conflict_insert, get_or_create_statements
+from app.common.cache import response_cache
+
+T = TypeVar("T")
+
+
+class AsyncBaseRepository(Generic[T]):
+    """
+    `BaseRepository` for the async app: the same queries, awaited on the
+    task-scoped `AsyncSession`. Nothing is lazy-loaded, so relationships a
+    caller needs must be requested with loader `options`.
+    """
+
+    def __init__(self, model: Type[T]):
+        self.model = model
+        self.session = async_session
+
+    def _invalidate(self, inserted: bool = False) -> None:
+        # Called after the commit; see app.common.cache for the semantics
+        response_cache.invalidate(self.model.__tablename__, inserted=inserted)
+
+    def _dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    async def get_by_id(self, id: int, options: Iterable = ()) -> Optional[T]:
+        return await self.session.get(self.model, id, options=list(options))
+
+    async def get_by_ids(self, ids: Iterable[int], options: Iterable = ()) -> Dict[int, T]:
+        options = list(options)
+        found: Dict[int, T] = {}
+        for chunk in chunked(list(set(ids))):
+            for instance in await self.session.scalars(
+                select(self.model).where(self.model.id.in_(chunk)).options(*options)
+            ):
+                found[instance.id] = instance
+        return found
+
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[T]:
+        result = await self.session.scalars(
+            select(self.model).order_by(self.model.id.desc()).limit(limit).offset(offset)
+        )
+        return list(result)
+
+    async def get_page(
+        self, limit: int = 100, after: Optional[int] = None, options: Iterable = ()
+    ) -> Tuple[List[T], Optional[int]]:
+        stmt = select(self.model).options(*options)
+        if after is not None:
+            stmt = stmt.where(self.model.id < after)
+        rows = list(await self.session.scalars(stmt.order_by(self.model.id.desc()).limit(limit + 1)))
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
+
+    async def get_page_rows(
+        self, columns: List, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Row], Optional[int]]:
+        stmt = select(*columns)
+        if after is not None:
+            stmt = stmt.where(self.model.id < after)
+        rows = (await self.session.execute(stmt.order_by(self.model.id.desc()).limit(limit + 1))).all()
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
+
+    async def estimate_count(self) -> int:
+        if self._dialect() == "postgresql":
+            estimate = await self.session.scalar(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": self.model.__tablename__},
+            )
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return await self.session.scalar(select(func.max(self.model.id))) or 0
+
+    async def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        found: Set[int] = set()
+        for chunk in chunked(list(set(ids))):
+            found.update(await self.session.scalars(select(self.model.id).where(self.model.id.in_(chunk))))
+        return found
+
+    async def bulk_create(self, rows: List[dict], skip_conflicts_on: Optional[str] = None) -> List[Row]:
+        if not rows:
+            return []
+        table = self.model.__table__
+        if skip_conflicts_on:
+            stmt = (
+                conflict_insert(table, self._dialect())
+                .on_conflict_do_nothing(index_elements=[table.c[skip_conflicts_on]])
+                .returning(*table.c)
+            )
+        else:
+            stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+        try:
+            created = (await self.session.execute(stmt, rows)).all()
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        if created:
+            self._invalidate(inserted=True)
+        return created
+
+    async def get_or_create(self, conflict_column: str, **values) -> Tuple[Row, bool]:
+        stmt, existing = get_or_create_statements(self.model.__table__, self._dialect(), conflict_column, values)
+        try:
+            row = (await self.session.execute(stmt)).first()
+            if row is None:
+                # Skipped because of a row committed after this statement's snapshot
+                row = (await self.session.execute(existing)).first()
+            await self.session.commit()
+        except IntegrityError:
+            await self.session.rollback()
+            raise
+        if row.created:
+            self._invalidate(inserted=True)
+        return row, bool(row.created)
+
+    async def create(self, **kwargs) -> T:
+        instance = self.model(**kwargs)
+        self.session.add(instance)
+        # The session does not expire on commit: the flush's RETURNING already filled the instance
+        await self.session.commit()
+        self._invalidate(inserted=True)
+        return instance
+
+    async def update(self, instance: T, **kwargs) -> T:
+        for key, value in kwargs.items():
+            setattr(instance, key, value)
+        await self.session.commit()
+        self._invalidate()
+        return instance
+
+    async def delete(self, instance: T) -> None:
+        await self.session.delete(instance)
+        await self.session.commit()
+        self._invalidate()
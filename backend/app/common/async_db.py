@@ -0,0 +1,49 @@
+"""
+Async database access for the ASGI app (app.asgi).
+
+`async_session` is scoped to the running asyncio task, which is one request
+under the ASGI server; the app closes it when the request ends. The engine
+talks to the configured database through its async driver: asyncpg for
+Postgres, aiosqlite for SQLite. Sessions keep their objects loaded after
+commit, since an async session cannot lazily reload expired attributes.
+"""
+
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_scoped_session, async_sessionmaker, create_async_engine
+
+from app import _enable_sqlite_foreign_keys
+
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+async_session = async_scoped_session(
+    async_sessionmaker(expire_on_commit=False), scopefunc=asyncio.current_task
+)
+
+
+def async_database_url(url: str):
+    url = make_url(url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=driver)
+
+
+def create_async_db_engine(config) -> AsyncEngine:
+    """
+    Builds the engine from the same settings as the sync app. The psycopg2
+    connect arguments are replaced by their asyncpg equivalent.
+    """
+    url = async_database_url(config["SQLALCHEMY_DATABASE_URI"])
+    options = {k: v for k, v in (config.get("SQLALCHEMY_ENGINE_OPTIONS") or {}).items() if k != "connect_args"}
+    statement_timeout = config.get("DB_STATEMENT_TIMEOUT_MS")
+    if statement_timeout and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout)}}
+
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == "sqlite":
+        event.listen(engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    async_session.session_factory.configure(bind=engine)
+    return engine
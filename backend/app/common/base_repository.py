@@ -1,35 +1,439 @@
-from typing import TypeVar, Generic, Optional, List, Type
-from sqlalchemy.orm import Session
+import csv
+import io
+from contextlib import contextmanager
+from typing import TypeVar, Generic, Dict, Iterable, Iterator, Optional, List, Set, Tuple, Type, Union
+from sqlalchemy import Row, func, insert, inspect, literal, select, text, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, scoped_session
+from sqlalchemy.orm.util import identity_key
 from app import db
+from app.common.cache import response_cache
+from app.common.group_commit import group_commit
+from app.common.replicas import mark_written, replica_read
 
 T = TypeVar("T")
 
+# Dialect-specific INSERT constructs that support ON CONFLICT.
+CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Keeps IN (...) lists under SQLite's bound-parameter limit and Postgres plan sizes sane.
+IN_CHUNK_SIZE = 1000
+
+# session.info key of the open `unit_of_work`: the invalidations it owes at commit
+UNIT_OF_WORK = "unit_of_work"
+
+
+def chunked(values: List, size: int = IN_CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def conflict_insert(table, dialect: str):
+    if dialect not in CONFLICT_INSERTS:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+    return CONFLICT_INSERTS[dialect](table)
+
+
+def get_or_create_statements(table, dialect: str, conflict_column: str, values: dict):
+    """
+    The conflict-driven insert behind `get_or_create`, returning the row plus a
+    `created` flag, and the plain lookup to fall back on when it returns nothing.
+    """
+    key = table.c[conflict_column]
+    existing = select(*table.c, literal(False).label("created")).where(key == values[conflict_column])
+    insert_stmt = conflict_insert(table, dialect).values(**values).on_conflict_do_nothing(index_elements=[key])
+
+    if dialect == "postgresql":
+        # Single round trip for both outcomes: the CTE inserts, the second
+        # branch only runs when the insert was skipped.
+        inserted = insert_stmt.returning(*table.c).cte("inserted")
+        stmt = union_all(
+            select(*inserted.c, literal(True).label("created")),
+            existing.where(~select(inserted.c[conflict_column]).exists()),
+        )
+    else:
+        stmt = insert_stmt.returning(*table.c, literal(True).label("created"))
+    return stmt, existing
+
+
+def commit_without_expiring(session) -> None:
+    """
+    Commits without expiring the session's instances: they keep the state they
+    were flushed with (generated keys come back through INSERT ... RETURNING),
+    instead of costing a SELECT each on their next access.
+    """
+    if isinstance(session, scoped_session):
+        session = session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
+
+
+@contextmanager
+def unit_of_work(session=None):
+    """
+    Makes the repositories' `create`, `update` and `delete` calls on `session`
+    (db.session by default) one transaction: inside the block they only flush,
+    and the block commits once at the end, then invalidates the cache for every
+    table written. An exception rolls all of it back. Nested blocks join the
+    outermost one.
+    """
+    session = session if session is not None else db.session
+    if UNIT_OF_WORK in session.info:
+        yield session
+        return
+    written: Dict[str, bool] = {}
+    session.info[UNIT_OF_WORK] = written
+    try:
+        yield session
+        commit_without_expiring(session)
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop(UNIT_OF_WORK, None)
+    for table, inserted in written.items():
+        response_cache.invalidate(table, inserted=inserted)
+    if written:
+        mark_written(session)
+
 
 class BaseRepository(Generic[T]):
     def __init__(self, model: Type[T]):
         self.model = model
         self.session: Session = db.session
 
-    def get_by_id(self, id: int) -> Optional[T]:
-        return self.session.get(self.model, id)
+    def _invalidate(self, inserted: bool = False) -> None:
+        # Called after the commit; see app.common.cache for the semantics.
+        # Later reads of this session must see the write, so they stop using replicas.
+        response_cache.invalidate(self.model.__tablename__, inserted=inserted)
+        mark_written(self.session)
+
+    def _commit(self, inserted: bool = False) -> None:
+        """
+        Commits and invalidates, or, inside a `unit_of_work`, flushes and leaves
+        both to the end of the unit.
+        """
+        written = self.session.info.get(UNIT_OF_WORK)
+        if written is None:
+            commit_without_expiring(self.session)
+            self._invalidate(inserted=inserted)
+            return
+        self.session.flush()
+        table = self.model.__tablename__
+        written[table] = written.get(table, True) and inserted
+
+    @replica_read
+    def get_by_id(self, id: int, options: Iterable = ()) -> Optional[T]:
+        """
+        `options` are loader options (e.g. `selectinload`) for this lookup only.
+        """
+        return self.session.get(self.model, id, options=list(options))
 
+    @replica_read
+    def get_by_ids(self, ids: Iterable[int], options: Iterable = ()) -> Dict[int, T]:
+        """
+        Loads many rows by primary key, keyed by id, with one IN query per chunk.
+        As with `session.get`, rows this session already holds (unexpired) come
+        from its identity map; with loader `options` everything is queried, so
+        the options apply to every row.
+        """
+        options = list(options)
+        found: Dict[int, T] = {}
+        wanted = []
+        for id in set(ids):
+            instance = None if options else self._loaded(id)
+            if instance is None:
+                wanted.append(id)
+            else:
+                found[id] = instance
+        for chunk in chunked(wanted):
+            for instance in self.session.scalars(
+                select(self.model).where(self.model.id.in_(chunk)).options(*options)
+            ):
+                found[instance.id] = instance
+        return found
+
+    def _loaded(self, id: int) -> Optional[T]:
+        instance = self.session.identity_map.get(identity_key(self.model, id))
+        if instance is None or inspect(instance).expired_attributes:
+            return None
+        return instance
+
+    @replica_read
     def get_all(self, limit: int = 100, offset: int = 0) -> List[T]:
         return self.session.query(self.model).order_by(self.model.id.desc()).limit(limit).offset(offset).all()
 
+    @replica_read
+    def get_page(
+        self, limit: int = 100, after: Optional[int] = None, options: Iterable = ()
+    ) -> Tuple[List[T], Optional[int]]:
+        """
+        Keyset page ordered by id DESC, starting strictly below `after`.
+        Walks the primary key index, so the cost is the same at any depth.
+        Returns the rows and the id to resume from (None on the last page).
+        """
+        query = self.session.query(self.model).options(*options)
+        if after is not None:
+            query = query.filter(self.model.id < after)
+        rows = query.order_by(self.model.id.desc()).limit(limit + 1).all()
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
+
+    @replica_read
+    def get_page_rows(
+        self, columns: List, limit: int = 100, after: Optional[int] = None
+    ) -> Tuple[List[Row], Optional[int]]:
+        """
+        `get_page` returning plain rows of just `columns` (which must include id),
+        for responses that never need ORM instances.
+        """
+        stmt = select(*columns)
+        if after is not None:
+            stmt = stmt.where(self.model.id < after)
+        rows = self.session.execute(stmt.order_by(self.model.id.desc()).limit(limit + 1)).all()
+        if len(rows) > limit:
+            return rows[:limit], rows[limit - 1].id
+        return rows, None
+
+    @replica_read
+    def stream_rows(self, columns: List, batch_size: int = 5000) -> Iterator[List[Row]]:
+        """
+        Yields every row of `columns` in id order, in batches of `batch_size`,
+        from a server-side cursor so the table is never held in memory at once.
+        """
+        result = self.session.execute(
+            select(*columns)
+            .order_by(self.model.id)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for rows in result.partitions():
+            yield rows
+
+    @replica_read
+    def estimate_count(self) -> int:
+        """
+        Cheap row count estimate: planner statistics on Postgres, max(id) elsewhere
+        (or when the table has never been analyzed). Never runs COUNT(*).
+        """
+        if self.session.get_bind().dialect.name == "postgresql":
+            estimate = self.session.execute(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"),
+                {"table": self.model.__tablename__},
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        return self.session.query(func.max(self.model.id)).scalar() or 0
+
+    def existing_ids(self, ids: Iterable[int]) -> Set[int]:
+        """
+        Returns the subset of `ids` that exist, with one IN query per chunk.
+        """
+        unique_ids = list(set(ids))
+        found: Set[int] = set()
+        for chunk in chunked(unique_ids):
+            found.update(self.session.scalars(select(self.model.id).where(self.model.id.in_(chunk))))
+        return found
+
+    def _conflict_insert(self):
+        return conflict_insert(self.model.__table__, self.session.get_bind().dialect.name)
+
+    def bulk_create(self, rows: List[dict], skip_conflicts_on: Optional[str] = None) -> List[Row]:
+        """
+        Inserts all rows with multi-row INSERT ... RETURNING and a single commit.
+        Returns plain rows (not ORM instances, which the commit would expire and
+        reload one by one), in the same order as `rows`.
+
+        With `skip_conflicts_on`, rows whose unique column already exists are
+        skipped (ON CONFLICT DO NOTHING) and left out of the result, which is then
+        unordered; callers match rows back by that column.
+        """
+        if not rows:
+            return []
+        table = self.model.__table__
+        if skip_conflicts_on:
+            stmt = (
+                self._conflict_insert()
+                .on_conflict_do_nothing(index_elements=[table.c[skip_conflicts_on]])
+                .returning(*table.c)
+            )
+        else:
+            stmt = insert(table).returning(*table.c, sort_by_parameter_order=True)
+        try:
+            created = self.session.execute(stmt, rows).all()
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            raise
+        if created:
+            self._invalidate(inserted=True)
+        return created
+
+    def bulk_upsert(self, rows: List[dict], conflict_column: str) -> None:
+        """
+        Inserts rows, overwriting the other columns of rows whose unique column
+        already exists (ON CONFLICT DO UPDATE), in one executemany and one commit.
+        """
+        if not rows:
+            return
+        stmt = self._conflict_insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={column: stmt.excluded[column] for column in rows[0] if column != conflict_column},
+        )
+        self.session.execute(stmt, rows)
+        self.session.commit()
+        self._invalidate()
+
+    def bulk_load(self, rows: List[dict], conflict_column: str) -> int:
+        """
+        Write-only bulk load for imports. Rows whose unique column already exists
+        are skipped; returns the number inserted. Streams the chunk through COPY
+        into a temp table on Postgres, and uses one executemany elsewhere.
+        """
+        if not rows:
+            return 0
+        table = self.model.__table__
+        if self.session.get_bind().dialect.name == "postgresql":
+            inserted = self._copy_load(rows, conflict_column)
+        else:
+            stmt = self._conflict_insert().on_conflict_do_nothing(index_elements=[table.c[conflict_column]])
+            inserted = self.session.execute(stmt, rows).rowcount
+        self.session.commit()
+        if inserted:
+            self._invalidate(inserted=True)
+        return max(inserted, 0)
+
+    def _copy_load(self, rows: List[dict], conflict_column: str) -> int:
+        table = self.model.__table__.name
+        columns = list(rows[0].keys())
+        column_list = ", ".join(columns)
+        staging = f"_staging_{table}"
+
+        buffer = io.StringIO()
+        # QUOTE_NOTNULL keeps None as an unquoted empty field, which COPY reads as NULL
+        csv.writer(buffer, quoting=csv.QUOTE_NOTNULL).writerows([row[c] for c in columns] for row in rows)
+        buffer.seek(0)
+
+        cursor = self.session.connection().connection.cursor()
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                f"SELECT {column_list} FROM {table} WITH NO DATA"
+            )
+            cursor.copy_expert(f"COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+                f"ON CONFLICT ({conflict_column}) DO NOTHING"
+            )
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def all_ids(self) -> List[int]:
+        return list(self.session.scalars(select(self.model.id).order_by(self.model.id)))
+
+    def get_or_create(self, conflict_column: str, **values) -> Tuple[Row, bool]:
+        """
+        Conflict-driven insert keyed on a unique column, returning (row, created).
+        A new row costs one statement; when two writers race on the same key both
+        get the same row back and only one of them sees created=True. With group
+        commit on, concurrent calls share a transaction (see app.common.group_commit).
+        """
+        if group_commit.enabled:
+            row, created = group_commit.submit(
+                (self.model.__tablename__, conflict_column),
+                values,
+                lambda group: self.get_or_create_many(conflict_column, group),
+            )
+        else:
+            stmt, existing = get_or_create_statements(
+                self.model.__table__, self.session.get_bind().dialect.name, conflict_column, values
+            )
+            try:
+                row = self.session.execute(stmt).first()
+                if row is None:
+                    # Skipped because of a row committed after this statement's snapshot
+                    row = self.session.execute(existing).first()
+                self.session.commit()
+            except IntegrityError:
+                self.session.rollback()
+                raise
+            created = bool(row.created)
+        if created:
+            self._invalidate(inserted=True)
+        return row, created
+
+    def get_or_create_many(
+        self, conflict_column: str, rows: List[dict]
+    ) -> List[Union[Tuple[Row, bool], IntegrityError]]:
+        """
+        `get_or_create` for many rows with one multi-row insert, one lookup of the
+        keys that already existed and one commit. Returns, per row, (row, created)
+        or the IntegrityError that row raised; a row repeating an earlier key gets
+        that row with created=False. When a row breaks a constraint, the others
+        are retried one by one so only it fails. Does not invalidate the cache;
+        callers do, for the rows they created.
+        """
+        table = self.model.__table__
+        key = table.c[conflict_column]
+        first_of_key: Dict = {}
+        for index, values in enumerate(rows):
+            first_of_key.setdefault(values[conflict_column], index)
+        stmt = self._conflict_insert().on_conflict_do_nothing(index_elements=[key]).returning(*table.c)
+        try:
+            inserted = {
+                row._mapping[conflict_column]: row
+                for row in self.session.execute(stmt, [rows[index] for index in first_of_key.values()])
+            }
+            found: Dict = {}
+            for chunk in chunked([value for value in first_of_key if value not in inserted]):
+                found.update((row._mapping[conflict_column], row) for row in self.session.execute(
+                    select(*table.c).where(key.in_(chunk))
+                ))
+            self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            return [self._get_or_create_alone(conflict_column, values) for values in rows]
+
+        results: List[Union[Tuple[Row, bool], IntegrityError]] = []
+        for index, values in enumerate(rows):
+            value = values[conflict_column]
+            if value in inserted:
+                results.append((inserted[value], first_of_key[value] == index))
+            else:
+                results.append((found[value], False))
+        return results
+
+    def _get_or_create_alone(self, conflict_column: str, values: dict) -> Union[Tuple[Row, bool], IntegrityError]:
+        stmt, existing = get_or_create_statements(
+            self.model.__table__, self.session.get_bind().dialect.name, conflict_column, values
+        )
+        try:
+            row = self.session.execute(stmt).first() or self.session.execute(existing).first()
+            self.session.commit()
+        except IntegrityError as e:
+            self.session.rollback()
+            return e
+        return row, bool(row.created)
+
     def create(self, **kwargs) -> T:
         instance = self.model(**kwargs)
         self.session.add(instance)
-        self.session.commit()
-        self.session.refresh(instance)
+        self._commit(inserted=True)
         return instance
 
     def update(self, instance: T, **kwargs) -> T:
         for key, value in kwargs.items():
             setattr(instance, key, value)
-        self.session.commit()
-        self.session.refresh(instance)
+        self._commit()
         return instance
 
     def delete(self, instance: T) -> None:
         self.session.delete(instance)
-        self.session.commit()
+        self._commit()
@@ -0,0 +1,182 @@
+"""
+Set-membership filters: answer "definitely absent" or "maybe present" for
+string keys in a few bits per key, with no false negatives.
+
+`BloomFilter` is sized up front for a capacity and error rate.
+`ScalableBloomFilter` (Almeida et al., 2007) adds a filter twice as large,
+with a tighter error rate, whenever the newest one is full, so it keeps its
+overall error rate however many keys are added. Keys are hashed once
+(blake2b, 128 bits) and the k bit positions derived from the two halves
+(Kirsch-Mitzenmacher double hashing); batches are hashed and set with NumPy.
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import zipfile
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+# Each new filter's error rate is this fraction of the previous one's, so the
+# sum over all of them stays below the configured rate
+TIGHTENING_RATIO = 0.5
+GROWTH = 2
+
+
+def _hashes(keys: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    digests = b"".join(hashlib.blake2b(key.encode(), digest_size=16).digest() for key in keys)
+    halves = np.frombuffer(digests, dtype="<u8").reshape(-1, 2)
+    # An even step would only ever reach half the positions of an even-sized filter
+    return halves[:, 0], halves[:, 1] | np.uint64(1)
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[np.ndarray] = None, count: int = 0):
+        if capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bits if bits is not None else np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = count
+
+    def _positions(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        # (h1 + i * h2) mod m for i < k, one row per key; uint64 arithmetic wraps
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def _contains(self, h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+        positions = self._positions(h1, h2)
+        set_bits = (self.bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1
+        return set_bits.all(axis=1)
+
+    def _add(self, h1: np.ndarray, h2: np.ndarray) -> None:
+        positions = self._positions(h1, h2).ravel()
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        np.bitwise_or.at(self.bits, positions >> np.uint64(3), masks)
+        self.count += len(h1)
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self._contains(*_hashes([key]))[0])
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if keys:
+            self._add(*_hashes(keys))
+
+    def estimated_error_rate(self) -> float:
+        """
+        Expected false-positive rate at the current fill.
+        """
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class ScalableBloomFilter:
+    def __init__(self, initial_capacity: int = 100000, error_rate: float = 0.01):
+        if initial_capacity < 1 or not 0 < error_rate < 1:
+            raise ValueError("initial_capacity must be positive and error_rate in (0, 1)")
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = []
+
+    def __len__(self) -> int:
+        """
+        Keys added (approximate: a new key that collides with earlier ones is not counted).
+        """
+        return sum(f.count for f in self.filters)
+
+    def __contains__(self, key: str) -> bool:
+        return bool(self.contains_many([key])[0])
+
+    def contains_many(self, keys: List[str]) -> np.ndarray:
+        """
+        One boolean per key: False means the key was definitely never added.
+        """
+        found = np.zeros(len(keys), dtype=bool)
+        if keys and self.filters:
+            h1, h2 = _hashes(keys)
+            for f in reversed(self.filters):
+                found |= f._contains(h1, h2)
+        return found
+
+    def add(self, key: str) -> None:
+        self.add_many([key])
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return
+        h1, h2 = _hashes(keys)
+        if self.filters:
+            # Keys already present would only use up capacity
+            new = ~self.contains_many(keys)
+            h1, h2 = h1[new], h2[new]
+        while len(h1):
+            if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+                self._grow()
+            newest = self.filters[-1]
+            room = newest.capacity - newest.count
+            newest._add(h1[:room], h2[:room])
+            h1, h2 = h1[room:], h2[room:]
+
+    def _grow(self) -> None:
+        index = len(self.filters)
+        self.filters.append(BloomFilter(
+            self.initial_capacity * GROWTH ** index,
+            self.error_rate * (1 - TIGHTENING_RATIO) * TIGHTENING_RATIO ** index,
+        ))
+
+    def estimated_error_rate(self) -> float:
+        """
+        Expected false-positive rate at the current fill; at most `error_rate`.
+        """
+        miss = 1.0
+        for f in self.filters:
+            miss *= 1 - f.estimated_error_rate()
+        return 1 - miss
+
+    def save(self, path: str, **meta) -> None:
+        """
+        Writes the filter and the JSON-serializable `meta` to `path`, replacing
+        it in one rename so readers never see a partial file.
+        """
+        header = {
+            "initial_capacity": self.initial_capacity,
+            "error_rate": self.error_rate,
+            "filters": [[f.capacity, f.error_rate, f.count] for f in self.filters],
+            "meta": meta,
+        }
+        arrays = {f"bits_{i}": f.bits for i, f in enumerate(self.filters)}
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".bloom-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                np.savez(file, header=np.frombuffer(json.dumps(header).encode(), dtype=np.uint8), **arrays)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> Tuple["ScalableBloomFilter", dict]:
+        """
+        The filter saved at `path` and its `meta`. Raises ValueError for files
+        that are not a saved filter.
+        """
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                header = json.loads(data["header"].tobytes())
+                instance = cls(header["initial_capacity"], header["error_rate"])
+                for i, (capacity, error_rate, count) in enumerate(header["filters"]):
+                    f = BloomFilter(capacity, error_rate, bits=data[f"bits_{i}"].copy(), count=count)
+                    if len(f.bits) != (f.num_bits + 7) // 8:
+                        raise ValueError(f"Filter {i} in {path} has the wrong size")
+                    instance.filters.append(f)
+        except (KeyError, TypeError, json.JSONDecodeError, zipfile.BadZipFile) as e:
+            raise ValueError(f"{path} is not a saved filter: {e}")
+        return instance, header["meta"]
@@ -0,0 +1,333 @@
+"""
+Read-through cache for GET responses.
+
+Entries are keyed per resource (`item:<id>`) and per list page, plus the
+normalized query string, inside a namespace named after the table. Invalidation
+never scans keys: each namespace has a table generation and a list generation
+that are part of its keys, so bumping a counter orphans the old entries (they
+age out of the LRU or expire). Writes from `BaseRepository` call `invalidate`:
+inserts only bump the list generation (cached items cannot have changed), any
+other write bumps the table generation. Responses that embed rows of another
+table also key on that table's generations (`depends_on`).
+
+The in-process backend is per worker. Writes made by other processes (other
+workers, the embedding worker, bulk imports, the ASGI app) reach it through the
+change feed: `ResponseCache.sync` reads it before a lookup, at most every
+`CACHE_SYNC_SECONDS`, and bumps the generations of the tables written. A
+request pinned to the primary after a write (see app.common.replicas) always
+syncs first, so it sees that write whichever worker handled it. The Redis
+backend shares entries and generations across workers and hosts.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import Response, current_app, make_response, request
+
+from app.common.replicas import PINNED
+
+# Response headers replayed from the cache along with the body
+CACHED_HEADER_PREFIX = "X-"
+SYNC_BATCH_SIZE = 1000
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    mimetype: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    etag: str = ""
+
+    def __post_init__(self):
+        if not self.etag:
+            self.etag = hashlib.blake2b(self.body, digest_size=16).hexdigest()
+
+    def to_bytes(self) -> bytes:
+        meta = {"mimetype": self.mimetype, "headers": self.headers, "etag": self.etag}
+        return json.dumps(meta).encode() + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        meta, _, body = data.partition(b"\n")
+        return cls(body=body, **json.loads(meta))
+
+
+class CacheBackend(ABC):
+    # Generations are seen by every process, so no change feed sync is needed
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: CachedResponse, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def generations(self, namespace: str) -> Tuple[int, int]:
+        """
+        Returns the (table, list) generation counters of a namespace.
+        """
+
+    @abstractmethod
+    def bump(self, namespace: str, lists_only: bool) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+
+class NullCacheBackend(CacheBackend):
+    # Holds nothing that could go stale
+    shared = True
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def generations(self, namespace):
+        return 0, 0
+
+    def bump(self, namespace, lists_only):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    Bounded LRU with per-entry expiry, safe to share between request threads.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, CachedResponse]]" = OrderedDict()
+        self._generations: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generations(self, namespace):
+        return self._generations.get(namespace, (0, 0))
+
+    def bump(self, namespace, lists_only):
+        with self._lock:
+            table, lists = self._generations.get(namespace, (0, 0))
+            self._generations[namespace] = (table, lists + 1) if lists_only else (table + 1, lists)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend; needs the optional `redis` package.
+    """
+
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "paperpulse:cache:"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return CachedResponse.from_bytes(data) if data is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value.to_bytes(), px=max(int(ttl * 1000), 1))
+
+    def generations(self, namespace):
+        table, lists = self.client.mget(
+            f"{self.prefix}gen:{namespace}", f"{self.prefix}gen:{namespace}:lists"
+        )
+        return int(table or 0), int(lists or 0)
+
+    def bump(self, namespace, lists_only):
+        self.client.incr(f"{self.prefix}gen:{namespace}" + (":lists" if lists_only else ""))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class ResponseCache:
+    def __init__(self):
+        self.backend: CacheBackend = NullCacheBackend()
+        self.ttl = 60.0
+        self.sync_seconds = 1.0
+        self._position: Optional[Tuple[int, int]] = None
+        self._synced_at: Optional[float] = None
+        self._sync_lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        backend = app.config.get("CACHE_BACKEND", "memory")
+        if backend == "memory":
+            self.backend = MemoryCacheBackend(app.config.get("CACHE_MAX_ENTRIES", 10000))
+        elif backend == "redis":
+            self.backend = RedisCacheBackend(app.config["CACHE_REDIS_URL"])
+        elif backend == "none":
+            self.backend = NullCacheBackend()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {backend}")
+        self.ttl = app.config.get("CACHE_TTL_SECONDS", 60.0)
+        self.sync_seconds = app.config.get("CACHE_SYNC_SECONDS", 1.0)
+        self._position = self._synced_at = None
+
+    def sync(self) -> None:
+        """
+        Invalidates namespaces written by other processes since the last sync,
+        read from the change feed. Changes this process made were invalidated
+        when they were written; bumping their generations again is harmless.
+        """
+        # A served snapshot has no change feed; swapping it invalidates everything
+        if self.backend.shared or "snapshot" in current_app.extensions:
+            return
+        from app import db
+        from app.modules.changes.repository import ChangeRepository
+
+        now = time.monotonic()
+        if (
+            not db.session.info.get(PINNED)
+            and self._synced_at is not None
+            and now - self._synced_at < self.sync_seconds
+        ):
+            return
+        changes = ChangeRepository()
+        with self._sync_lock:
+            if self._position is None:
+                # Nothing is cached yet, so earlier changes cannot have made anything stale
+                self._position = changes.head()
+            while True:
+                batch = changes.get_after(self._position, SYNC_BATCH_SIZE)
+                if batch and changes.expired(self._position):
+                    # Changes were pruned before this process saw them: start over
+                    self.backend.clear()
+                    self._position = changes.head()
+                    break
+                written: Dict[str, bool] = {}
+                for change in batch:
+                    written[change.entity] = written.get(change.entity, True) and change.op == "insert"
+                for namespace, inserted in written.items():
+                    self.invalidate(namespace, inserted=inserted)
+                if batch:
+                    self._position = (batch[-1].txid, batch[-1].seq)
+                if len(batch) < SYNC_BATCH_SIZE:
+                    break
+            self._synced_at = now
+
+    def key(self, namespace: str, id=None, query: str = "", depends_on: Iterable[str] = ()) -> str:
+        """
+        Cache key of an item (`id` given) or list response in `namespace`.
+        """
+        table, lists = self.backend.generations(namespace)
+        parts = [f"{namespace}:{table}" if id is not None else f"{namespace}:{table}.{lists}"]
+        for dependency in depends_on:
+            parts.append("{}:{}.{}".format(dependency, *self.backend.generations(dependency)))
+        parts.append(f"item:{id}" if id is not None else "list")
+        return "|".join(parts) + "?" + query
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: CachedResponse) -> None:
+        self.backend.set(key, value, self.ttl)
+
+    def invalidate(self, namespace: str, inserted: bool = False) -> None:
+        """
+        `inserted`: only new rows were written, so cached items stay valid.
+        """
+        self.backend.bump(namespace, lists_only=inserted)
+
+    def clear(self) -> None:
+        self.backend.clear()
+        self._position = self._synced_at = None
+
+
+response_cache = ResponseCache()
+
+
+def _query_string() -> str:
+    return "&".join(f"{key}={value}" for key, value in sorted(request.args.items(multi=True)))
+
+
+def cached(
+    namespace: str, item: Optional[str] = None, depends_on: Optional[Callable[[], Iterable[str]]] = None
+) -> Callable:
+    """
+    Caches a GET view's successful response and answers `If-None-Match` with 304.
+    `item` names the view argument holding the resource id; without it the view
+    is a list. `depends_on` returns, per request, the other namespaces whose rows
+    the response embeds.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response_cache.sync()
+            key = response_cache.key(
+                namespace,
+                id=kwargs[item] if item is not None else None,
+                # Views of a namespace share its generations, not their entries
+                query=f"{request.endpoint}:{_query_string()}",
+                depends_on=depends_on() if depends_on is not None else (),
+            )
+
+            entry = response_cache.get(key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = CachedResponse(
+                    body=response.get_data(),
+                    mimetype=response.mimetype,
+                    headers={k: v for k, v in response.headers.items() if k.startswith(CACHED_HEADER_PREFIX)},
+                )
+                response_cache.set(key, entry)
+
+            response = Response(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+            response.set_etag(entry.etag)
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,123 @@
+"""
+Streaming table exports.
+
+Rows come from a server-side cursor in batches (see
+`BaseRepository.stream_rows`) and each batch is encoded and yielded before the
+next one is fetched, so memory stays flat regardless of table size. The
+response has no Content-Length and goes out with chunked transfer encoding.
+"""
+
+import csv
+import io
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, Type, TypedDict
+
+from flask import Response, stream_with_context
+from pydantic import BaseModel, TypeAdapter
+
+from app.common.error_handler import AppError
+
+EXPORT_MIMETYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+@lru_cache(maxsize=None)
+def _record_adapter(dto: Type[BaseModel]) -> TypeAdapter:
+    fields = {name: field.annotation for name, field in dto.model_fields.items()}
+    return TypeAdapter(TypedDict(f"{dto.__name__}Record", fields))
+
+
+def encode_ndjson(batches: Iterable[List], dto: Type[BaseModel]) -> Iterator[bytes]:
+    adapter = _record_adapter(dto)
+    for rows in batches:
+        yield b"".join(adapter.dump_json(row._asdict()) + b"\n" for row in rows)
+
+
+def encode_csv(batches: Iterable[List], dto: Type[BaseModel]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(dto.model_fields)
+    for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _Drain(io.RawIOBase):
+    """
+    Write-only sink that hands written bytes to the response as they arrive,
+    while reporting absolute positions to the Parquet writer.
+    """
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def encode_parquet(batches: Iterable[List], dto: Type[BaseModel]) -> Iterator[bytes]:
+    """
+    One Parquet row group per batch.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = list(dto.model_fields)
+    sink = _Drain()
+    writer = None
+    try:
+        for rows in batches:
+            table = pa.Table.from_pylist([row._asdict() for row in rows])
+            if writer is None:
+                writer = pq.ParquetWriter(sink, table.select(columns).schema)
+            writer.write_table(table.select(columns))
+            yield sink.take()
+    finally:
+        if writer is not None:
+            writer.close()
+    yield sink.take()
+
+
+ENCODERS = {"ndjson": encode_ndjson, "csv": encode_csv, "parquet": encode_parquet}
+
+
+def export_response(
+    fetch_batches: Callable[[], Iterable[List]], dto: Type[BaseModel], fmt: str, filename: str
+) -> Response:
+    """
+    Streams `fetch_batches()` in `fmt`. The format is checked before anything is
+    sent, since errors can no longer change the status once streaming starts.
+    """
+    if fmt not in ENCODERS:
+        raise AppError(f"format must be one of: {', '.join(ENCODERS)}", 400)
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise AppError("Parquet export requires the 'pyarrow' package", 501)
+
+    body = stream_with_context(ENCODERS[fmt](fetch_batches(), dto))
+    response = Response(body, mimetype=EXPORT_MIMETYPES[fmt])
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
@@ -0,0 +1,86 @@
+"""
+Group commit for concurrent single-row creates.
+
+Every commit waits for the database to make its log durable (an fsync on
+Postgres), so under many small concurrent POSTs throughput is bound by commit
+latency rather than by the inserts themselves. With `GROUP_COMMIT_WINDOW_MS`
+set, `BaseRepository.get_or_create` calls for the same table and key column
+that arrive within that window are written together: the first caller (the
+leader) waits out the window, then writes the whole group in one transaction
+with `get_or_create_many`. Each caller still gets its own row or its own error.
+
+A group is written early once it holds `GROUP_COMMIT_MAX_BATCH` rows. Groups
+form per worker process. With the window at 0 (the default) every create
+commits on its own.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+
+class _Group:
+    def __init__(self):
+        self.items: List[Tuple[Any, Future]] = []
+        self.full = threading.Event()
+
+
+class GroupCommit:
+    def __init__(self, window_seconds: float = 0.0, max_batch: int = 64):
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self._open: Dict[Hashable, _Group] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app) -> None:
+        self.window_seconds = app.config.get("GROUP_COMMIT_WINDOW_MS", 0.0) / 1000.0
+        self.max_batch = app.config.get("GROUP_COMMIT_MAX_BATCH", 64)
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_seconds > 0
+
+    def submit(self, key: Hashable, item: Any, write: Callable[[List[Any]], List[Any]]) -> Any:
+        """
+        Adds `item` to the open group for `key` and returns its result once the
+        group is written. `write` takes the group's items and returns one result
+        per item, or an exception instance to raise in that item's caller; it only
+        runs in the leader, so it must not depend on the other callers' state.
+        """
+        future: Future = Future()
+        with self._lock:
+            group = self._open.get(key)
+            leader = group is None
+            if leader:
+                group = self._open[key] = _Group()
+            group.items.append((item, future))
+            if len(group.items) >= self.max_batch:
+                del self._open[key]
+                group.full.set()
+
+        if leader:
+            group.full.wait(self.window_seconds)
+            with self._lock:
+                if self._open.get(key) is group:
+                    del self._open[key]
+            self._write(group, write)
+        return future.result()
+
+    def _write(self, group: _Group, write: Callable[[List[Any]], List[Any]]) -> None:
+        try:
+            results = write([item for item, _ in group.items])
+        except BaseException as e:
+            # Nobody may be left waiting
+            for _, future in group.items:
+                future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(group.items, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+group_commit = GroupCommit()
@@ -1,17 +1,52 @@
-
+import atexit
 import json
 import logging
+import queue
 import sys
-from datetime import datetime, timezone
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    import orjson
+except ImportError:  # optional, faster encoder
+    orjson = None
+
+# Attributes every LogRecord carries; anything else on a record came from `extra`
+RESERVED_ATTRS = frozenset(logging.LogRecord("", 0, "", 0, "", (), None).__dict__) | {"message", "asctime"}
+
+
+def _dumps(log_record: dict) -> str:
+    if orjson is not None:
+        return orjson.dumps(log_record, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(log_record, default=str)
+
 
 class JsonFormatter(logging.Formatter):
     """
     Formatter that outputs JSON strings after parsing the LogRecord.
     It supports extra fields passed in the `extra` dictionary.
+
+    Timestamps come from `record.created`, taken when the record was emitted,
+    not when it is formatted (which may be later, on the listener thread).
+    The date/time part is reused for every record within the same second.
     """
+
+    def __init__(self):
+        super().__init__()
+        self._second = None
+        self._second_prefix = ""
+
+    def _timestamp(self, created: float) -> str:
+        second = int(created)
+        if second != self._second:
+            self._second = second
+            self._second_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+        return f"{self._second_prefix}.{int((created - second) * 1e6):06d}+00:00"
+
     def format(self, record):
         log_record = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -20,25 +55,18 @@ class JsonFormatter(logging.Formatter):
             "line": record.lineno,
         }
 
-        # Identify standard LogRecord attributes to ignore
-        # These are attributes always present in a LogRecord
-        startner_attrs = {
-            "args", "asctime", "created", "exc_info", "exc_text", "filename",
-            "funcName", "levelname", "levelno", "lineno", "module", "msecs",
-            "message", "msg", "name", "pathname", "process", "processName",
-            "relativeCreated", "stack_info", "thread", "threadName"
-        }
-
         # Add any extra attributes present in the record
         for key, value in record.__dict__.items():
-            if key not in startner_attrs and key not in log_record:
+            if key not in RESERVED_ATTRS and key not in log_record:
                 log_record[key] = value
 
-        # If there's exception info, format it
+        # Exceptions are rendered to text before the record is queued
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_record["exception"] = record.exc_text
 
-        return json.dumps(log_record, default=str)
+        return _dumps(log_record)
 
 class ContextFilter(logging.Filter):
     """
@@ -46,36 +74,94 @@ class ContextFilter(logging.Filter):
     """
     def filter(self, record):
         from flask import has_request_context, g
-        
+
         if has_request_context():
             # Inject request_id if set by middleware
             if hasattr(g, 'request_id'):
                 record.request_id = g.request_id
-            
+
         return True
 
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Hands records to the listener thread without ever blocking the caller.
+    When the queue is full (the output cannot keep up) records are dropped and
+    counted instead; the count is reported with the next record that fits.
+    """
+
+    _exception_formatter = logging.Formatter()
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Only merge args and render the traceback here; JSON formatting happens on the listener thread
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        # put_nowait never blocks, so the lock is only held briefly
+        with self._dropped_lock:
+            if self.dropped:
+                record.dropped_records = self.dropped
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped += 1
+            else:
+                self.dropped = 0
+
+
+_listener = None
+_queue_handler = None
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
 def setup_logging(app):
     """
     Configures the root logger to output JSON logs to stdout.
+    Request threads only enqueue records; a background listener formats and
+    writes them, so a slow stdout never stalls a request.
     """
     # Remove default handlers
     root_logger = logging.getLogger()
     if root_logger.handlers:
-        for handler in root_logger.handlers:
+        for handler in list(root_logger.handlers):
             root_logger.removeHandler(handler)
-    
-    # Create console handler with JSON formatter
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(JsonFormatter())
-    
-    # Add context filter to handler (so all logs processed by this handler get context)
+    _stop_listener()
+
+    # Console handler with JSON formatter, driven by the listener thread
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=app.config.get("LOG_QUEUE_SIZE", 10000)))
+    # Context comes from the request thread, so the filter runs before queueing
     handler.addFilter(ContextFilter())
-    
+
+    global _listener, _queue_handler
+    _queue_handler = handler
+    _listener = QueueListener(handler.queue, stream_handler)
+    _listener.start()
+
     # Set logging level based on app config or default to INFO
     log_level = app.config.get("LOG_LEVEL", "INFO").upper()
     root_logger.setLevel(getattr(logging, log_level, logging.INFO))
     root_logger.addHandler(handler)
-    
+
     # Determine libraries to be less verbose if needed
     logging.getLogger("werkzeug").setLevel(logging.WARNING)
     logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
@@ -84,6 +170,27 @@ def setup_logging(app):
     app.logger.handlers = [] # clear flask default handlers
     app.logger.addHandler(handler)
     app.logger.setLevel(getattr(logging, log_level, logging.INFO))
-    
+    app.logger.propagate = False
+
     # Log startup
     logging.getLogger(__name__).info("Logging configured with JSON format")
+
+
+def restart_logging_after_fork():
+    """
+    The listener thread does not survive fork(): gives a worker forked from a
+    process that already called `setup_logging` its own queue and listener.
+    """
+    global _listener
+    if _listener is None:
+        return
+    _queue_handler.queue = queue.Queue(maxsize=_queue_handler.queue.maxsize)
+    _queue_handler.dropped = 0
+    # Another thread may have held the lock at fork time
+    _queue_handler._dropped_lock = threading.Lock()
+    _listener = QueueListener(_queue_handler.queue, *_listener.handlers)
+    _listener.start()
+
+
+# Flush queued records on interpreter exit
+atexit.register(_stop_listener)
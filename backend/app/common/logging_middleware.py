@@ -1,39 +1,69 @@
-
 import logging
+import random
 import uuid
 import time
+from typing import Dict
 from flask import request, g, Response
 
 logger = logging.getLogger(__name__)
 
-def configure_request_logging(app):
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """
+    Parses "endpoint=rate,endpoint=rate" (e.g. "papers.get_paper=0.1").
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        endpoint, _, rate = item.partition("=")
+        rates[endpoint.strip()] = float(rate)
+    return rates
+
+
+def should_log(endpoint, status_code: int, duration_ms: float, rates: Dict[str, float], default_rate: float,
+               slow_ms: float) -> bool:
+    """
+    Errors and slow requests are always logged; everything else is sampled per endpoint.
+    """
+    if status_code >= 400 or duration_ms >= slow_ms:
+        return True
+    rate = rates.get(endpoint, default_rate)
+    return rate >= 1.0 or random.random() < rate
+
+
+def configure_request_logging(app, request=request, g=g):
+    """
+    `request` and `g` are the context proxies of the app's framework; the async
+    app passes Quart's.
+    """
+    rates = app.config.get("LOG_ACCESS_SAMPLE_RATES", {})
+    if isinstance(rates, str):
+        rates = parse_sample_rates(rates)
+    default_rate = app.config.get("LOG_ACCESS_SAMPLE_RATE", 1.0)
+    slow_ms = app.config.get("LOG_SLOW_REQUEST_MS", 1000.0)
+
     @app.before_request
     def start_timer():
-        g.start_time = time.time()
+        g.start_time = time.perf_counter()
         g.request_id = request.headers.get("X-Request-ID") or str(uuid.uuid4())
-        
-        # Log request start
-        logger.info(f"Request started: {request.method} {request.path}", extra={
-            "method": request.method,
-            "path": request.path,
-            "query_params": request.args.to_dict(),
-            "remote_addr": request.remote_addr,
-            "user_agent": request.user_agent.string
-        })
 
     @app.after_request
     def log_request(response: Response):
         if hasattr(g, "start_time"):
-            duration = time.time() - g.start_time
+            duration_ms = (time.perf_counter() - g.start_time) * 1000
             response.headers["X-Request-ID"] = g.request_id
-            
-            # Log request completion
-            logger.info(f"Request finished: {response.status_code}", extra={
-                "method": request.method,
-                "path": request.path,
-                "status_code": response.status_code,
-                "duration": duration,
-                "content_length": response.content_length
-            })
-            
+
+            # One access line per request, written once the response is ready
+            if should_log(request.endpoint, response.status_code, duration_ms, rates, default_rate, slow_ms):
+                logger.info(f"{request.method} {request.path} {response.status_code}", extra={
+                    "method": request.method,
+                    "path": request.path,
+                    "endpoint": request.endpoint,
+                    "query_params": request.args.to_dict(),
+                    "status_code": response.status_code,
+                    "duration_ms": round(duration_ms, 3),
+                    "content_length": response.content_length,
+                    "remote_addr": request.remote_addr,
+                    "user_agent": request.user_agent.string
+                })
+
         return response
@@ -0,0 +1,411 @@
+"""
+In-process metrics in the Prometheus text format.
+
+Counters and fixed-bucket histograms keep one small list per label set behind a
+per-metric lock held for a single update, so recording costs well under a
+microsecond. Each worker process keeps its own registry; with `METRICS_DIR`
+set, every process periodically writes a snapshot there and `/metrics` sums the
+snapshots of all processes, plus the totals of exited ones (folded into one
+archive file, so counters never go back).
+"""
+
+import fcntl
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Statement verbs reported as-is; anything else (PRAGMA, COPY, DDL...) is "OTHER"
+SQL_VERBS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"})
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): value for key, value in self._values.items()}
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: one (non-cumulative) count per bucket plus +Inf, then the sum
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labelvalues)
+            if counts is None:
+                counts = self._values[labelvalues] = [0.0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {json.dumps(key): list(counts) for key, counts in self._values.items()}
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+        self.gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.metrics.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self.metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name: str, help: str, read: Callable[[], Optional[float]]) -> None:
+        """
+        Registers a gauge read at snapshot time.
+        """
+        self.gauges[name] = (help, read)
+
+    def snapshot(self) -> dict:
+        gauges = {}
+        for name, (_, read) in self.gauges.items():
+            value = read()
+            if value is not None:
+                gauges[name] = value
+        return {
+            "metrics": {name: metric.snapshot() for name, metric in self.metrics.items()},
+            "gauges": gauges,
+            "written_at": time.time(),
+        }
+
+    def render(self, snapshot: dict) -> str:
+        lines = []
+        for name, metric in self.metrics.items():
+            values = snapshot["metrics"].get(name, {})
+            if isinstance(metric, Histogram):
+                lines.append(f"# HELP {name} {metric.help}\n# TYPE {name} histogram")
+                for key, counts in sorted(values.items()):
+                    labels = list(zip(metric.labelnames, json.loads(key)))
+                    cumulative = 0.0
+                    for bound, count in zip(metric.buckets + (float("inf"),), counts):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else repr(float(bound))
+                        lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {_number(cumulative)}")
+                    lines.append(f"{name}_sum{_labels(labels)} {_number(counts[-1])}")
+                    lines.append(f"{name}_count{_labels(labels)} {_number(cumulative)}")
+            else:
+                lines.append(f"# HELP {name} {metric.help}\n# TYPE {name} counter")
+                for key, value in sorted(values.items()):
+                    lines.append(f"{name}{_labels(list(zip(metric.labelnames, json.loads(key))))} {_number(value)}")
+        for name, (help, _) in self.gauges.items():
+            if name in snapshot["gauges"]:
+                lines.append(f"# HELP {name} {help}\n# TYPE {name} gauge")
+                lines.append(f"{name} {_number(snapshot['gauges'][name])}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def merge_snapshots(snapshots: List[dict], gauge_max_age: Optional[float] = None) -> dict:
+    """
+    Sums counters, histogram buckets and gauges across processes. Gauges of
+    snapshots older than `gauge_max_age` seconds (exited workers) are ignored.
+    """
+    merged = {"metrics": {}, "gauges": {}}
+    now = time.time()
+    for snapshot in snapshots:
+        for name, values in snapshot["metrics"].items():
+            target = merged["metrics"].setdefault(name, {})
+            for key, value in values.items():
+                if isinstance(value, list):
+                    existing = target.get(key)
+                    target[key] = [a + b for a, b in zip(existing, value)] if existing else list(value)
+                else:
+                    target[key] = target.get(key, 0.0) + value
+        if gauge_max_age is not None and now - snapshot.get("written_at", now) > gauge_max_age:
+            continue
+        for name, value in snapshot["gauges"].items():
+            merged["gauges"][name] = merged["gauges"].get(name, 0.0) + value
+    return merged
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by endpoint, method and status code.", ("endpoint", "method", "status")
+)
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Request latency by endpoint.", ("endpoint", "method")
+)
+REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per request.", ("endpoint",), buckets=COUNT_BUCKETS
+)
+REQUEST_DB_TIME = registry.histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request.", ("endpoint",)
+)
+QUERY_DURATION = registry.histogram("db_query_duration_seconds", "SQL statement latency by verb.", ("verb",))
+POOL_CHECKOUT_WAIT = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection."
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    duration = time.perf_counter() - started
+    verb = statement.lstrip()[:6].upper().rstrip()
+    QUERY_DURATION.observe(duration, verb if verb in SQL_VERBS else "OTHER")
+    if has_request_context() and "sql_queries" in g:
+        g.sql_queries += 1
+        g.sql_seconds += duration
+
+
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute
+    if context.connection is not None and context.connection.info.get("query_started"):
+        context.connection.info["query_started"].pop()
+
+
+def _instrument_pool(engine) -> None:
+    """
+    Times `pool.connect()`, which blocks while the pool is exhausted.
+    Re-applied when `dispose()` replaces the pool.
+    """
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        started = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+    pool.connect = timed_connect
+
+
+def instrument_engine(engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    event.listen(engine, "engine_disposed", lambda _: _instrument_pool(engine))
+    _instrument_pool(engine)
+
+
+# metrics-<pid>-<boot id>.json
+WORKER_FILE = re.compile(r"^metrics-(\d+)-[0-9a-f]{32}\.json$")
+ARCHIVE_FILE = "metrics-archived.json"
+LOCK_FILE = ".metrics.lock"
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SnapshotWriter:
+    """
+    Writes this process's snapshot to `directory` at most every `interval`
+    seconds. Files are named per process start, not just per pid, so a
+    recycled worker that gets a dead one's pid never overwrites its counts.
+    Files of exited workers are folded into ARCHIVE_FILE when snapshots are
+    read, which also lists them until they are deleted so they are never
+    counted twice.
+    """
+
+    def __init__(self, directory: str, interval: float):
+        self.directory = directory
+        self.interval = interval
+        self._written_at = 0.0
+        self._pid: Optional[int] = None
+        self._boot_id = ""
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        # Resolved per call: forked workers must not share the parent's file
+        pid = os.getpid()
+        if pid != self._pid:
+            self._pid, self._boot_id = pid, uuid.uuid4().hex
+        return os.path.join(self.directory, f"metrics-{pid}-{self._boot_id}.json")
+
+    def maybe_write(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now - self._written_at < self.interval:
+            return
+        self._written_at = now
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(tmp, self.path)
+
+    def read_all(self) -> List[dict]:
+        """
+        The snapshots of running workers plus the archive of exited ones.
+        """
+        with self._locked():
+            archive = self._fold_exited()
+            folded = set(archive["folded"])
+            snapshots = [archive]
+            for name in self._worker_files():
+                if name not in folded:
+                    snapshot = self._read(name)
+                    if snapshot is not None:
+                        snapshots.append(snapshot)
+        return snapshots
+
+    @contextmanager
+    def _locked(self):
+        # Serializes folding (and reads, which must not see a file both folded and deleted)
+        with open(os.path.join(self.directory, LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read(self, name: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _worker_files(self) -> List[str]:
+        return [name for name in os.listdir(self.directory) if WORKER_FILE.match(name)]
+
+    def _exited(self, names: List[str]) -> List[str]:
+        by_pid: Dict[int, List[Tuple[float, str]]] = {}
+        for name in names:
+            try:
+                modified = os.path.getmtime(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            by_pid.setdefault(int(WORKER_FILE.match(name).group(1)), []).append((modified, name))
+        exited = []
+        for pid, files in by_pid.items():
+            files.sort()
+            # A reused pid runs only its latest start; the earlier files are from exited workers
+            exited.extend(name for _, name in (files if not _alive(pid) else files[:-1]))
+        own = os.path.basename(self.path)
+        return [name for name in exited if name != own]
+
+    def _fold_exited(self) -> dict:
+        archive = self._read(ARCHIVE_FILE) or {"metrics": {}, "gauges": {}, "folded": []}
+        names = self._worker_files()
+        # Files folded earlier whose deletion was interrupted stay listed until they are gone
+        folded = [name for name in archive["folded"] if name in names]
+        exited = [name for name in self._exited(names) if name not in folded]
+        if not exited:
+            return archive
+
+        snapshots = [archive]
+        for name in exited:
+            snapshot = self._read(name)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        archive = {
+            "metrics": merge_snapshots(snapshots)["metrics"],
+            # Gauges describe running processes only
+            "gauges": {},
+            "folded": folded + exited,
+        }
+        tmp = os.path.join(self.directory, f"{ARCHIVE_FILE}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(archive, f)
+        os.replace(tmp, os.path.join(self.directory, ARCHIVE_FILE))
+        for name in exited:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        return archive
+
+
+def configure_metrics(app, engines: Sequence) -> None:
+    """
+    `engines` are the primary and any read replicas; their statements and pool
+    waits are recorded together.
+    """
+    for engine in engines:
+        instrument_engine(engine)
+
+    def pool_checked_out():
+        counts = [engine.pool.checkedout() for engine in engines if hasattr(engine.pool, "checkedout")]
+        return sum(counts) if counts else None
+
+    registry.gauge("db_pool_checked_out", "Connections currently checked out of the pools.", pool_checked_out)
+    writer = None
+    if app.config.get("METRICS_DIR"):
+        writer = SnapshotWriter(app.config["METRICS_DIR"], app.config.get("METRICS_FLUSH_SECONDS", 5.0))
+
+    @app.before_request
+    def start_metrics():
+        g.metrics_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+
+    @app.after_request
+    def record_metrics(response):
+        if "metrics_started" in g:
+            endpoint = request.endpoint or "unmatched"
+            REQUESTS.inc(endpoint, request.method, str(response.status_code))
+            REQUEST_DURATION.observe(time.perf_counter() - g.metrics_started, endpoint, request.method)
+            REQUEST_QUERIES.observe(g.sql_queries, endpoint)
+            REQUEST_DB_TIME.observe(g.sql_seconds, endpoint)
+            if writer is not None:
+                writer.maybe_write()
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        if writer is None:
+            snapshot = registry.snapshot()
+        else:
+            writer.maybe_write(force=True)
+            snapshot = merge_snapshots(writer.read_all(), gauge_max_age=3 * writer.interval)
+        return Response(registry.render(snapshot), content_type=CONTENT_TYPE)
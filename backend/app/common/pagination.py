@@ -0,0 +1,142 @@
+import base64
+import binascii
+from typing import AbstractSet, Callable, FrozenSet, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from pydantic import BaseModel
+
+from app.common.error_handler import AppError
+
+T = TypeVar("T")
+K = TypeVar("K")
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+TRUTHY = {"1", "true", "yes", "on"}
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    One keyset page of a list endpoint.
+    `next_cursor` is opaque to clients; `total_estimate` is only filled on request
+    and comes from planner statistics, so it is approximate by design.
+    """
+
+    items: List[T]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None
+
+
+class Lookup(BaseModel, Generic[K, T]):
+    """
+    Result of a multi-get: the found items in request order, and the requested
+    keys that matched nothing.
+    """
+
+    items: List[T]
+    missing: List[K]
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, _, value = base64.urlsafe_b64decode(padded).decode().partition(":")
+        if prefix != "id":
+            raise ValueError(cursor)
+        return int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise AppError("Invalid pagination cursor", 400)
+
+
+def parse_limit(args, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    try:
+        limit = int(args.get("limit", default))
+    except ValueError:
+        raise AppError("limit must be an integer", 400)
+    if not 1 <= limit <= maximum:
+        raise AppError(f"limit must be between 1 and {maximum}", 400)
+    return limit
+
+
+def parse_page_args(args) -> Tuple[int, Optional[str], bool]:
+    """
+    Reads `limit`, `after` and `include_total` from the query string.
+    """
+    limit = parse_limit(args)
+    after = args.get("after") or None
+    include_total = args.get("include_total", "").lower() in TRUTHY
+    return limit, after, include_total
+
+
+def parse_include(args, allowed: AbstractSet[str]) -> FrozenSet[str]:
+    """
+    Reads the comma-separated `include` parameter, rejecting unknown names.
+    """
+    include = frozenset(name.strip() for name in args.get("include", "").split(",") if name.strip())
+    unknown = include - allowed
+    if unknown:
+        raise AppError(
+            f"Unknown include: {', '.join(sorted(unknown))} (allowed: {', '.join(sorted(allowed))})", 400
+        )
+    return include
+
+
+def parse_fields(args, allowed: Sequence[str], default: Sequence[str]) -> Tuple[str, ...]:
+    """
+    Reads the comma-separated `fields` parameter (a sparse fieldset), rejecting
+    unknown names; `default` when it is absent. Names come back in `allowed`
+    order and always include `id`, which cursors are built from.
+    """
+    raw = args.get("fields")
+    if raw is None:
+        requested = set(default)
+    else:
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = requested - set(allowed)
+        if unknown:
+            raise AppError(
+                f"Unknown fields: {', '.join(sorted(unknown))} (allowed: {', '.join(allowed)})", 400
+            )
+    requested.add("id")
+    return tuple(name for name in allowed if name in requested)
+
+
+def parse_keys(
+    args, name: str, maximum: int, convert: Callable[[str], K] = str, separator: Optional[str] = ","
+) -> List[K]:
+    """
+    Reads the keys of a multi-get from `name` (`separator`-separated and/or
+    repeated), in request order without duplicates. Keys that may contain the
+    separator, such as DOIs, pass `separator=None` and are only ever repeated.
+    Rejects more than `maximum` keys and values `convert` cannot parse.
+    """
+    keys = {}
+    for value in args.getlist(name):
+        for raw in value.split(separator) if separator else [value]:
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                keys.setdefault(convert(raw), None)
+            except ValueError:
+                raise AppError(f"Invalid value in {name}: {raw}", 400)
+    if not keys:
+        raise AppError(f"Query parameter '{name}' is required", 400)
+    if len(keys) > maximum:
+        raise AppError(f"At most {maximum} {name} per request", 400)
+    return list(keys)
+
+
+def set_page_headers(response, page: Page):
+    """
+    Attaches paging metadata as headers so list bodies stay plain JSON arrays.
+    """
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total_estimate is not None:
+        response.headers["X-Total-Estimate"] = str(page.total_estimate)
+    return response
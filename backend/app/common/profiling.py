@@ -0,0 +1,300 @@
+"""
+Opt-in per-request profiling.
+
+A request is captured when its profiling header carries `PROFILING_TOKEN`
+or it is picked by `PROFILING_SAMPLE_RATE`. The request runs under cProfile
+and every SQL statement it issues is recorded with its parameters and timing;
+SELECTs slower than `PROFILING_SLOW_QUERY_MS` get their plan attached.
+Captures are stored under a server-generated id (the request's X-Request-ID
+is kept alongside for correlation) and served, to holders of the token too,
+from /api/debug/profiles.
+
+With `PROFILING_ENABLED` off, or no `PROFILING_TOKEN` set, none of the hooks
+or routes are registered, so there is no per-request cost at all.
+"""
+
+import cProfile
+import hmac
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+from flask import Blueprint, Response, current_app, g, has_request_context, jsonify, request
+from sqlalchemy import event
+
+from app.common.error_handler import AppError
+
+logger = logging.getLogger(__name__)
+
+# Characters of each statement parameter kept in the trace
+MAX_PARAM_LENGTH = 200
+# Functions listed in the text report
+STATS_LINES = 40
+
+EXPLAIN_PREFIX = {"postgresql": "EXPLAIN (FORMAT TEXT) ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+def _short(value):
+    text = repr(value)
+    return text if len(text) <= MAX_PARAM_LENGTH else text[:MAX_PARAM_LENGTH] + "..."
+
+
+def _params(parameters, executemany: bool):
+    if executemany:
+        return {"rows": len(parameters), "first": _params(parameters[0], False) if parameters else None}
+    if isinstance(parameters, dict):
+        return {key: _short(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_short(value) for value in parameters]
+    return _short(parameters)
+
+
+class ProfileStore:
+    """
+    Keeps the latest `max_captures` captures, in memory or, with `directory`,
+    as files shared by all worker processes.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_captures: int = 100):
+        self.directory = directory
+        self.max_captures = max_captures
+        self._captures: "OrderedDict[str, dict]" = OrderedDict()
+        self._profiles: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def save(self, capture: dict, profile: Optional[bytes]) -> None:
+        capture_id = capture["id"]
+        if self.directory:
+            if profile is not None:
+                with open(self._path(capture_id, "prof"), "wb") as f:
+                    f.write(profile)
+            tmp = self._path(capture_id, "json.tmp")
+            with open(tmp, "w") as f:
+                json.dump(capture, f, default=str)
+            os.replace(tmp, self._path(capture_id, "json"))
+            self._prune_directory()
+            return
+        with self._lock:
+            self._captures[capture_id] = capture
+            if profile is not None:
+                self._profiles[capture_id] = profile
+            while len(self._captures) > self.max_captures:
+                old_id, _ = self._captures.popitem(last=False)
+                self._profiles.pop(old_id, None)
+
+    def _path(self, capture_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, f"{capture_id}.{suffix}")
+
+    def _capture_files(self) -> List[str]:
+        files = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+        return sorted(files, key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+
+    def _prune_directory(self) -> None:
+        files = self._capture_files()
+        for name in files[: max(len(files) - self.max_captures, 0)]:
+            capture_id = name[: -len(".json")]
+            for suffix in ("json", "prof"):
+                try:
+                    os.remove(self._path(capture_id, suffix))
+                except FileNotFoundError:
+                    pass
+
+    def list(self) -> List[dict]:
+        if self.directory:
+            captures = []
+            for name in reversed(self._capture_files()):
+                capture = self.get(name[: -len(".json")])
+                if capture is not None:
+                    captures.append(capture)
+        else:
+            with self._lock:
+                captures = list(reversed(self._captures.values()))
+        return [{key: c[key] for key in c if key not in ("sql", "stats")} for c in captures]
+
+    def get(self, capture_id: str) -> Optional[dict]:
+        if not _is_capture_id(capture_id):
+            return None
+        if not self.directory:
+            return self._captures.get(capture_id)
+        try:
+            with open(self._path(capture_id, "json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def get_profile(self, capture_id: str) -> Optional[bytes]:
+        if not _is_capture_id(capture_id):
+            return None
+        if not self.directory:
+            return self._profiles.get(capture_id)
+        try:
+            with open(self._path(capture_id, "prof"), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def _is_capture_id(capture_id: str) -> bool:
+    # Capture ids double as file names, so only ids this module generates are accepted
+    try:
+        return uuid.UUID(hex=capture_id).hex == capture_id
+    except ValueError:
+        return False
+
+
+def _has_token(app) -> bool:
+    header = request.headers.get(app.config["PROFILING_HEADER"])
+    return header is not None and hmac.compare_digest(header.encode(), app.config["PROFILING_TOKEN"].encode())
+
+
+def _check_token():
+    if not _has_token(current_app):
+        raise AppError("Profiling token required", 403)
+
+
+profiles_bp = Blueprint("profiles", __name__)
+
+
+@profiles_bp.before_request
+def require_token():
+    _check_token()
+
+
+@profiles_bp.route("/", methods=["GET"])
+def list_profiles():
+    return jsonify(current_app.extensions["profile_store"].list()), 200
+
+
+@profiles_bp.route("/<capture_id>", methods=["GET"])
+def get_profile(capture_id):
+    capture = current_app.extensions["profile_store"].get(capture_id)
+    if capture is None:
+        raise AppError("Profile not found", 404)
+    return jsonify(capture), 200
+
+
+@profiles_bp.route("/<capture_id>/profile.prof", methods=["GET"])
+def download_profile(capture_id):
+    data = current_app.extensions["profile_store"].get_profile(capture_id)
+    if data is None:
+        raise AppError("Profile not found", 404)
+    response = Response(data, mimetype="application/octet-stream")
+    response.headers["Content-Disposition"] = f'attachment; filename="{capture_id}.prof"'
+    return response
+
+
+def _wants_profile(app) -> bool:
+    if _has_token(app):
+        return True
+    rate = app.config.get("PROFILING_SAMPLE_RATE", 0.0)
+    return rate > 0 and random.random() < rate
+
+
+def configure_profiling(app, engines: Sequence) -> None:
+    """
+    `engines` are the primary followed by any read replicas.
+    """
+    if not app.config.get("PROFILING_ENABLED", False):
+        return
+    if not app.config.get("PROFILING_TOKEN"):
+        # Captures hold SQL parameters, so they are never served without a token
+        logger.warning("Profiling not enabled: PROFILING_TOKEN is not set")
+        return
+
+    store = ProfileStore(app.config.get("PROFILING_DIR") or None, app.config.get("PROFILING_MAX_CAPTURES", 100))
+    app.extensions["profile_store"] = store
+    app.register_blueprint(profiles_bp, url_prefix="/api/debug/profiles")
+    slow_seconds = app.config.get("PROFILING_SLOW_QUERY_MS", 100.0) / 1000.0
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and "profile_sql" in g:
+            conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not (has_request_context() and "profile_sql" in g and conn.info.get("profile_started")):
+            return
+        duration = time.perf_counter() - conn.info["profile_started"].pop()
+        entry = {
+            "statement": statement,
+            "parameters": _params(parameters, executemany),
+            "duration_ms": round(duration * 1000, 3),
+        }
+        if conn.engine is not engines[0]:
+            # Served by a read replica
+            entry["bind"] = conn.engine.url.render_as_string(hide_password=True)
+        explain_prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+        if duration >= slow_seconds and explain_prefix and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            # A separate cursor, so the caller's pending results are untouched
+            explain = conn.connection.cursor()
+            try:
+                explain.execute(explain_prefix + statement, parameters)
+                entry["plan"] = [" ".join(str(col) for col in row) for row in explain.fetchall()]
+            except Exception as e:
+                entry["plan_error"] = repr(e)
+            finally:
+                explain.close()
+        g.profile_sql.append(entry)
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+
+    @app.before_request
+    def start_profile():
+        if request.blueprint == "profiles" or not _wants_profile(app):
+            return
+        g.profile_sql = []
+        g.profile_started = time.perf_counter()
+        g.profiler = cProfile.Profile()
+        try:
+            g.profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread; keep the SQL trace only
+            g.profiler = None
+
+    @app.after_request
+    def finish_profile(response):
+        if "profile_sql" not in g:
+            return response
+        duration = time.perf_counter() - g.profile_started
+        profiler = g.pop("profiler")
+        stats_text, raw = None, None
+        if profiler is not None:
+            profiler.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats("cumulative").print_stats(STATS_LINES)
+            stats_text = stream.getvalue()
+            raw = marshal.dumps(stats.stats)
+
+        sql = g.pop("profile_sql")
+        capture_id = uuid.uuid4().hex
+        store.save(
+            {
+                "id": capture_id,
+                "request_id": g.get("request_id"),
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "status_code": response.status_code,
+                "duration_ms": round(duration * 1000, 3),
+                "captured_at": time.time(),
+                "query_count": len(sql),
+                "query_ms": round(sum(q["duration_ms"] for q in sql), 3),
+                "sql": sql,
+                "stats": stats_text,
+            },
+            raw,
+        )
+        response.headers["X-Profile-Url"] = f"/api/debug/profiles/{capture_id}"
+        return response
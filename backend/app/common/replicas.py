@@ -0,0 +1,287 @@
+"""
+Read-replica routing.
+
+Replica URLs from `SQLALCHEMY_REPLICA_URIS` are registered as Flask-SQLAlchemy
+binds (replica_0, replica_1, ...), so they get the same engine options,
+post-fork disposal and teardown as the primary. Repository read methods are
+marked with `replica_read`; while one runs, `RoutingSession` sends its SELECTs
+to a replica, picked round robin once per transaction. Everything else stays
+on the primary:
+
+- writes, and reads outside repository read methods;
+- every read of a session that has written (read-your-writes), for the rest
+  of that session;
+- every request from a client that wrote in the last `REPLICA_STICKY_SECONDS`
+  (tracked with a cookie, so it holds across workers).
+
+A replica is skipped for `REPLICA_RETRY_SECONDS` after a connection error, and
+while its replication lag (checked at most every `REPLICA_CHECK_SECONDS`)
+exceeds `REPLICA_MAX_LAG_SECONDS`. A read that fails on a replica is retried
+on the primary; with no usable replica, reads simply go to the primary.
+"""
+
+import functools
+import inspect
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from flask import current_app, has_app_context, request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.orm import scoped_session
+
+logger = logging.getLogger(__name__)
+
+BIND_PREFIX = "replica_"
+COOKIE_NAME = "read_primary_until"
+
+# session.info keys
+WROTE = "replica_wrote"
+PINNED = "replica_pinned"
+REPLICA = "replica"
+
+# Seconds the replica is behind; 0 when it has replayed everything it received
+LAG_QUERIES = {
+    "postgresql": text(
+        "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+        "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+PING = text("SELECT 1")
+
+
+class Replica:
+    def __init__(self, name: str, engine):
+        self.name = name
+        self.engine = engine
+        self.lag = 0.0
+        self.down_until = 0.0
+        self.checked_at = float("-inf")
+        self.check_lock = threading.Lock()
+
+
+class ReplicaSet:
+    def __init__(self, replicas: List[Replica], max_lag: float = 5.0, check_seconds: float = 5.0,
+                 retry_seconds: float = 30.0):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_seconds = check_seconds
+        self.retry_seconds = retry_seconds
+        self._turn = itertools.count()
+
+    def choose(self) -> Optional[Replica]:
+        """
+        Next usable replica in round-robin order, or None to use the primary.
+        """
+        count = len(self.replicas)
+        start = next(self._turn)
+        for i in range(count):
+            replica = self.replicas[(start + i) % count]
+            if self._usable(replica):
+                return replica
+        return None
+
+    def _usable(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if now < replica.down_until:
+            return False
+        # One thread refreshes the lag; the others use the last known value
+        if now - replica.checked_at >= self.check_seconds and replica.check_lock.acquire(blocking=False):
+            try:
+                self._check(replica)
+            finally:
+                replica.check_lock.release()
+        return now >= replica.down_until and replica.lag <= self.max_lag
+
+    def _check(self, replica: Replica) -> None:
+        replica.checked_at = time.monotonic()
+        query = LAG_QUERIES.get(replica.engine.dialect.name, PING)
+        try:
+            with replica.engine.connect() as conn:
+                lag = conn.execute(query).scalar() if query is not PING else None
+        except DBAPIError as e:
+            self.mark_down(replica, e)
+            return
+        replica.lag = float(lag or 0.0)
+        if replica.lag > self.max_lag:
+            logger.warning("Replica lagging, reading from the primary", extra={
+                "replica": replica.name, "lag_seconds": replica.lag,
+            })
+
+    def mark_down(self, replica: Replica, error: Exception) -> None:
+        replica.down_until = time.monotonic() + self.retry_seconds
+        logger.warning("Replica unavailable, reading from the primary", extra={
+            "replica": replica.name, "retry_seconds": self.retry_seconds, "error": str(error),
+        })
+
+
+class RoutingSession(FlaskSession):
+    """
+    Session that sends SELECTs issued inside `replica_read` methods to a
+    replica; see the module docstring for when it keeps them on the primary.
+    """
+
+    _replica_reads = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None:
+            if clause.is_dml:
+                self.info[WROTE] = True
+            elif (
+                self._replica_reads
+                and clause.is_select
+                and getattr(clause, "_for_update_arg", None) is None
+                and not self._flushing
+                and not self.info.get(WROTE)
+                and not self.info.get(PINNED)
+            ):
+                replica = self._replica()
+                if replica is not None:
+                    return replica.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica(self) -> Optional[Replica]:
+        # One replica per transaction, so its reads come from a single snapshot
+        if REPLICA not in self.info:
+            self.info[REPLICA] = current_app.extensions["replicas"].choose()
+        return self.info[REPLICA]
+
+    def read_from_replica(self, read: Callable):
+        if self._replica_reads or "replicas" not in current_app.extensions:
+            return read()
+        self._replica_reads = True
+        try:
+            return read()
+        except OperationalError as e:
+            replica = self.info.pop(REPLICA, None)
+            if replica is None:
+                raise
+            current_app.extensions["replicas"].mark_down(replica, e)
+            # Nothing was written (reads go to replicas only until the first write)
+            self.rollback()
+            self.info[REPLICA] = None
+            return read()
+        finally:
+            self._replica_reads = False
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _flushed(session, flush_context):
+    session.info[WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _transaction_ended(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(REPLICA, None)
+
+
+def _routing_session(session):
+    if isinstance(session, scoped_session):
+        session = session()
+    return session if isinstance(session, RoutingSession) else None
+
+
+def _snapshot():
+    # The snapshot the app serves instead of the database (app.common.snapshot)
+    return current_app.extensions.get("snapshot") if has_app_context() else None
+
+
+def replica_read(method):
+    """
+    Marks a repository read method as safe to serve from a read replica.
+    Generator methods are routed for the statement that starts them. When the
+    app serves a snapshot, the snapshot answers instead.
+    """
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            snapshot = _snapshot()
+            if snapshot is not None:
+                yield from snapshot.read(self.model.__tablename__, method.__name__, *args, **kwargs)
+                return
+            session = _routing_session(self.session)
+            if session is None:
+                yield from method(self, *args, **kwargs)
+                return
+
+            def start():
+                rows = method(self, *args, **kwargs)
+                return rows, next(rows, None)
+
+            rows, first = session.read_from_replica(start)
+            if first is not None:
+                yield first
+                yield from rows
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        snapshot = _snapshot()
+        if snapshot is not None:
+            return snapshot.read(self.model.__tablename__, method.__name__, *args, **kwargs)
+        session = _routing_session(self.session)
+        if session is None:
+            return method(self, *args, **kwargs)
+        return session.read_from_replica(lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
+def mark_written(session) -> None:
+    """
+    Keeps the session's later reads, and the client's next requests, on the primary.
+    """
+    session.info[WROTE] = True
+
+
+def replica_binds(app) -> None:
+    """
+    Registers the replica URLs as binds; must run before `db.init_app`.
+    """
+    binds = dict(app.config.get("SQLALCHEMY_BINDS") or {})
+    for i, url in enumerate(app.config.get("SQLALCHEMY_REPLICA_URIS") or ()):
+        binds[f"{BIND_PREFIX}{i}"] = url
+    app.config["SQLALCHEMY_BINDS"] = binds
+
+
+def configure_replicas(app, db) -> None:
+    replicas = [
+        Replica(key, engine) for key, engine in db.engines.items() if key and key.startswith(BIND_PREFIX)
+    ]
+    if not replicas:
+        return
+    for replica in replicas:
+        # Replicas have no tables of their own; an empty metadata per bind would
+        # make create_all()/drop_all() expect the bind on every app
+        db.metadatas.pop(replica.name, None)
+    app.extensions["replicas"] = ReplicaSet(
+        replicas,
+        max_lag=app.config.get("REPLICA_MAX_LAG_SECONDS", 5.0),
+        check_seconds=app.config.get("REPLICA_CHECK_SECONDS", 5.0),
+        retry_seconds=app.config.get("REPLICA_RETRY_SECONDS", 30.0),
+    )
+    sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 10.0)
+
+    @app.before_request
+    def pin_recent_writers():
+        try:
+            pinned = float(request.cookies.get(COOKIE_NAME, 0)) > time.time()
+        except ValueError:
+            pinned = False
+        if pinned:
+            db.session.info[PINNED] = True
+
+    @app.after_request
+    def remember_writers(response):
+        if db.session.registry.has() and db.session.info.get(WROTE):
+            response.set_cookie(
+                COOKIE_NAME, f"{time.time() + sticky_seconds:.3f}", max_age=int(sticky_seconds) + 1,
+                httponly=True, samesite="Lax",
+            )
+        return response
@@ -0,0 +1,544 @@
+"""
+Read-only catalog snapshots, for public mirrors that serve reads without a
+database.
+
+`write_snapshot` dumps tables into one file laid out for memory-mapping. Per
+table there is an int64 id array in ascending order, one int64 array per
+integer column, and per string column an int64 offsets array into a heap of
+UTF-8 bytes, plus a null mask when the column is nullable. An open-addressing
+hash index covers the table's unique `key` column, if it has one. Relations
+(e.g. an author's papers) are stored as child positions ordered by parent,
+and each parent gets a start and an end into them. A JSON directory at the end
+of the file describes every section.
+
+With `SNAPSHOT_PATH` set, the app serves a snapshot (`configure_snapshot`).
+Repository reads marked `replica_read` are answered by the `SnapshotTable` of
+the repository's table, so they need no database connection. Writes get a
+405. The tables are numpy views over the mapping, and a string is only copied
+when it is decoded for a response. The file is mapped read-only and shared,
+so all workers, forked or not, read the same page-cache pages.
+
+A new snapshot is published by writing it next to the old one and renaming it
+over the old one, which `write_snapshot` does. Workers check the file at most
+every `SNAPSHOT_CHECK_SECONDS` and then switch to the new one. Each request
+reads from a single snapshot from start to finish.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from collections import namedtuple
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from flask import g, has_request_context, request
+
+from app.common.cache import response_cache
+from app.common.error_handler import AppError
+
+MAGIC = b"PPSNAP\x00\x01"
+FORMAT_VERSION = 1
+# Directory offset and length, then the magic again
+FOOTER = struct.Struct("<QQ8s")
+ALIGNMENT = 8
+EMPTY_SLOT = -1
+
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    A table to snapshot: `columns` are SQLAlchemy columns (integer or string),
+    including the `id` primary key. `key` names a unique string column to
+    hash-index, served as `get_by_<key>` and `get_by_<key>s`.
+    """
+
+    name: str
+    columns: Sequence[Any]
+    key: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class RelationSpec:
+    """
+    Children of `child` whose `foreign_key` points at a row of `parent`. Parent
+    records get them as the `attribute` list (in id order), and the parent
+    table serves `counts` (child rows per parent id).
+    """
+
+    parent: str
+    child: str
+    foreign_key: str
+    attribute: str
+    counts: str
+
+
+def key_hash(value: bytes) -> int:
+    # Stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(value, digest_size=8).digest(), "little")
+
+
+def _is_integer(column) -> bool:
+    python_type = column.type.python_type
+    if python_type not in (int, str):
+        raise ValueError(f"{column}: only integer and string columns can be snapshotted")
+    return python_type is int
+
+
+class _SectionWriter:
+    def __init__(self, out, sections: Dict[str, list]):
+        self.out = out
+        self.sections = sections
+
+    def _start(self) -> int:
+        padding = -self.out.tell() % ALIGNMENT
+        self.out.write(b"\0" * padding)
+        return self.out.tell()
+
+    def array(self, name: str, values: np.ndarray) -> None:
+        offset = self._start()
+        self.out.write(np.ascontiguousarray(values).tobytes())
+        self.sections[name] = [offset, len(values), values.dtype.str]
+
+    def file(self, name: str, source, length: int) -> None:
+        offset = self._start()
+        source.seek(0)
+        shutil.copyfileobj(source, self.out)
+        self.sections[name] = [offset, length, "|u1"]
+
+
+class _StringColumnWriter:
+    """
+    Offsets and null mask in memory, the heap spooled to a temporary file.
+    """
+
+    def __init__(self, nullable: bool):
+        self.offsets = array("q", [0])
+        self.nulls = bytearray() if nullable else None
+        self.heap = tempfile.TemporaryFile()
+        self.size = 0
+
+    def append(self, value: Optional[str]) -> bytes:
+        data = value.encode() if value is not None else b""
+        if self.nulls is not None:
+            self.nulls.append(value is None)
+        self.heap.write(data)
+        self.size += len(data)
+        self.offsets.append(self.size)
+        return data
+
+    def write(self, sections: _SectionWriter, name: str) -> None:
+        sections.array(f"{name}.offsets", np.frombuffer(self.offsets, dtype=np.int64))
+        sections.file(f"{name}.heap", self.heap, self.size)
+        if self.nulls is not None:
+            sections.array(f"{name}.nulls", np.frombuffer(bytes(self.nulls), dtype=np.bool_))
+        self.heap.close()
+
+
+def _hash_index(hashes: np.ndarray) -> np.ndarray:
+    """
+    Open-addressing table (linear probing, at most half full) of row positions.
+    """
+    size = 1 << max(3, int(2 * max(len(hashes), 1) - 1).bit_length())
+    mask = size - 1
+    slots = [EMPTY_SLOT] * size
+    for position, value in enumerate(hashes.tolist()):
+        slot = value & mask
+        while slots[slot] != EMPTY_SLOT:
+            slot = (slot + 1) & mask
+        slots[slot] = position
+    return np.array(slots, dtype=np.int64)
+
+
+def write_snapshot(
+    path: str,
+    tables: Sequence[Tuple[TableSpec, Iterable[Sequence]]],
+    relations: Sequence[RelationSpec] = (),
+) -> None:
+    """
+    Writes `tables` to `path`, each from its batches of rows in ascending id
+    order (as `BaseRepository.stream_rows` yields them). The file is built
+    under a temporary name and renamed into place, so readers only ever see a
+    complete snapshot.
+    """
+    directory: Dict[str, Any] = {"format": FORMAT_VERSION, "created_at": time.time(), "tables": {}, "relations": []}
+    sections: Dict[str, list] = {}
+    directory["sections"] = sections
+    integers: Dict[str, Dict[str, np.ndarray]] = {}
+
+    target_dir = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix=".snapshot-", dir=target_dir)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            out.write(MAGIC)
+            writer = _SectionWriter(out, sections)
+            for spec, batches in tables:
+                names = [column.name for column in spec.columns]
+                if "id" not in names:
+                    raise ValueError(f"{spec.name}: the columns must include id")
+                int_values = {
+                    column.name: array("q") for column in spec.columns if _is_integer(column)
+                }
+                strings = {
+                    column.name: _StringColumnWriter(column.nullable)
+                    for column in spec.columns if column.name not in int_values
+                }
+                hashes = array("Q")
+                rows = 0
+                for batch in batches:
+                    for row in batch:
+                        values = row._mapping
+                        for name, column_values in int_values.items():
+                            column_values.append(values[name])
+                        for name, column in strings.items():
+                            data = column.append(values[name])
+                            if name == spec.key:
+                                hashes.append(key_hash(data))
+                        rows += 1
+
+                arrays = {name: np.frombuffer(values, dtype=np.int64) for name, values in int_values.items()}
+                if np.any(np.diff(arrays["id"]) <= 0):
+                    raise ValueError(f"{spec.name}: rows must come in ascending id order")
+                for name, values in arrays.items():
+                    writer.array(f"{spec.name}.{name}", values)
+                for name, column in strings.items():
+                    column.write(writer, f"{spec.name}.{name}")
+                if spec.key is not None:
+                    writer.array(f"{spec.name}.{spec.key}.index", _hash_index(np.frombuffer(hashes, dtype=np.uint64)))
+                integers[spec.name] = arrays
+                directory["tables"][spec.name] = {
+                    "rows": rows,
+                    "columns": names,
+                    "strings": {name: column.nulls is not None for name, column in strings.items()},
+                    "key": spec.key,
+                }
+
+            for relation in relations:
+                foreign_keys = integers[relation.child][relation.foreign_key]
+                # Stable, so each parent's children stay in id order
+                order = np.argsort(foreign_keys, kind="stable")
+                grouped = foreign_keys[order]
+                parent_ids = integers[relation.parent]["id"]
+                name = f"{relation.parent}.{relation.attribute}"
+                writer.array(f"{name}.children", order.astype(np.int64))
+                writer.array(f"{name}.starts", np.searchsorted(grouped, parent_ids, side="left").astype(np.int64))
+                writer.array(f"{name}.ends", np.searchsorted(grouped, parent_ids, side="right").astype(np.int64))
+                directory["relations"].append(asdict(relation))
+
+            encoded = json.dumps(directory).encode()
+            directory_offset = out.tell()
+            out.write(encoded)
+            out.write(FOOTER.pack(directory_offset, len(encoded), MAGIC))
+            out.flush()
+            os.fsync(out.fileno())
+        os.chmod(temporary, 0o644)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+        raise
+
+
+@lru_cache(maxsize=None)
+def _row_type(names: Tuple[str, ...]):
+    return namedtuple("SnapshotRow", names)
+
+
+class _StringColumn:
+    def __init__(self, view: memoryview, offsets: np.ndarray, heap_offset: int, nulls: Optional[np.ndarray]):
+        self.view = view
+        self.offsets = offsets
+        self.heap_offset = heap_offset
+        self.nulls = nulls
+
+    def raw(self, position: int) -> memoryview:
+        start = self.heap_offset + int(self.offsets[position])
+        return self.view[start:self.heap_offset + int(self.offsets[position + 1])]
+
+    def value(self, position: int) -> Optional[str]:
+        if self.nulls is not None and self.nulls[position]:
+            return None
+        # Decodes straight from the mapping
+        return str(self.raw(position), "utf-8")
+
+
+class _IntColumn:
+    def __init__(self, values: np.ndarray):
+        self.values = values
+
+    def value(self, position: int) -> int:
+        return int(self.values[position])
+
+
+class SnapshotRecord:
+    """
+    A row of a snapshot table; columns and relations are read on access.
+    """
+
+    __slots__ = ("_table", "_position")
+
+    def __init__(self, table: "SnapshotTable", position: int):
+        self._table = table
+        self._position = position
+
+    def __getattr__(self, name: str):
+        table = object.__getattribute__(self, "_table")
+        position = object.__getattribute__(self, "_position")
+        if name in table.columns:
+            return table.columns[name].value(position)
+        if name in table.relations:
+            return table.relations[name](position)
+        raise AttributeError(name)
+
+
+class SnapshotTable:
+    """
+    A snapshot table, answering the read methods of `BaseRepository` (and the
+    key and relation lookups described by the file) from the mapping. Loader
+    options are accepted and ignored: every column and relation is at hand.
+    """
+
+    def __init__(self, snapshot: "Snapshot", name: str, meta: dict):
+        self.name = name
+        self.rows = meta["rows"]
+        self.ids = snapshot.section(f"{name}.id")
+        self.columns: Dict[str, Any] = {}
+        for column in meta["columns"]:
+            if column in meta["strings"]:
+                offsets_name = f"{name}.{column}.offsets"
+                self.columns[column] = _StringColumn(
+                    snapshot.view,
+                    snapshot.section(offsets_name),
+                    snapshot.offset(f"{name}.{column}.heap"),
+                    snapshot.section(f"{name}.{column}.nulls") if meta["strings"][column] else None,
+                )
+            else:
+                self.columns[column] = _IntColumn(snapshot.section(f"{name}.{column}"))
+        self.relations: Dict[str, Callable[[int], List[SnapshotRecord]]] = {}
+
+        self.key = meta["key"]
+        if self.key is not None:
+            self.key_index = snapshot.section(f"{name}.{self.key}.index")
+            setattr(self, f"get_by_{self.key}", self.get_by_key)
+            setattr(self, f"get_by_{self.key}s", self.get_by_keys)
+
+    def add_relation(self, snapshot: "Snapshot", relation: dict, child: "SnapshotTable") -> None:
+        prefix = f"{self.name}.{relation['attribute']}"
+        children = snapshot.section(f"{prefix}.children")
+        starts = snapshot.section(f"{prefix}.starts")
+        ends = snapshot.section(f"{prefix}.ends")
+
+        def related(position: int) -> List[SnapshotRecord]:
+            return [SnapshotRecord(child, int(p)) for p in children[starts[position]:ends[position]]]
+
+        def counts(ids: Iterable[int]) -> Dict[int, int]:
+            found = {}
+            for id, position in self._positions(ids).items():
+                count = int(ends[position] - starts[position])
+                if count:
+                    found[id] = count
+            return found
+
+        self.relations[relation["attribute"]] = related
+        setattr(self, relation["counts"], counts)
+
+    def _position(self, id: int) -> Optional[int]:
+        position = int(np.searchsorted(self.ids, id))
+        if position < self.rows and self.ids[position] == id:
+            return position
+        return None
+
+    def _positions(self, ids: Iterable[int]) -> Dict[int, int]:
+        wanted = np.fromiter(set(ids), dtype=np.int64)
+        positions = np.searchsorted(self.ids, wanted)
+        found = {}
+        for id, position in zip(wanted.tolist(), positions.tolist()):
+            if position < self.rows and self.ids[position] == id:
+                found[id] = position
+        return found
+
+    def get_by_id(self, id: int, options: Iterable = ()) -> Optional[SnapshotRecord]:
+        position = self._position(id)
+        return SnapshotRecord(self, position) if position is not None else None
+
+    def get_by_ids(self, ids: Iterable[int], options: Iterable = ()) -> Dict[int, SnapshotRecord]:
+        return {id: SnapshotRecord(self, position) for id, position in self._positions(ids).items()}
+
+    def _descending(self, end: int, count: int) -> List[int]:
+        return list(range(end - 1, max(end - count, 0) - 1, -1))
+
+    def _end(self, after: Optional[int]) -> int:
+        return int(np.searchsorted(self.ids, after, side="left")) if after is not None else self.rows
+
+    def get_all(self, limit: int = 100, offset: int = 0) -> List[SnapshotRecord]:
+        return [SnapshotRecord(self, p) for p in self._descending(max(self.rows - offset, 0), limit)]
+
+    def get_page(
+        self, limit: int = 100, after: Optional[int] = None, options: Iterable = ()
+    ) -> Tuple[List[SnapshotRecord], Optional[int]]:
+        positions = self._descending(self._end(after), limit + 1)
+        records = [SnapshotRecord(self, p) for p in positions[:limit]]
+        return records, (records[-1].id if len(positions) > limit else None)
+
+    def _rows(self, columns: List, positions: Iterable[int]) -> list:
+        names = tuple(column.name for column in columns)
+        row_type = _row_type(names)
+        readers = [self.columns[name].value for name in names]
+        return [row_type(*(read(p) for read in readers)) for p in positions]
+
+    def get_page_rows(self, columns: List, limit: int = 100, after: Optional[int] = None) -> Tuple[list, Optional[int]]:
+        positions = self._descending(self._end(after), limit + 1)
+        rows = self._rows(columns, positions[:limit])
+        return rows, (rows[-1].id if len(positions) > limit else None)
+
+    def stream_rows(self, columns: List, batch_size: int = 5000) -> Iterator[list]:
+        for start in range(0, self.rows, batch_size):
+            yield self._rows(columns, range(start, min(start + batch_size, self.rows)))
+
+    def estimate_count(self) -> int:
+        return self.rows
+
+    def _key_position(self, value: str) -> Optional[int]:
+        data = value.encode()
+        mask = len(self.key_index) - 1
+        slot = key_hash(data) & mask
+        column = self.columns[self.key]
+        while True:
+            position = int(self.key_index[slot])
+            if position == EMPTY_SLOT:
+                return None
+            if column.raw(position) == data:
+                return position
+            slot = (slot + 1) & mask
+
+    def get_by_key(self, value: str) -> Optional[SnapshotRecord]:
+        position = self._key_position(value)
+        return SnapshotRecord(self, position) if position is not None else None
+
+    def get_by_keys(self, values: Iterable[str]) -> Dict[str, SnapshotRecord]:
+        found = {}
+        for value in set(values):
+            position = self._key_position(value)
+            if position is not None:
+                found[value] = SnapshotRecord(self, position)
+        return found
+
+
+class Snapshot:
+    """
+    An open snapshot file. It stays mapped while anything references it, so
+    requests still reading a replaced snapshot finish on it.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.identity = _file_identity(os.fstat(f.fileno()))
+            self.mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mapping)
+        if len(self.mapping) < len(MAGIC) + FOOTER.size or self.view[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+        directory_offset, directory_length, magic = FOOTER.unpack_from(self.mapping, len(self.mapping) - FOOTER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is truncated")
+        directory = json.loads(bytes(self.view[directory_offset:directory_offset + directory_length]))
+        if directory["format"] != FORMAT_VERSION:
+            raise ValueError(f"{path} has snapshot format {directory['format']}, expected {FORMAT_VERSION}")
+        self.created_at = directory["created_at"]
+        self.sections = directory["sections"]
+        self.tables = {name: SnapshotTable(self, name, meta) for name, meta in directory["tables"].items()}
+        for relation in directory["relations"]:
+            self.tables[relation["parent"]].add_relation(self, relation, self.tables[relation["child"]])
+
+    def offset(self, name: str) -> int:
+        return self.sections[name][0]
+
+    def section(self, name: str) -> np.ndarray:
+        offset, count, dtype = self.sections[name]
+        # A read-only view of the mapping, not a copy
+        return np.frombuffer(self.mapping, dtype=np.dtype(dtype), count=count, offset=offset)
+
+
+def _file_identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return stat.st_dev, stat.st_ino, stat.st_mtime_ns
+
+
+class SnapshotStore:
+    """
+    The snapshot an app serves, switched to a newly published file within
+    `check_seconds`. `on_swap` runs after each switch.
+    """
+
+    def __init__(self, path: str, check_seconds: float = 5.0, on_swap: Optional[Callable[[Snapshot], None]] = None):
+        self.path = path
+        self.check_seconds = check_seconds
+        self.on_swap = on_swap
+        self.snapshot = Snapshot(path)
+        self.checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def current(self) -> Snapshot:
+        if time.monotonic() - self.checked_at >= self.check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self._check()
+            finally:
+                self._lock.release()
+        return self.snapshot
+
+    def _check(self) -> None:
+        self.checked_at = time.monotonic()
+        try:
+            identity = _file_identity(os.stat(self.path))
+        except FileNotFoundError:
+            return
+        if identity == self.snapshot.identity:
+            return
+        snapshot = Snapshot(self.path)
+        # A single assignment: requests see the old snapshot or the new one
+        self.snapshot = snapshot
+        if self.on_swap is not None:
+            self.on_swap(snapshot)
+
+    def read(self, table: str, method: str, *args, **kwargs):
+        """
+        Answers a repository read method from the request's snapshot.
+        """
+        if has_request_context():
+            if "snapshot" not in g:
+                g.snapshot = self.current()
+            snapshot = g.snapshot
+        else:
+            snapshot = self.current()
+        handler = getattr(snapshot.tables.get(table), method, None)
+        if handler is None:
+            raise AppError(f"{table}.{method} is not served from the snapshot", 503)
+        return handler(*args, **kwargs)
+
+
+def configure_snapshot(app) -> None:
+    """
+    Serves the snapshot at `SNAPSHOT_PATH` instead of the database, read-only.
+    Opened here, so workers forked from this process share the mapping.
+    """
+
+    def invalidate(snapshot: Snapshot) -> None:
+        for table in snapshot.tables:
+            response_cache.invalidate(table)
+
+    app.extensions["snapshot"] = SnapshotStore(
+        app.config["SNAPSHOT_PATH"], check_seconds=app.config.get("SNAPSHOT_CHECK_SECONDS", 5.0), on_swap=invalidate
+    )
+
+    @app.before_request
+    def reject_writes():
+        if request.method not in READ_METHODS:
+            raise AppError("This server serves a read-only snapshot", 405)
@@ -0,0 +1,228 @@
+"""
+In-process BM25 keyword index.
+
+Postings are compact typed arrays (doc numbers as int32, term frequencies as
+uint16, and each occurrence's token position as uint32) appended in doc-number
+order, so adding a document never reorders anything. Scoring converts the
+postings of the query terms to NumPy views and accumulates per-term BM25
+contributions with bincount before a top-k selection. Phrases are matched on
+the positions, by intersecting (doc, start position) keys of their terms.
+"""
+
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+PHRASE_RE = re.compile(r'"([^"]+)"')
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has in is it its of on or that the this to was were with".split()
+)
+
+# Occurrences of a term kept per document (term frequencies are uint16)
+MAX_TF = 0xFFFF
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token for token in TOKEN_RE.findall((text or "").lower()) if token not in STOPWORDS]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Splits a query into free terms and quoted phrases (each a token list).
+    """
+    phrases = [tokenize(phrase) for phrase in PHRASE_RE.findall(query)]
+    terms = tokenize(PHRASE_RE.sub(" ", query))
+    return terms, [phrase for phrase in phrases if phrase]
+
+
+class _Postings:
+    __slots__ = ("docs", "tfs", "positions")
+
+    def __init__(self):
+        self.docs = array("i")
+        self.tfs = array("H")
+        # `tfs[i]` positions per doc, in posting order
+        self.positions = array("I")
+
+
+class InvertedIndex:
+    """
+    BM25 index over documents identified by external integer ids.
+    Re-adding an id replaces the document; removed documents stay in the
+    postings as tombstones until `compact` rebuilds them.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, _Postings] = {}
+        self._ids = array("q")
+        self._lengths = array("i")
+        self._live = bytearray()
+        self._doc_of: Dict[int, int] = {}
+        self._total_length = 0
+        # Views handed to NumPy during a search pin the arrays; appends must wait
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_of)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._doc_of
+
+    def add(self, id: int, text: str) -> None:
+        tokens = tokenize(text)
+        positions: Dict[str, List[int]] = {}
+        for position, term in enumerate(tokens):
+            positions.setdefault(term, []).append(position)
+        with self._lock:
+            self._remove(id)
+            doc = len(self._ids)
+            for term, term_positions in positions.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = _Postings()
+                postings.docs.append(doc)
+                postings.tfs.append(min(len(term_positions), MAX_TF))
+                postings.positions.extend(term_positions[:MAX_TF])
+            length = len(tokens)
+            self._ids.append(id)
+            self._lengths.append(length)
+            self._live.append(1)
+            self._doc_of[id] = doc
+            self._total_length += length
+
+    def remove(self, id: int) -> None:
+        with self._lock:
+            self._remove(id)
+
+    def _remove(self, id: int) -> None:
+        doc = self._doc_of.pop(id, None)
+        if doc is not None:
+            self._live[doc] = 0
+            self._total_length -= self._lengths[doc]
+
+    @property
+    def tombstones(self) -> int:
+        return len(self._ids) - len(self._doc_of)
+
+    def compact(self) -> None:
+        """
+        Rebuilds postings without removed documents, renumbering the live ones.
+        """
+        with self._lock:
+            live = np.frombuffer(bytes(self._live), dtype=np.uint8).astype(bool)
+            renumber = np.cumsum(live, dtype=np.int64) - 1
+            for term in list(self._postings):
+                postings = self._postings[term]
+                docs = np.frombuffer(postings.docs, dtype=np.int32)
+                keep = live[docs]
+                if not keep.any():
+                    del self._postings[term]
+                    continue
+                tfs = np.frombuffer(postings.tfs, dtype=np.uint16)
+                new = _Postings()
+                new.docs = array("i", renumber[docs[keep]].astype(np.int32).tobytes())
+                new.tfs = array("H", tfs[keep].tobytes())
+                new.positions = array("I", np.frombuffer(postings.positions, dtype=np.uint32)[np.repeat(keep, tfs)].tobytes())
+                self._postings[term] = new
+            ids = np.frombuffer(self._ids, dtype=np.int64)[live]
+            self._ids = array("q", ids.tobytes())
+            self._lengths = array("i", np.frombuffer(self._lengths, dtype=np.int32)[live].tobytes())
+            self._live = bytearray(b"\x01" * len(ids))
+            self._doc_of = {int(id): doc for doc, id in enumerate(ids)}
+
+    def _score_term(self, postings: _Postings, lengths, live, live_docs: int, avg_length: float, doc_count: int):
+        # The buffer views must not outlive the lock (appends would fail), so they stay local here
+        docs = np.frombuffer(postings.docs, dtype=np.int32)
+        tfs = np.frombuffer(postings.tfs, dtype=np.uint16).astype(np.float32)
+        # Replaced and removed documents are still in the postings; they must not count
+        df = np.count_nonzero(live[docs])
+        idf = np.log(1.0 + (live_docs - df + 0.5) / (df + 0.5))
+        norm = self.k1 * (1.0 - self.b + self.b * lengths[docs] / avg_length)
+        return np.bincount(docs, weights=idf * tfs * (self.k1 + 1.0) / (tfs + norm), minlength=doc_count)
+
+    def _phrase_docs(self, phrase: Sequence[str], doc_count: int) -> np.ndarray:
+        """
+        Which docs contain the terms of `phrase` at consecutive positions.
+        """
+        found = np.zeros(doc_count, dtype=bool)
+        starts = None
+        for offset, term in enumerate(phrase):
+            postings = self._postings.get(term)
+            if postings is None:
+                return found
+            docs = np.frombuffer(postings.docs, dtype=np.int32).astype(np.int64)
+            tfs = np.frombuffer(postings.tfs, dtype=np.uint16)
+            positions = np.frombuffer(postings.positions, dtype=np.uint32).astype(np.int64)
+            # Where the phrase would start if this occurrence is its `offset`-th term;
+            # postings are in doc order with ascending positions, so keys come sorted
+            keys = (np.repeat(docs, tfs) << 32) | (positions - offset)
+            keys = keys[positions >= offset]
+            if starts is None:
+                starts = keys
+            elif len(keys):
+                at = np.minimum(np.searchsorted(keys, starts), len(keys) - 1)
+                starts = starts[keys[at] == starts]
+            else:
+                return found
+            if not len(starts):
+                return found
+        found[starts >> 32] = True
+        return found
+
+    def search(
+        self,
+        terms: Iterable[str],
+        k: int,
+        required: Iterable[str] = (),
+        phrases: Iterable[Sequence[str]] = (),
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-k (id, BM25 score) for the union of `terms` and `required`.
+        Documents must contain every `required` term and every one of `phrases`
+        (token lists, whose terms should be in `required` to count towards the score).
+        """
+        required = set(required)
+        query_terms = set(terms) | required
+        if not query_terms or not self._doc_of:
+            return []
+
+        with self._lock:
+            doc_count = len(self._ids)
+            live_docs = len(self._doc_of)
+            avg_length = max(self._total_length / live_docs, 1e-9)
+            lengths = np.frombuffer(self._lengths, dtype=np.int32).astype(np.float32)
+            live = np.frombuffer(bytes(self._live), dtype=np.uint8).astype(bool)
+
+            scores = np.zeros(doc_count, dtype=np.float64)
+            matched_required = np.zeros(doc_count, dtype=np.int32)
+            for term in query_terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    if term in required:
+                        return []
+                    continue
+                scores += self._score_term(postings, lengths, live, live_docs, avg_length, doc_count)
+                if term in required:
+                    matched_required[np.frombuffer(postings.docs, dtype=np.int32)] += 1
+
+            mask = live & (scores > 0)
+            if required:
+                mask &= matched_required == len(required)
+            for phrase in phrases:
+                mask &= self._phrase_docs(phrase, doc_count)
+            candidates = np.flatnonzero(mask)
+            ids = np.frombuffer(self._ids, dtype=np.int64)[candidates]
+            candidate_scores = scores[candidates]
+
+        if len(candidates) > k:
+            top = np.argpartition(-candidate_scores, k - 1)[:k]
+            ids, candidate_scores = ids[top], candidate_scores[top]
+        order = np.argsort(-candidate_scores, kind="stable")
+        return [(int(ids[i]), float(candidate_scores[i])) for i in order[:k]]
@@ -0,0 +1,259 @@
+"""
+In-process nearest-neighbour indexes over L2-normalized float32 vectors.
+
+Scores are cosine similarities (dot products of unit vectors). Both indexes
+take a batch of queries and return `(ids, scores)` arrays of shape (queries, k),
+best match first.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Rows scored per matrix product; bounds the (queries x rows) score buffer.
+SEARCH_BLOCK_ROWS = 262144
+
+
+def normalize(vectors) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unsorted top-k columns per row via argpartition; O(n) instead of a full sort.
+    """
+    if k >= scores.shape[1]:
+        columns = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+        return np.array(columns), scores
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return columns, np.take_along_axis(scores, columns, axis=1)
+
+
+def _sorted(ids: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(ids, order, axis=1), np.take_along_axis(scores, order, axis=1)
+
+
+def _empty(queries: int) -> Tuple[np.ndarray, np.ndarray]:
+    return np.empty((queries, 0), dtype=np.int64), np.empty((queries, 0), dtype=np.float32)
+
+
+class ExactVectorIndex:
+    """
+    Brute-force index: one contiguous (capacity x dim) float32 matrix, grown by
+    doubling so appends are amortized O(1). Search is a blocked matrix product
+    followed by argpartition, so it is exact and memory-bounded.
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 1024):
+        self.dim = dim
+        self._vectors = np.empty((initial_capacity, dim), dtype=np.float32)
+        self._ids = np.empty(initial_capacity, dtype=np.int64)
+        self._positions: Dict[int, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._positions
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[: self._size]
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self._ids[: self._size]
+
+    def _reserve(self, size: int) -> None:
+        capacity = len(self._ids)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        ids = np.empty(capacity, dtype=np.int64)
+        ids[: self._size] = self._ids[: self._size]
+        self._vectors, self._ids = vectors, ids
+
+    def add(self, ids: Sequence[int], vectors) -> None:
+        """
+        Adds vectors, replacing the stored vector of ids already present.
+        """
+        vectors = normalize(vectors)
+        self._reserve(self._size + len(ids))
+        for id, vector in zip(ids, vectors):
+            position = self._positions.get(int(id))
+            if position is None:
+                position = self._size
+                self._positions[int(id)] = position
+                self._ids[position] = id
+                self._size += 1
+            self._vectors[position] = vector
+
+    def remove(self, ids: Sequence[int]) -> None:
+        """
+        Swap-with-last removal keeps the matrix dense.
+        """
+        for id in ids:
+            position = self._positions.pop(int(id), None)
+            if position is None:
+                continue
+            last = self._size - 1
+            if position != last:
+                moved_id = int(self._ids[last])
+                self._vectors[position] = self._vectors[last]
+                self._ids[position] = moved_id
+                self._positions[moved_id] = position
+            self._size -= 1
+
+    def search(self, queries, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        queries = normalize(queries)
+        if self._size == 0 or k <= 0:
+            return _empty(len(queries))
+
+        best_rows: Optional[np.ndarray] = None
+        best_scores: Optional[np.ndarray] = None
+        for start in range(0, self._size, SEARCH_BLOCK_ROWS):
+            block = self._vectors[start : min(start + SEARCH_BLOCK_ROWS, self._size)]
+            rows, scores = _top_k(queries @ block.T, min(k, len(block)))
+            rows = rows + start
+            if best_rows is None:
+                best_rows, best_scores = rows, scores
+            else:
+                merged_rows = np.concatenate([best_rows, rows], axis=1)
+                merged_scores = np.concatenate([best_scores, scores], axis=1)
+                columns, best_scores = _top_k(merged_scores, min(k, merged_scores.shape[1]))
+                best_rows = np.take_along_axis(merged_rows, columns, axis=1)
+
+        return _sorted(self._ids[best_rows], best_scores)
+
+
+class IVFVectorIndex:
+    """
+    Inverted-file approximate index: vectors are partitioned into `nlist` cells
+    by spherical k-means, and a query only scans its `nprobe` closest cells.
+    Each cell is an ExactVectorIndex. Until `train` is called everything lives
+    in a single exact cell, so small catalogs get exact results.
+    """
+
+    def __init__(self, dim: int, nlist: int = 1024, nprobe: int = 16, seed: int = 0):
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._untrained = ExactVectorIndex(dim)
+        self._cells: List[ExactVectorIndex] = []
+        self._cell_of: Dict[int, int] = {}
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        if not self.is_trained:
+            return len(self._untrained)
+        return len(self._cell_of)
+
+    @property
+    def ids(self) -> np.ndarray:
+        if not self.is_trained:
+            return self._untrained.ids
+        return np.fromiter(self._cell_of, dtype=np.int64, count=len(self._cell_of))
+
+    def train(self, sample_size: int = 100000, iterations: int = 10) -> None:
+        """
+        Learns centroids from a sample of the stored vectors and redistributes
+        every stored vector into its cell.
+        """
+        vectors, ids = self._all()
+        if len(vectors) < self.nlist:
+            return
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.nlist)
+            empty = counts == 0
+            # Re-seed empty cells from random sample points
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize(sums)
+
+        self.centroids = centroids
+        self._cells = [ExactVectorIndex(self.dim, initial_capacity=16) for _ in range(self.nlist)]
+        self._cell_of = {}
+        self._untrained = ExactVectorIndex(self.dim)
+        self.add(ids, vectors)
+
+    def _all(self) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_trained:
+            return self._untrained.vectors.copy(), self._untrained.ids.copy()
+        cells = [cell for cell in self._cells if len(cell)]
+        if not cells:
+            return np.empty((0, self.dim), dtype=np.float32), np.empty(0, dtype=np.int64)
+        return np.concatenate([c.vectors for c in cells]), np.concatenate([c.ids for c in cells])
+
+    def add(self, ids: Sequence[int], vectors) -> None:
+        if not self.is_trained:
+            self._untrained.add(ids, vectors)
+            return
+        vectors = normalize(vectors)
+        assignment = np.argmax(vectors @ self.centroids.T, axis=1)
+        for cell_index in np.unique(assignment):
+            members = np.flatnonzero(assignment == cell_index)
+            member_ids = [int(ids[i]) for i in members]
+            for id in member_ids:
+                previous = self._cell_of.get(id)
+                if previous is not None and previous != cell_index:
+                    self._cells[previous].remove([id])
+                self._cell_of[id] = int(cell_index)
+            self._cells[cell_index].add(member_ids, vectors[members])
+
+    def remove(self, ids: Sequence[int]) -> None:
+        if not self.is_trained:
+            self._untrained.remove(ids)
+            return
+        for id in ids:
+            cell_index = self._cell_of.pop(int(id), None)
+            if cell_index is not None:
+                self._cells[cell_index].remove([id])
+
+    def search(self, queries, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if not self.is_trained:
+            return self._untrained.search(queries, k)
+        queries = normalize(queries)
+        nprobe = min(self.nprobe, self.nlist)
+        probes = np.argpartition(-(queries @ self.centroids.T), nprobe - 1, axis=1)[:, :nprobe]
+
+        all_ids, all_scores = [], []
+        for query, cells in zip(queries, probes):
+            ids, scores = [], []
+            for cell_index in cells:
+                cell_ids, cell_scores = self._cells[cell_index].search(query, k)
+                ids.append(cell_ids[0])
+                scores.append(cell_scores[0])
+            ids, scores = np.concatenate(ids), np.concatenate(scores)
+            order = np.argsort(-scores, kind="stable")[:k]
+            all_ids.append(ids[order])
+            all_scores.append(scores[order])
+
+        width = max((len(ids) for ids in all_ids), default=0)
+        if any(len(ids) != width for ids in all_ids):
+            # Pad short rows (sparse probes) so results stay rectangular
+            all_ids = [np.pad(ids, (0, width - len(ids)), constant_values=-1) for ids in all_ids]
+            all_scores = [np.pad(s, (0, width - len(s)), constant_values=-np.inf) for s in all_scores]
+        return np.array(all_ids, dtype=np.int64).reshape(len(queries), width), np.array(
+            all_scores, dtype=np.float32
+        ).reshape(len(queries), width)
@@ -0,0 +1,23 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, select
+from app.common.async_base_repository import AsyncBaseRepository
+from app.common.base_repository import chunked
+from app.modules.authors.models import Author
+from app.modules.papers.models import Paper
+
+
+class AsyncAuthorRepository(AsyncBaseRepository[Author]):
+    def __init__(self):
+        super().__init__(Author)
+
+    async def get_by_email(self, email: str) -> Optional[Author]:
+        return await self.session.scalar(select(Author).filter_by(email=email).limit(1))
+
+    async def paper_counts(self, author_ids: Iterable[int]) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        for chunk in chunked(list(set(author_ids))):
+            rows = await self.session.execute(
+                select(Paper.author_id, func.count()).where(Paper.author_id.in_(chunk)).group_by(Paper.author_id)
+            )
+            counts.update((author_id, count) for author_id, count in rows)
+        return counts
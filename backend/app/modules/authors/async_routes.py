@@ -0,0 +1,46 @@
+from quart import Blueprint, Response, current_app, jsonify, request
+from app.modules.authors.async_service import AsyncAuthorService
+from app.modules.authors.service import AUTHOR_FIELDS, AUTHOR_INCLUDES, AUTHOR_LIST_FIELDS
+from app.modules.authors.schemas import AuthorCreateDTO, AuthorDetailResponseDTO, AuthorResponseDTO
+from app.common.pagination import parse_fields, parse_include, parse_keys, parse_page_args, set_page_headers
+from app.common.serialization import dump_json, projection
+from pydantic import ValidationError
+
+authors_bp = Blueprint("authors", __name__)
+service = AsyncAuthorService()
+
+
+@authors_bp.route("/", methods=["POST"])
+async def create_author():
+    try:
+        data = await request.get_json()
+        dto = AuthorCreateDTO(**data)
+        result = await service.create_author(dto)
+        return jsonify(result.model_dump()), 201
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+
+
+@authors_bp.route("/<int:id>", methods=["GET"])
+async def get_author(id):
+    result = await service.get_author(id, include=parse_include(request.args, AUTHOR_INCLUDES))
+    return jsonify(result.model_dump(exclude_unset=True)), 200
+
+
+@authors_bp.route("/", methods=["GET"])
+async def get_authors():
+    include = parse_include(request.args, AUTHOR_INCLUDES)
+    if "ids" in request.args:
+        ids = parse_keys(request.args, "ids", current_app.config["LOOKUP_MAX_KEYS"], int)
+        return jsonify((await service.get_authors(ids, include=include)).model_dump(exclude_unset=True)), 200
+    limit, after, include_total = parse_page_args(request.args)
+    fields = parse_fields(request.args, AUTHOR_FIELDS, AUTHOR_LIST_FIELDS)
+    page = await service.get_all_authors(
+        limit=limit, after=after, include_total=include_total, include=include, fields=fields
+    )
+    if include:
+        body = dump_json(page.items, AuthorDetailResponseDTO, exclude_unset=True)
+    else:
+        body = dump_json(page.items, projection(AuthorResponseDTO, fields))
+    response = Response(body, mimetype="application/json")
+    return set_page_headers(response, page), 200
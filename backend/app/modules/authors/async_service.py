@@ -0,0 +1,85 @@
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy.orm import load_only
+from app.modules.authors.async_repository import AsyncAuthorRepository
+from app.modules.authors.models import Author
+from app.modules.authors.schemas import AuthorCreateDTO, AuthorResponseDTO
+from app.modules.authors.service import AUTHOR_LIST_FIELDS, author_lookup, loader_options, with_includes
+from app.common.error_handler import AppError
+from app.common.pagination import DEFAULT_PAGE_SIZE, Lookup, Page, decode_cursor, encode_cursor
+from app.common.serialization import dto_columns, projection
+from pydantic import ValidationError
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthorService:
+    """
+    `AuthorService` for the async app; responses are identical.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository or AsyncAuthorRepository()
+
+    async def create_author(self, data: AuthorCreateDTO) -> AuthorResponseDTO:
+        author, created = await self.repository.get_or_create("email", **data.model_dump())
+        if not created:
+            raise AppError("Author with this email already exists", 409)
+        return AuthorResponseDTO.model_validate(author)
+
+    async def get_author(self, author_id: int, include: AbstractSet[str] = frozenset()) -> AuthorResponseDTO:
+        author = await self.repository.get_by_id(author_id, options=loader_options(include))
+        if not author:
+            raise AppError("Author not found", 404)
+        dto = AuthorResponseDTO.model_validate(author)
+        return with_includes(author, dto, include, await self._paper_counts([author], include))
+
+    async def get_authors(
+        self, author_ids: List[int], include: AbstractSet[str] = frozenset()
+    ) -> Lookup[int, AuthorResponseDTO]:
+        authors = await self.repository.get_by_ids(author_ids, options=loader_options(include))
+        counts = await self._paper_counts(list(authors.values()), include)
+        return author_lookup(author_ids, authors, include, counts)
+
+    async def _paper_counts(self, authors: List[Author], include: AbstractSet[str]) -> Dict[int, int]:
+        if "paper_count" not in include or "papers" in include:
+            return {}
+        return await self.repository.paper_counts(author.id for author in authors)
+
+    async def existing_author_ids(self, author_ids: Iterable[int]) -> Set[int]:
+        return await self.repository.existing_ids(author_ids)
+
+    async def get_all_authors(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        include_total: bool = False,
+        include: AbstractSet[str] = frozenset(),
+        fields: Tuple[str, ...] = AUTHOR_LIST_FIELDS,
+    ) -> Page:
+        after_id = decode_cursor(after) if after else None
+        dto = projection(AuthorResponseDTO, fields)
+        if not include:
+            rows, next_id = await self.repository.get_page_rows(dto_columns(Author, dto), limit=limit, after=after_id)
+            return await self._page(rows, next_id, include_total)
+
+        authors, next_id = await self.repository.get_page(
+            limit=limit,
+            after=after_id,
+            options=[load_only(*(getattr(Author, name) for name in fields)), *loader_options(include)],
+        )
+        counts = await self._paper_counts(authors, include)
+        valid_authors = []
+        for author in authors:
+            try:
+                valid_authors.append(with_includes(author, dto.model_validate(author), include, counts))
+            except ValidationError as e:
+                logger.warning(f"Skipping author {author.id} due to validation error: {e}")
+        return await self._page(valid_authors, next_id, include_total)
+
+    async def _page(self, items: List, next_id: Optional[int], include_total: bool) -> Page:
+        return Page.model_construct(
+            items=items,
+            next_cursor=encode_cursor(next_id) if next_id is not None else None,
+            total_estimate=await self.repository.estimate_count() if include_total else None,
+        )
@@ -1,12 +1,30 @@
-from typing import Optional
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, select
 from app import db
-from app.common.base_repository import BaseRepository
+from app.common.base_repository import BaseRepository, chunked
+from app.common.replicas import replica_read
 from app.modules.authors.models import Author
+from app.modules.papers.models import Paper
 
 
 class AuthorRepository(BaseRepository[Author]):
     def __init__(self):
         super().__init__(Author)
 
+    @replica_read
     def get_by_email(self, email: str) -> Optional[Author]:
         return self.session.query(Author).filter_by(email=email).first()
+
+    @replica_read
+    def paper_counts(self, author_ids: Iterable[int]) -> Dict[int, int]:
+        """
+        Number of papers per author, from one grouped query per chunk of ids.
+        Authors without papers are absent.
+        """
+        counts: Dict[int, int] = {}
+        for chunk in chunked(list(set(author_ids))):
+            rows = self.session.execute(
+                select(Paper.author_id, func.count()).where(Paper.author_id.in_(chunk)).group_by(Paper.author_id)
+            )
+            counts.update((author_id, count) for author_id, count in rows)
+        return counts
@@ -1,12 +1,21 @@
-from flask import Blueprint, request, jsonify
-from app.modules.authors.service import AuthorService
-from app.modules.authors.schemas import AuthorCreateDTO
+from flask import Blueprint, current_app, request, jsonify
+from app.modules.authors.service import AUTHOR_FIELDS, AUTHOR_INCLUDES, AUTHOR_LIST_FIELDS, AuthorService
+from app.modules.authors.schemas import AuthorCreateDTO, AuthorDetailResponseDTO, AuthorResponseDTO
+from app.common.cache import cached
+from app.common.pagination import parse_fields, parse_include, parse_keys, parse_page_args, set_page_headers
+from app.common.serialization import dump_json, json_response, projection
+from app.common.export import export_response
 from pydantic import ValidationError
 
 authors_bp = Blueprint("authors", __name__)
 service = AuthorService()
 
 
+def _embedded_namespaces():
+    # Responses with embedded papers must expire when papers change
+    return ("papers",) if request.args.get("include") else ()
+
+
 @authors_bp.route("/", methods=["POST"])
 def create_author():
     try:
@@ -18,13 +27,36 @@ def create_author():
         return jsonify(e.errors()), 400
 
 
+@authors_bp.route("/export", methods=["GET"])
+def export_authors():
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    return export_response(
+        lambda: service.export_authors(batch_size), AuthorResponseDTO, request.args.get("format", "ndjson"), "authors"
+    )
+
+
 @authors_bp.route("/<int:id>", methods=["GET"])
+@cached("authors", item="id", depends_on=_embedded_namespaces)
 def get_author(id):
-    result = service.get_author(id)
-    return jsonify(result.model_dump()), 200
+    result = service.get_author(id, include=parse_include(request.args, AUTHOR_INCLUDES))
+    return jsonify(result.model_dump(exclude_unset=True)), 200
 
 
 @authors_bp.route("/", methods=["GET"])
+@cached("authors", depends_on=_embedded_namespaces)
 def get_authors():
-    results = service.get_all_authors()
-    return jsonify([r.model_dump() for r in results]), 200
+    include = parse_include(request.args, AUTHOR_INCLUDES)
+    if "ids" in request.args:
+        ids = parse_keys(request.args, "ids", current_app.config["LOOKUP_MAX_KEYS"], int)
+        return jsonify(service.get_authors(ids, include=include).model_dump(exclude_unset=True)), 200
+    limit, after, include_total = parse_page_args(request.args)
+    fields = parse_fields(request.args, AUTHOR_FIELDS, AUTHOR_LIST_FIELDS)
+    page = service.get_all_authors(
+        limit=limit, after=after, include_total=include_total, include=include, fields=fields
+    )
+    if include:
+        body = dump_json(page.items, AuthorDetailResponseDTO, exclude_unset=True)
+    else:
+        body = dump_json(page.items, projection(AuthorResponseDTO, fields))
+    response = json_response(body)
+    return set_page_headers(response, page), 200
@@ -1,5 +1,7 @@
 from pydantic import BaseModel, EmailStr, ConfigDict, Field, BeforeValidator
-from typing import Optional, Annotated
+from typing import Optional, Annotated, List
+
+from app.modules.papers.schemas import PaperResponseDTO
 
 STRIP_WS = BeforeValidator(lambda v: v.strip() if isinstance(v, str) else v)
 
@@ -17,3 +19,12 @@ class AuthorResponseDTO(AuthorBaseDTO):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class AuthorDetailResponseDTO(AuthorResponseDTO):
+    """
+    Author with optional embedded data, filled only when requested via `include`.
+    """
+
+    papers: Optional[List[PaperResponseDTO]] = None
+    paper_count: Optional[int] = None
@@ -1,42 +1,150 @@
-from typing import List, Optional
+from typing import AbstractSet, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy.orm import load_only, selectinload
+from app.modules.authors.models import Author
 from app.modules.authors.repository import AuthorRepository
-from app.modules.authors.schemas import AuthorCreateDTO, AuthorResponseDTO
+from app.modules.authors.schemas import AuthorCreateDTO, AuthorDetailResponseDTO, AuthorResponseDTO
+from app.modules.papers.schemas import PaperResponseDTO
 from app.common.error_handler import AppError
+from app.common.pagination import DEFAULT_PAGE_SIZE, Lookup, Page, decode_cursor, encode_cursor
+from app.common.serialization import dto_columns, projection
 from pydantic import ValidationError
 import logging
 
 logger = logging.getLogger(__name__)
 
+AUTHOR_INCLUDES = frozenset({"papers", "paper_count"})
+
+# List responses leave out the unbounded bio unless `fields` asks for it
+AUTHOR_FIELDS = tuple(AuthorResponseDTO.model_fields)
+AUTHOR_LIST_FIELDS = tuple(name for name in AUTHOR_FIELDS if name != "bio")
+
+
+def loader_options(include: AbstractSet[str]) -> list:
+    # Papers come in one extra SELECT ... WHERE author_id IN (...) for the whole page
+    return [selectinload(Author.papers)] if "papers" in include else []
+
+
+def with_includes(
+    author: Author, dto: AuthorResponseDTO, include: AbstractSet[str], counts: Dict[int, int]
+) -> AuthorResponseDTO:
+    """
+    Adds the requested embedded fields; unrequested ones stay unset so they
+    are left out of the response.
+    """
+    if not include:
+        return dto
+    extra = {}
+    if "papers" in include:
+        extra["papers"] = [PaperResponseDTO.model_validate(p) for p in author.papers]
+        extra["paper_count"] = len(extra["papers"])
+    elif "paper_count" in include:
+        extra["paper_count"] = counts.get(author.id, 0)
+    # Fields were validated above; skip a second validation pass
+    return AuthorDetailResponseDTO.model_construct(**dict(dto), **extra)
+
+
+def author_lookup(
+    author_ids: List[int], authors: Dict[int, Author], include: AbstractSet[str], counts: Dict[int, int]
+) -> Lookup:
+    """
+    The found `authors` in the order of `author_ids`, and the ids that were not found.
+    """
+    return Lookup.model_construct(
+        items=[
+            with_includes(authors[id], AuthorResponseDTO.model_validate(authors[id]), include, counts)
+            for id in author_ids
+            if id in authors
+        ],
+        missing=[id for id in author_ids if id not in authors],
+    )
+
 
 class AuthorService:
     def __init__(self, repository=None):
         self.repository = repository or AuthorRepository()
 
     def create_author(self, data: AuthorCreateDTO) -> AuthorResponseDTO:
-        if self.repository.get_by_email(data.email):
+        author, created = self.repository.get_or_create("email", **data.model_dump())
+        if not created:
             raise AppError("Author with this email already exists", 409)
-
-        author = self.repository.create(**data.model_dump())
         return AuthorResponseDTO.model_validate(author)
 
-    def get_author(self, author_id: int) -> AuthorResponseDTO:
-        author = self.repository.get_by_id(author_id)
+    def get_author(self, author_id: int, include: AbstractSet[str] = frozenset()) -> AuthorResponseDTO:
+        author = self.repository.get_by_id(author_id, options=loader_options(include))
         if not author:
             raise AppError("Author not found", 404)
-        return AuthorResponseDTO.model_validate(author)
+        dto = AuthorResponseDTO.model_validate(author)
+        return with_includes(author, dto, include, self._paper_counts([author], include))
+
+    def get_authors(
+        self, author_ids: List[int], include: AbstractSet[str] = frozenset()
+    ) -> Lookup[int, AuthorResponseDTO]:
+        """
+        The authors with `author_ids`, in that order, from one IN query (plus one
+        per `include`); ids without an author are listed as missing.
+        """
+        authors = self.repository.get_by_ids(author_ids, options=loader_options(include))
+        return author_lookup(author_ids, authors, include, self._paper_counts(list(authors.values()), include))
+
+    def _paper_counts(self, authors: List[Author], include: AbstractSet[str]) -> Dict[int, int]:
+        if "paper_count" not in include or "papers" in include:
+            return {}
+        return self.repository.paper_counts(author.id for author in authors)
+
+    def existing_author_ids(self, author_ids: Iterable[int]) -> Set[int]:
+        return self.repository.existing_ids(author_ids)
+
+    def get_all_authors(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        include_total: bool = False,
+        include: AbstractSet[str] = frozenset(),
+        fields: Tuple[str, ...] = AUTHOR_LIST_FIELDS,
+    ) -> Page:
+        """
+        One keyset page of authors with just `fields`. Without `include`, items are
+        column rows shaped like `projection(AuthorResponseDTO, fields)`, ready for
+        `dump_json`. `include` embeds each author's papers and/or paper count
+        (items are then `AuthorDetailResponseDTO` with only those fields set) with
+        a constant number of queries regardless of page size.
+        """
+        after_id = decode_cursor(after) if after else None
+        dto = projection(AuthorResponseDTO, fields)
+        if not include:
+            rows, next_id = self.repository.get_page_rows(dto_columns(Author, dto), limit=limit, after=after_id)
+            return self._page(rows, next_id, include_total)
 
-    def get_all_authors(self) -> List[AuthorResponseDTO]:
-        authors = self.repository.get_all()
+        authors, next_id = self.repository.get_page(
+            limit=limit,
+            after=after_id,
+            options=[load_only(*(getattr(Author, name) for name in fields)), *loader_options(include)],
+        )
+        counts = self._paper_counts(authors, include)
         valid_authors = []
         
         for author in authors:
             try:
-                valid_authors.append(AuthorResponseDTO.model_validate(author))
+                valid_authors.append(with_includes(author, dto.model_validate(author), include, counts))
             except ValidationError as e:
                 # Log the validation error and skip this author
                 logger.warning(
                     f"Skipping author {author.id} due to validation error: {e}"
                 )
                 continue
-        
-        return valid_authors
+
+        return self._page(valid_authors, next_id, include_total)
+
+    def _page(self, items: List, next_id: Optional[int], include_total: bool) -> Page:
+        # Items are already validated DTOs or trusted rows
+        return Page.model_construct(
+            items=items,
+            next_cursor=encode_cursor(next_id) if next_id is not None else None,
+            total_estimate=self.repository.estimate_count() if include_total else None,
+        )
+
+    def export_authors(self, batch_size: int) -> Iterator[List]:
+        """
+        Every author as column rows shaped like `AuthorResponseDTO`, in batches.
+        """
+        return self.repository.stream_rows(dto_columns(Author, AuthorResponseDTO), batch_size=batch_size)
@@ -0,0 +1,84 @@
+from sqlalchemy import DDL, BigInteger, Column, Index, Integer, String, event
+from app import db
+
+# Tables whose row changes are recorded in `changes`
+TRACKED_TABLES = ("authors", "papers")
+
+
+class Change(db.Model):
+    """
+    One insert, update or delete of a row of a tracked table (a delete is the
+    tombstone). Rows are written by database triggers, so every write path
+    (repositories, bulk upserts, COPY imports, the async app) records its
+    changes in the same transaction without an extra round trip.
+
+    `txid` is the writing transaction's id on Postgres and 0 elsewhere; the feed
+    is ordered by (txid, seq), see ChangeRepository.get_after. Old changes are
+    deleted by `scripts/prune_changes.py`, which moves the `change_horizon`.
+    """
+
+    __tablename__ = "changes"
+    __table_args__ = (
+        Index("ix_changes_position", "txid", "seq"),
+        # Never reuse the seq of pruned rows
+        {"sqlite_autoincrement": True},
+    )
+
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    txid = Column(BigInteger, nullable=False, server_default="0")
+    entity = Column(String(50), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String(10), nullable=False)
+
+
+class ChangeHorizon(db.Model):
+    """
+    The position of the last pruned change, in a single row (id 1). A reader
+    whose position is before it has missed changes.
+    """
+
+    __tablename__ = "change_horizon"
+
+    id = Column(Integer, primary_key=True)
+    txid = Column(BigInteger, nullable=False)
+    seq = Column(BigInteger, nullable=False)
+
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_record_{op} AFTER {op.upper()} ON {table}
+    BEGIN INSERT INTO changes (entity, entity_id, op) VALUES ('{table}', {row}.id, '{op}'); END
+    """
+    for table in TRACKED_TABLES
+    for op, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD"))
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO changes (txid, entity, entity_id, op) VALUES (
+            txid_current(), TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP)
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table in TRACKED_TABLES
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_record_change ON {table}",
+            f"""
+            CREATE TRIGGER {table}_record_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_change()
+            """,
+        )
+    ),
+]
+
+# The triggers hang off the tracked tables and write to changes, so they wait for all three
+for statement in SQLITE_TRIGGERS:
+    event.listen(db.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_TRIGGERS:
+    event.listen(db.metadata, "after_create", DDL(statement).execute_if(dialect="postgresql"))
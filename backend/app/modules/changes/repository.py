@@ -0,0 +1,104 @@
+from typing import List, Tuple
+from sqlalchemy import Row, delete, func, select, tuple_
+from app.common.base_repository import BaseRepository, conflict_insert
+from app.common.replicas import replica_read
+from app.modules.changes.models import Change, ChangeHorizon
+
+PRUNE_BATCH_SIZE = 10000
+
+
+class ChangeRepository(BaseRepository[Change]):
+    def __init__(self):
+        super().__init__(Change)
+
+    @replica_read
+    def get_after(self, position: Tuple[int, int], limit: int) -> List[Row]:
+        """
+        Up to `limit` changes after `position`, a (txid, seq) pair, in that order.
+        A range scan of ix_changes_position, so catching up costs the number of
+        changes rather than the size of the tables.
+
+        Sequence values are taken when a row is written but become visible when
+        its transaction commits, so ordering by seq alone could skip a change
+        that commits after a later one was read. On Postgres the feed therefore
+        stops at the oldest transaction still open: every transaction below it
+        has finished, and any change written from now on gets a higher txid. A
+        long-running transaction holds the feed back until it ends. SQLite
+        commits one writer at a time, so there seq order is commit order.
+        """
+        stmt = select(Change.seq, Change.txid, Change.entity, Change.entity_id, Change.op).where(
+            tuple_(Change.txid, Change.seq) > tuple_(*position)
+        )
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.where(Change.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+        return self.session.execute(stmt.order_by(Change.txid, Change.seq).limit(limit)).all()
+
+    @replica_read
+    def head(self) -> Tuple[int, int]:
+        """
+        The position of the last change `get_after` can return now, (0, 0) when
+        there is none: reading the feed from here sees every later write.
+        """
+        stmt = select(Change.txid, Change.seq)
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.where(Change.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+        row = self.session.execute(stmt.order_by(Change.txid.desc(), Change.seq.desc()).limit(1)).first()
+        return (row.txid, row.seq) if row else (0, 0)
+
+    @replica_read
+    def horizon(self) -> Tuple[int, int]:
+        """
+        The position of the last pruned change, (0, 0) before the first prune.
+        """
+        row = self.session.execute(select(ChangeHorizon.txid, ChangeHorizon.seq).where(ChangeHorizon.id == 1)).first()
+        return (row.txid, row.seq) if row else (0, 0)
+
+    def expired(self, position: Tuple[int, int]) -> bool:
+        """
+        Whether changes after `position` have been pruned. Check it after
+        `get_after` returned changes, so a prune running in between is seen;
+        an empty answer never misses anything, since pruning keeps the newest change.
+        """
+        return tuple(position) < self.horizon()
+
+    def prune(self, keep: int, batch_size: int = PRUNE_BATCH_SIZE) -> int:
+        """
+        Deletes all but the newest `keep` (at least one) changes `get_after` can
+        return, oldest first, in transactions of `batch_size` rows. The horizon
+        moves first, so readers behind it are told before their changes go.
+        Returns how many changes were deleted.
+        """
+        stmt = select(Change.txid, Change.seq)
+        if self.session.get_bind().dialect.name == "postgresql":
+            stmt = stmt.where(Change.txid < func.txid_snapshot_xmin(func.txid_current_snapshot()))
+        # The newest change that goes
+        last = self.session.execute(
+            stmt.order_by(Change.txid.desc(), Change.seq.desc()).offset(max(keep, 1)).limit(1)
+        ).first()
+        if last is None:
+            self.session.rollback()
+            return 0
+        horizon = self.session.execute(select(ChangeHorizon.txid, ChangeHorizon.seq).where(ChangeHorizon.id == 1)).first()
+        # A prune that stopped halfway already moved the horizon; never move it back
+        if horizon is None or (last.txid, last.seq) > (horizon.txid, horizon.seq):
+            upsert = conflict_insert(ChangeHorizon.__table__, self.session.get_bind().dialect.name).values(
+                id=1, txid=last.txid, seq=last.seq
+            )
+            self.session.execute(
+                upsert.on_conflict_do_update(index_elements=["id"], set_={"txid": last.txid, "seq": last.seq})
+            )
+        self.session.commit()
+
+        deleted = 0
+        while True:
+            batch = (
+                select(Change.seq)
+                .where(tuple_(Change.txid, Change.seq) <= tuple_(last.txid, last.seq))
+                .order_by(Change.txid, Change.seq)
+                .limit(batch_size)
+            )
+            count = self.session.execute(delete(Change).where(Change.seq.in_(batch.scalar_subquery()))).rowcount
+            self.session.commit()
+            deleted += count
+            if count < batch_size:
+                return deleted
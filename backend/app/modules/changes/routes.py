@@ -0,0 +1,16 @@
+from flask import Blueprint, request
+from app.modules.changes.service import ChangeService
+from app.modules.changes.schemas import ChangeResponseDTO
+from app.common.pagination import parse_limit
+from app.common.serialization import dump_json, json_response
+
+changes_bp = Blueprint("changes", __name__)
+service = ChangeService()
+
+
+@changes_bp.route("/", methods=["GET"])
+def get_changes():
+    page = service.get_changes(since=request.args.get("since") or None, limit=parse_limit(request.args))
+    response = json_response(dump_json(page.items, ChangeResponseDTO))
+    response.headers["X-Next-Cursor"] = page.next_cursor
+    return response, 200
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Literal
+
+
+class ChangeResponseDTO(BaseModel):
+    """
+    A row of `entity` (a table name) was inserted, updated or deleted. The
+    change carries no row data: consumers fetch the current rows by id.
+    """
+
+    seq: int
+    entity: str
+    entity_id: int
+    op: Literal["insert", "update", "delete"]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,48 @@
+import base64
+import binascii
+from typing import Optional, Tuple
+from app.common.error_handler import AppError
+from app.common.pagination import DEFAULT_PAGE_SIZE, Page
+from app.modules.changes.repository import ChangeRepository
+
+# Position before the first change
+START = (0, 0)
+
+
+def encode_position(position: Tuple[int, int]) -> str:
+    txid, seq = position
+    return base64.urlsafe_b64encode(f"chg:{txid}:{seq}".encode()).decode().rstrip("=")
+
+
+def decode_position(cursor: str) -> Tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        prefix, txid, seq = base64.urlsafe_b64decode(padded).decode().split(":")
+        if prefix != "chg":
+            raise ValueError(cursor)
+        return int(txid), int(seq)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise AppError("Invalid change cursor", 400)
+
+
+class ChangeService:
+    def __init__(self, repository=None):
+        self.repository = repository or ChangeRepository()
+
+    def get_changes(self, since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """
+        The changes after the `since` cursor (from the oldest one kept without
+        it), oldest first. `next_cursor` is where to resume; it is always set,
+        and stays at `since` when nothing new has been committed.
+
+        A `since` cursor behind the pruned changes (see ChangeRepository.prune)
+        fails with 410 Gone: the reader has missed changes, and must re-read
+        the tables it follows and resume from a cursor taken before that.
+        """
+        position = decode_position(since) if since else START
+        rows = self.repository.get_after(position, limit)
+        if rows and since and self.repository.expired(position):
+            raise AppError("Change cursor is too old: changes after it have been pruned", 410)
+        if rows:
+            position = (rows[-1].txid, rows[-1].seq)
+        return Page.model_construct(items=rows, next_cursor=encode_position(position))
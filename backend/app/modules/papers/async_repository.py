@@ -0,0 +1,20 @@
+from typing import Dict, Iterable, Optional
+from sqlalchemy import select
+from app.common.async_base_repository import AsyncBaseRepository
+from app.common.base_repository import chunked
+from app.modules.papers.models import Paper
+
+
+class AsyncPaperRepository(AsyncBaseRepository[Paper]):
+    def __init__(self):
+        super().__init__(Paper)
+
+    async def get_by_doi(self, doi: str) -> Optional[Paper]:
+        return await self.session.scalar(select(Paper).filter_by(doi=doi).limit(1))
+
+    async def get_by_dois(self, dois: Iterable[str]) -> Dict[str, Paper]:
+        found: Dict[str, Paper] = {}
+        for chunk in chunked(list(set(dois))):
+            for paper in await self.session.scalars(select(Paper).where(Paper.doi.in_(chunk))):
+                found[paper.doi] = paper
+        return found
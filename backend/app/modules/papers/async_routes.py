@@ -0,0 +1,45 @@
+from quart import Blueprint, Response, current_app, jsonify, request
+from app.modules.papers.async_service import AsyncPaperService
+from app.modules.papers.service import PAPER_FIELDS, PAPER_LIST_FIELDS
+from app.modules.papers.schemas import PaperCreateDTO, PaperResponseDTO
+from app.common.pagination import parse_fields, parse_keys, parse_page_args, set_page_headers
+from app.common.serialization import dump_json, projection
+from pydantic import ValidationError
+
+papers_bp = Blueprint("papers", __name__)
+service = AsyncPaperService()
+
+
+@papers_bp.route("/", methods=["POST"])
+async def create_paper():
+    try:
+        data = await request.get_json()
+        dto = PaperCreateDTO(**data)
+        result, created = await service.create_paper(dto)
+        return jsonify(result.model_dump()), 201 if created else 200
+    except ValidationError as e:
+        return jsonify(e.errors()), 400
+
+
+@papers_bp.route("/by-doi", methods=["GET"])
+async def get_papers_by_doi():
+    dois = parse_keys(request.args, "dois", current_app.config["LOOKUP_MAX_KEYS"], separator=None)
+    return jsonify((await service.get_papers_by_doi(dois)).model_dump()), 200
+
+
+@papers_bp.route("/<int:id>", methods=["GET"])
+async def get_paper(id):
+    result = await service.get_paper(id)
+    return jsonify(result.model_dump()), 200
+
+
+@papers_bp.route("/", methods=["GET"])
+async def get_papers():
+    if "ids" in request.args:
+        ids = parse_keys(request.args, "ids", current_app.config["LOOKUP_MAX_KEYS"], int)
+        return jsonify((await service.get_papers(ids)).model_dump()), 200
+    limit, after, include_total = parse_page_args(request.args)
+    fields = parse_fields(request.args, PAPER_FIELDS, PAPER_LIST_FIELDS)
+    page = await service.get_all_papers(limit=limit, after=after, include_total=include_total, fields=fields)
+    response = Response(dump_json(page.items, projection(PaperResponseDTO, fields)), mimetype="application/json")
+    return set_page_headers(response, page), 200
@@ -0,0 +1,58 @@
+from typing import List, Optional, Tuple
+from app.modules.papers.async_repository import AsyncPaperRepository
+from app.modules.papers.models import Paper
+from app.modules.papers.schemas import PaperCreateDTO, PaperResponseDTO
+from app.modules.papers.service import PAPER_LIST_FIELDS, paper_lookup
+from app.common.error_handler import AppError
+from app.common.pagination import DEFAULT_PAGE_SIZE, Lookup, Page, decode_cursor, encode_cursor
+from app.common.serialization import dto_columns, projection
+from sqlalchemy.exc import IntegrityError
+
+
+class AsyncPaperService:
+    """
+    `PaperService` for the async app: creation and lookups. Search, batch
+    ingest and exports stay on the WSGI app, whose in-process indexes and
+    streaming responses are built around threads.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository or AsyncPaperRepository()
+
+    async def create_paper(self, data: PaperCreateDTO) -> Tuple[PaperResponseDTO, bool]:
+        # The in-memory keyword index and DOI filter pick new rows up on their next refresh
+        try:
+            paper, created = await self.repository.get_or_create("doi", **data.model_dump())
+        except IntegrityError:
+            raise AppError("Author not found", 404)
+        return PaperResponseDTO.model_validate(paper), created
+
+    async def get_paper(self, paper_id: int) -> PaperResponseDTO:
+        paper = await self.repository.get_by_id(paper_id)
+        if not paper:
+            raise AppError("Paper not found", 404)
+        return PaperResponseDTO.model_validate(paper)
+
+    async def get_papers(self, paper_ids: List[int]) -> Lookup[int, PaperResponseDTO]:
+        return paper_lookup(paper_ids, await self.repository.get_by_ids(paper_ids))
+
+    async def get_papers_by_doi(self, dois: List[str]) -> Lookup[str, PaperResponseDTO]:
+        return paper_lookup(dois, await self.repository.get_by_dois(dois))
+
+    async def get_all_papers(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        include_total: bool = False,
+        fields: Tuple[str, ...] = PAPER_LIST_FIELDS,
+    ) -> Page:
+        rows, next_id = await self.repository.get_page_rows(
+            dto_columns(Paper, projection(PaperResponseDTO, fields)),
+            limit=limit,
+            after=decode_cursor(after) if after else None,
+        )
+        return Page.model_construct(
+            items=rows,
+            next_cursor=encode_cursor(next_id) if next_id is not None else None,
+            total_estimate=await self.repository.estimate_count() if include_total else None,
+        )
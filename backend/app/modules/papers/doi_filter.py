@@ -0,0 +1,176 @@
+import logging
+import os
+import threading
+import time
+from typing import Iterable, List, Optional, Set, Tuple
+
+from app.common.bloom import ScalableBloomFilter
+from app.common.metrics import registry
+from app.modules.changes.repository import ChangeRepository
+from app.modules.papers.models import Paper
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 10000
+CATCH_UP_BATCH_SIZE = 1000
+
+CHECKS = registry.counter(
+    "doi_filter_checks_total", "DOI membership filter answers (negative answers skip the lookup).", ("result",)
+)
+# Observed false-positive rate: false positives / (false positives + negative checks)
+FALSE_POSITIVES = registry.counter(
+    "doi_filter_false_positives_total", "Filter positives for DOIs the exact lookup did not find."
+)
+
+
+class DoiFilter:
+    """
+    Which DOIs may already be in `papers`, in a scalable Bloom filter: a
+    negative answer is definite, a positive one needs the exact lookup.
+    Built from the table when a worker starts (see app.warm_worker) or else on
+    first use, or loaded from `path`, where it is saved every `save_seconds`;
+    updated directly for papers this process creates and caught up from the
+    change feed with papers written by other processes at most every
+    `refresh_seconds`. Deleted DOIs stay in the filter and answer positive
+    until the next rebuild.
+    """
+
+    def __init__(
+        self,
+        repository,
+        capacity: int = 100000,
+        error_rate: float = 0.01,
+        refresh_seconds: float = 1.0,
+        path: str = "",
+        save_seconds: float = 300.0,
+    ):
+        self.repository = repository
+        self.changes = ChangeRepository()
+        self.changes.session = repository.session
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_seconds = refresh_seconds
+        self.path = path
+        self.save_seconds = save_seconds
+        self._filter: Optional[ScalableBloomFilter] = None
+        self._position: Tuple[int, int] = (0, 0)
+        self._refreshed_at: Optional[float] = None
+        self._saved_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def may_contain(self, doi: str) -> bool:
+        return doi in self.may_contain_many([doi])
+
+    def may_contain_many(self, dois: Iterable[str]) -> Set[str]:
+        """
+        The subset of `dois` that may exist; the others definitely do not.
+        """
+        dois = list(dict.fromkeys(dois))
+        self.refresh()
+        found = self._filter.contains_many(dois)
+        positives = {doi for doi, hit in zip(dois, found) if hit}
+        if positives:
+            CHECKS.inc("positive", amount=len(positives))
+        if len(dois) > len(positives):
+            CHECKS.inc("negative", amount=len(dois) - len(positives))
+        return positives
+
+    def false_positives(self, count: int = 1) -> None:
+        """
+        Records positives that the exact lookup did not find.
+        """
+        if count:
+            FALSE_POSITIVES.inc(amount=count)
+
+    def add(self, dois: Iterable[str]) -> None:
+        """
+        Adds DOIs this process has just written; before the first build they are
+        picked up from the table anyway.
+        """
+        if self._filter is not None:
+            with self._lock:
+                self._filter.add_many(dois)
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if (
+            not force
+            and self._refreshed_at is not None
+            and now - self._refreshed_at < self.refresh_seconds
+        ):
+            return
+        with self._lock:
+            if self._filter is None and not self._load():
+                self._build()
+            if not self._catch_up():
+                # DOIs written since were pruned from the feed unseen
+                self._build()
+                self._catch_up()
+            self._refreshed_at = now
+            if self.path and (self._saved_at is None or now - self._saved_at >= self.save_seconds):
+                self._save(now)
+
+    def _build(self) -> None:
+        started = time.perf_counter()
+        bloom = ScalableBloomFilter(self.capacity, self.error_rate)
+        # Changes from this position on are replayed, so writes made while the
+        # table is being read are not missed
+        self._position = self.changes.head()
+        for rows in self.repository.stream_rows([Paper.doi], batch_size=LOAD_BATCH_SIZE):
+            bloom.add_many(row.doi for row in rows)
+        self._filter = bloom
+        self._saved_at = None
+        logger.info(
+            "DOI filter built",
+            extra={
+                "dois": len(bloom),
+                "estimated_error_rate": bloom.estimated_error_rate(),
+                "seconds": round(time.perf_counter() - started, 3),
+            },
+        )
+
+    def _load(self) -> bool:
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            bloom, meta = ScalableBloomFilter.load(self.path)
+            position = tuple(meta["position"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable DOI filter file", extra={"path": self.path, "error": str(e)})
+            return False
+        # A feed behind the saved position belongs to another (or a restored) database
+        if position > self.changes.head():
+            logger.warning("Ignoring DOI filter file ahead of the change feed", extra={"path": self.path})
+            return False
+        self._filter, self._position = bloom, position
+        self._saved_at = time.monotonic()
+        return True
+
+    def _catch_up(self) -> bool:
+        """
+        Adds the DOIs written since the last catch-up; False if some changes were pruned unseen.
+        """
+        while True:
+            changes = self.changes.get_after(self._position, CATCH_UP_BATCH_SIZE)
+            if not changes:
+                return True
+            if self.changes.expired(self._position):
+                return False
+            ids: List[int] = [c.entity_id for c in changes if c.entity == "papers" and c.op != "delete"]
+            if ids:
+                self._filter.add_many(self.repository.get_dois(ids))
+            self._position = (changes[-1].txid, changes[-1].seq)
+            if len(changes) < CATCH_UP_BATCH_SIZE:
+                return True
+
+    def _save(self, now: float) -> None:
+        try:
+            self._filter.save(self.path, position=list(self._position))
+        except OSError as e:
+            logger.warning("Could not save the DOI filter", extra={"path": self.path, "error": str(e)})
+        else:
+            logger.info(
+                "DOI filter saved",
+                extra={"dois": len(self._filter), "estimated_error_rate": self._filter.estimated_error_rate()},
+            )
+        self._saved_at = now
@@ -0,0 +1,310 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from flask import current_app, has_app_context
+from sqlalchemy import Row, delete, func, or_, select, text, tuple_, update
+
+from app.common.base_repository import BaseRepository
+from app.common.vector_index import ExactVectorIndex, IVFVectorIndex, normalize
+from app.modules.changes.repository import ChangeRepository
+from app.modules.papers.embeddings import EMBEDDING_DIM, to_pgvector_literal
+from app.modules.papers.models import EmbeddingJob, Paper, PaperEmbedding
+
+LOAD_BATCH_SIZE = 10000
+CATCH_UP_BATCH_SIZE = 1000
+
+# How far back each refresh re-reads, to tolerate clock skew between workers
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class EmbeddingRepository(BaseRepository[PaperEmbedding], ABC):
+    """
+    Stores abstract embeddings and answers cosine-similarity queries.
+    Subclasses decide where the nearest-neighbour search runs.
+    """
+
+    def __init__(self):
+        super().__init__(PaperEmbedding)
+
+    def upsert(self, paper_ids: List[int], vectors: np.ndarray) -> None:
+        embedded_at = utcnow()
+        self.bulk_upsert(
+            [
+                {"paper_id": paper_id, "embedding": vector, "embedded_at": embedded_at}
+                for paper_id, vector in zip(paper_ids, vectors)
+            ],
+            "paper_id",
+        )
+
+    @abstractmethod
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """
+        Returns up to `k` (paper_id, cosine similarity) pairs, best first.
+        """
+
+
+class NumpyEmbeddingRepository(EmbeddingRepository):
+    """
+    Searches an in-process vector index loaded from `paper_embeddings`.
+    The index is filled on first search and then, at most every
+    `refresh_seconds`, topped up with rows embedded since the last load, which
+    picks up new and re-embedded papers written by the embedding worker, and
+    rid of deleted papers (whose embeddings go with them) found in the change feed.
+    Writes (`upsert`) only go to the table, so a process that never searches,
+    like the worker itself, never loads the index.
+    """
+
+    def __init__(self, index=None, refresh_seconds: float = 5.0, train_threshold: Optional[int] = None):
+        self.changes = ChangeRepository()
+        super().__init__()
+        self.index = index if index is not None else ExactVectorIndex(EMBEDDING_DIM)
+        self.refresh_seconds = refresh_seconds
+        self.train_threshold = train_threshold
+        self._high_water: Optional[datetime] = None
+        self._position: Optional[Tuple[int, int]] = None
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        return self._session
+
+    @session.setter
+    def session(self, session) -> None:
+        # The change feed is read through the same session as the embeddings
+        self._session = session
+        self.changes.session = session
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if self._position is None:
+                # Deletes from this position on are replayed, so papers deleted
+                # while the table is being read are not left in the index
+                self._position = self.changes.head()
+            query = select(PaperEmbedding.paper_id, PaperEmbedding.embedding, PaperEmbedding.embedded_at)
+            if self._high_water is not None:
+                query = query.where(PaperEmbedding.embedded_at >= self._high_water - REFRESH_OVERLAP)
+            result = self.session.execute(
+                query.order_by(PaperEmbedding.embedded_at).execution_options(yield_per=LOAD_BATCH_SIZE)
+            )
+            for rows in result.partitions():
+                self.index.add([row.paper_id for row in rows], np.stack([row.embedding for row in rows]))
+                if rows[-1].embedded_at is not None:
+                    self._high_water = rows[-1].embedded_at
+            if not self._remove_deleted():
+                self._remove_missing()
+
+            if (
+                isinstance(self.index, IVFVectorIndex)
+                and not self.index.is_trained
+                and self.train_threshold is not None
+                and len(self.index) >= self.train_threshold
+            ):
+                self.index.train()
+            self._refreshed_at = now
+
+    def _remove_deleted(self) -> bool:
+        """
+        Removes papers deleted since the last refresh; False if some changes were pruned unseen.
+        """
+        while True:
+            changes = self.changes.get_after(self._position, CATCH_UP_BATCH_SIZE)
+            if not changes:
+                return True
+            if self.changes.expired(self._position):
+                return False
+            # The last change of each paper decides
+            deleted: Dict[int, bool] = {}
+            for change in changes:
+                if change.entity == "papers":
+                    deleted[change.entity_id] = change.op == "delete"
+            self.index.remove([paper_id for paper_id, is_deleted in deleted.items() if is_deleted])
+            self._position = (changes[-1].txid, changes[-1].seq)
+            if len(changes) < CATCH_UP_BATCH_SIZE:
+                return True
+
+    def _remove_missing(self) -> None:
+        """
+        Removes every indexed paper that no longer has an embedding, after the
+        deletes that would have said so were pruned from the change feed.
+        """
+        self._position = self.changes.head()
+        existing = set()
+        result = self.session.execute(
+            select(PaperEmbedding.paper_id).execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            existing.update(row.paper_id for row in rows)
+        self.index.remove([paper_id for paper_id in self.index.ids.tolist() if paper_id not in existing])
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        self.refresh()
+        with self._lock:
+            ids, scores = self.index.search(query, k)
+        return [(int(i), float(s)) for i, s in zip(ids[0], scores[0]) if i >= 0]
+
+
+class PgVectorEmbeddingRepository(EmbeddingRepository):
+    """
+    Delegates search to pgvector's cosine distance operator (`<=>`), served by
+    the HNSW index added by migration 0003.
+    """
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        rows = self.session.execute(
+            text(
+                "SELECT paper_id, 1 - (embedding <=> CAST(:query AS vector)) AS score "
+                "FROM paper_embeddings ORDER BY embedding <=> CAST(:query AS vector) LIMIT :k"
+            ),
+            {"query": to_pgvector_literal(normalize(query)[0]), "k": k},
+        ).all()
+        return [(row.paper_id, float(row.score)) for row in rows]
+
+
+class EmbeddingJobRepository(BaseRepository[EmbeddingJob]):
+    """
+    Claim / complete / retry operations on the `embedding_jobs` queue.
+    """
+
+    def __init__(self):
+        super().__init__(EmbeddingJob)
+
+    def claim(self, limit: int, lease: timedelta) -> List[Row]:
+        """
+        Leases up to `limit` available jobs. On Postgres concurrent workers skip
+        each other's locked rows (FOR UPDATE SKIP LOCKED); SQLite serializes
+        writers, so the same statement is safe there without the lock clause.
+        """
+        now = utcnow()
+        candidates = (
+            select(EmbeddingJob.id)
+            .where(EmbeddingJob.failed.is_(False))
+            .where(or_(EmbeddingJob.available_at.is_(None), EmbeddingJob.available_at <= now))
+            .where(or_(EmbeddingJob.claimed_at.is_(None), EmbeddingJob.claimed_at < now - lease))
+            .order_by(EmbeddingJob.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = self.session.execute(
+            update(EmbeddingJob)
+            .where(EmbeddingJob.id.in_(candidates.scalar_subquery()))
+            .values(claimed_at=now, attempts=EmbeddingJob.attempts + 1)
+            .returning(EmbeddingJob.id, EmbeddingJob.paper_id, EmbeddingJob.version, EmbeddingJob.attempts)
+        ).all()
+        self.session.commit()
+        return jobs
+
+    def complete(self, jobs: List[Row]) -> None:
+        """
+        Deletes finished jobs, unless the paper changed again since they were claimed.
+        """
+        if not jobs:
+            return
+        self.session.execute(
+            delete(EmbeddingJob).where(
+                tuple_(EmbeddingJob.id, EmbeddingJob.version).in_([(job.id, job.version) for job in jobs])
+            )
+        )
+        self.session.commit()
+
+    def fail(self, jobs: List[Row], error: str, max_attempts: int, backoff: timedelta) -> None:
+        """
+        Releases jobs for a later retry with exponential backoff, or marks them
+        failed once they have used up `max_attempts`.
+        """
+        now = utcnow()
+        for job in jobs:
+            self.session.execute(
+                update(EmbeddingJob)
+                .where(EmbeddingJob.id == job.id, EmbeddingJob.version == job.version)
+                .values(
+                    claimed_at=None,
+                    available_at=now + backoff * (2 ** (job.attempts - 1)),
+                    failed=job.attempts >= max_attempts,
+                    last_error=error[:2000],
+                )
+            )
+        self.session.commit()
+
+    def enqueue_missing(self) -> int:
+        """
+        Backfill: queues every paper that has no embedding and no pending job.
+        """
+        stmt = self._conflict_insert().from_select(
+            ["paper_id", "version", "attempts", "failed"],
+            select(Paper.id, 1, 0, False)
+            .outerjoin(PaperEmbedding, PaperEmbedding.paper_id == Paper.id)
+            .where(PaperEmbedding.paper_id.is_(None)),
+        )
+        count = self.session.execute(stmt.on_conflict_do_nothing(index_elements=["paper_id"])).rowcount
+        self.session.commit()
+        return count
+
+    def enqueue_all(self) -> int:
+        """
+        Re-embed everything (e.g. after changing the embedder); resets existing jobs.
+        """
+        stmt = self._conflict_insert().from_select(
+            ["paper_id", "version", "attempts", "failed"],
+            select(Paper.id, 1, 0, False).where(Paper.id.is_not(None)),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["paper_id"],
+            set_={
+                "version": EmbeddingJob.version + 1,
+                "attempts": 0,
+                "failed": False,
+                "available_at": None,
+                "claimed_at": None,
+                "last_error": None,
+            },
+        )
+        count = self.session.execute(stmt).rowcount
+        self.session.commit()
+        return count
+
+    def pending_count(self) -> int:
+        return self.session.scalar(
+            select(func.count()).select_from(EmbeddingJob).where(EmbeddingJob.failed.is_(False))
+        )
+
+    def paper_texts(self, paper_ids: List[int]) -> Dict[int, Tuple[str, Optional[str]]]:
+        rows = self.session.execute(
+            select(Paper.id, Paper.title, Paper.abstract).where(Paper.id.in_(paper_ids))
+        ).all()
+        return {row.id: (row.title, row.abstract) for row in rows}
+
+
+def create_embedding_repository(config: Optional[dict] = None) -> EmbeddingRepository:
+    if config is None:
+        config = current_app.config if has_app_context() else {}
+
+    backend = config.get("SEARCH_BACKEND", "numpy")
+    if backend == "pgvector":
+        return PgVectorEmbeddingRepository()
+    if backend != "numpy":
+        raise ValueError(f"Unknown SEARCH_BACKEND: {backend}")
+
+    train_threshold = None
+    if config.get("SEARCH_INDEX", "exact") == "ivf":
+        nlist = config.get("SEARCH_IVF_NLIST", 1024)
+        index = IVFVectorIndex(EMBEDDING_DIM, nlist=nlist, nprobe=config.get("SEARCH_IVF_NPROBE", 16))
+        # Below ~40 vectors per cell the partitioning is not worth it
+        train_threshold = nlist * 40
+    else:
+        index = ExactVectorIndex(EMBEDDING_DIM)
+    return NumpyEmbeddingRepository(
+        index, refresh_seconds=config.get("SEARCH_REFRESH_SECONDS", 5.0), train_threshold=train_threshold
+    )
+
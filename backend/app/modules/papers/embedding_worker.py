@@ -0,0 +1,102 @@
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import List, Optional
+
+import numpy as np
+
+from app.modules.papers.embedding_repository import EmbeddingJobRepository, create_embedding_repository
+from app.modules.papers.embeddings import HashingEmbedder, paper_text
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingWorker:
+    """
+    Drains the `embedding_jobs` queue: claims a batch of jobs, encodes the
+    papers' text in sub-batches (across a process pool when `processes` > 0)
+    and writes all vectors back with one bulk upsert.
+    """
+
+    def __init__(
+        self,
+        job_repository=None,
+        embedding_repository=None,
+        embedder=None,
+        batch_size: int = 256,
+        encode_batch_size: int = 64,
+        processes: int = 0,
+        max_attempts: int = 5,
+        lease: timedelta = timedelta(minutes=5),
+        retry_backoff: timedelta = timedelta(seconds=10),
+        poll_interval: float = 0.5,
+    ):
+        self.job_repository = job_repository or EmbeddingJobRepository()
+        self.embedding_repository = embedding_repository or create_embedding_repository()
+        self.embedder = embedder or HashingEmbedder()
+        self.batch_size = batch_size
+        self.encode_batch_size = encode_batch_size
+        self.max_attempts = max_attempts
+        self.lease = lease
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self._pool: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(processes) if processes > 0 else None
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        batches = [texts[i : i + self.encode_batch_size] for i in range(0, len(texts), self.encode_batch_size)]
+        if self._pool is None:
+            encoded = [self.embedder.encode(batch) for batch in batches]
+        else:
+            encoded = list(self._pool.map(self.embedder.encode, batches))
+        return np.vstack(encoded)
+
+    def run_once(self) -> int:
+        """
+        Processes one claimed batch; returns how many jobs it claimed.
+        """
+        jobs = self.job_repository.claim(self.batch_size, self.lease)
+        if not jobs:
+            return 0
+
+        try:
+            texts = self.job_repository.paper_texts([job.paper_id for job in jobs])
+            # Papers deleted since they were queued have nothing left to embed
+            paper_ids = [job.paper_id for job in jobs if job.paper_id in texts]
+            if paper_ids:
+                vectors = self._encode([paper_text(*texts[paper_id]) for paper_id in paper_ids])
+                self.embedding_repository.upsert(paper_ids, vectors)
+            self.job_repository.complete(jobs)
+        except Exception as e:
+            logger.exception("Embedding batch failed", extra={"jobs": len(jobs)})
+            self.job_repository.session.rollback()
+            self.job_repository.fail(jobs, repr(e), self.max_attempts, self.retry_backoff)
+        return len(jobs)
+
+    def drain(self) -> int:
+        """
+        Runs until no job is available; returns the number of jobs processed.
+        """
+        processed = 0
+        while claimed := self.run_once():
+            processed += claimed
+        return processed
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        logger.info("Embedding worker started", extra={"batch_size": self.batch_size})
+        while not stop.is_set():
+            started = time.perf_counter()
+            claimed = self.run_once()
+            if claimed:
+                logger.info(
+                    "Embedded batch",
+                    extra={"jobs": claimed, "duration": time.perf_counter() - started},
+                )
+            else:
+                stop.wait(self.poll_interval)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
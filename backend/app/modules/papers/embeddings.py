@@ -0,0 +1,102 @@
+import re
+import zlib
+from functools import lru_cache
+from typing import TYPE_CHECKING, Sequence
+
+from sqlalchemy import LargeBinary
+from sqlalchemy.types import TypeDecorator, UserDefinedType
+
+if TYPE_CHECKING:
+    import numpy as np
+
+EMBEDDING_DIM = 384
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+@lru_cache(maxsize=1 << 18)
+def _feature_slot(feature: str, dim: int):
+    digest = zlib.crc32(feature.encode())
+    return digest % dim, 1.0 if digest & 0x80000000 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedder: signed feature hashing of word unigrams and
+    bigrams into `dim` buckets, L2-normalized. Needs no model download, so
+    search runs offline and benchmark results are reproducible.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def encode(self, texts: Sequence[str]) -> "np.ndarray":
+        import numpy as np
+
+        from app.common.vector_index import normalize
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_RE.findall((text or "").lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                slot, sign = _feature_slot(feature, self.dim)
+                vectors[row, slot] += sign
+        return normalize(vectors)
+
+
+def paper_text(title: str, abstract: str | None) -> str:
+    return f"{title}\n{abstract or ''}"
+
+
+class _PGVector(UserDefinedType):
+    cache_ok = True
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def get_col_spec(self, **kw):
+        return f"VECTOR({self.dim})"
+
+
+class Vector(TypeDecorator):
+    """
+    Embedding column: pgvector's VECTOR(dim) on Postgres, raw float32 bytes
+    elsewhere. Values are NumPy float32 arrays on both sides; NumPy is only
+    imported once a value is converted, so the models load without it.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        super().__init__()
+        self.dim = dim
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(_PGVector(self.dim))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        import numpy as np
+
+        vector = np.asarray(value, dtype=np.float32)
+        if dialect.name == "postgresql":
+            return to_pgvector_literal(vector)
+        return vector.tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        import numpy as np
+
+        if dialect.name == "postgresql":
+            return np.array(value.strip("[]").split(","), dtype=np.float32)
+        return np.frombuffer(value, dtype=np.float32)
+
+
+def to_pgvector_literal(vector: "np.ndarray") -> str:
+    return "[" + ",".join(f"{x:.7g}" for x in vector.tolist()) + "]"
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import DDL, Boolean, Column, DateTime, Integer, String, Text, ForeignKey, event
 from sqlalchemy.orm import relationship
 from app import db
+from app.modules.papers.embeddings import EMBEDDING_DIM, Vector
 
 
 class Paper(db.Model):
@@ -10,7 +11,87 @@ class Paper(db.Model):
     title = Column(String(255), nullable=False)
     abstract = Column(Text, nullable=True)
     doi = Column(String(100), unique=True, nullable=False)
-    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False)
+    author_id = Column(Integer, ForeignKey("authors.id"), nullable=False, index=True)
 
     # Relationships
     author = relationship("Author", back_populates="papers")
+
+
+class PaperEmbedding(db.Model):
+    """
+    Abstract embedding, kept out of `papers` so list queries never load it.
+    """
+
+    __tablename__ = "paper_embeddings"
+
+    paper_id = Column(Integer, ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
+    embedded_at = Column(DateTime, nullable=True, index=True)
+
+
+class EmbeddingJob(db.Model):
+    """
+    Durable queue of papers waiting to be (re-)embedded, one row per paper.
+    Rows are enqueued by database triggers on paper insert and on title/abstract
+    change, so every write path (API, batch, COPY imports) feeds the queue without
+    an extra round trip. `version` is bumped when a queued paper changes again,
+    so a worker only deletes the job version it actually embedded.
+    """
+
+    __tablename__ = "embedding_jobs"
+
+    id = Column(Integer, primary_key=True)
+    paper_id = Column(Integer, ForeignKey("papers.id", ondelete="CASCADE"), unique=True, nullable=False)
+    version = Column(Integer, nullable=False, default=1)
+    attempts = Column(Integer, nullable=False, default=0)
+    failed = Column(Boolean, nullable=False, default=False)
+    # NULL means available now; set in the future for retry backoff
+    available_at = Column(DateTime, nullable=True)
+    # Lease start of the worker holding the job; expired leases are reclaimable
+    claimed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+
+ENQUEUE_UPSERT = """
+    INSERT INTO embedding_jobs (paper_id, version, attempts, failed) VALUES (NEW.id, 1, 0, {false})
+    ON CONFLICT (paper_id) DO UPDATE SET
+        version = embedding_jobs.version + 1, attempts = 0, failed = {false},
+        available_at = NULL, claimed_at = NULL, last_error = NULL
+"""
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_enqueue_embedding_insert AFTER INSERT ON papers
+    BEGIN {ENQUEUE_UPSERT.format(false=0)}; END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_enqueue_embedding_update AFTER UPDATE OF title, abstract ON papers
+    WHEN OLD.title IS NOT NEW.title OR OLD.abstract IS NOT NEW.abstract
+    BEGIN {ENQUEUE_UPSERT.format(false=0)}; END
+    """,
+]
+
+POSTGRES_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION enqueue_paper_embedding() RETURNS trigger AS $$
+    BEGIN {ENQUEUE_UPSERT.format(false="false")}; RETURN NULL; END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS papers_enqueue_embedding_insert ON papers",
+    """
+    CREATE TRIGGER papers_enqueue_embedding_insert AFTER INSERT ON papers
+    FOR EACH ROW EXECUTE FUNCTION enqueue_paper_embedding()
+    """,
+    "DROP TRIGGER IF EXISTS papers_enqueue_embedding_update ON papers",
+    """
+    CREATE TRIGGER papers_enqueue_embedding_update AFTER UPDATE OF title, abstract ON papers
+    FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title OR OLD.abstract IS DISTINCT FROM NEW.abstract)
+    EXECUTE FUNCTION enqueue_paper_embedding()
+    """,
+]
+
+# embedding_jobs is created after papers (it references it), so the triggers hang off its creation
+for statement in SQLITE_TRIGGERS:
+    event.listen(EmbeddingJob.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_TRIGGERS:
+    event.listen(EmbeddingJob.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
 from app import db
-from app.common.base_repository import BaseRepository
+from app.common.base_repository import BaseRepository, chunked
+from app.common.replicas import replica_read
 from app.modules.papers.models import Paper
 
 
@@ -8,5 +10,27 @@ class PaperRepository(BaseRepository[Paper]):
     def __init__(self):
         super().__init__(Paper)
 
+    @replica_read
     def get_by_doi(self, doi: str) -> Optional[Paper]:
         return self.session.query(Paper).filter_by(doi=doi).first()
+
+    @replica_read
+    def get_by_dois(self, dois: Iterable[str]) -> Dict[str, Paper]:
+        """
+        Resolves many DOIs at once, keyed by DOI. Missing DOIs are absent.
+        """
+        found: Dict[str, Paper] = {}
+        for chunk in chunked(list(set(dois))):
+            for paper in self.session.scalars(select(Paper).where(Paper.doi.in_(chunk))):
+                found[paper.doi] = paper
+        return found
+
+    @replica_read
+    def get_dois(self, ids: Iterable[int]) -> List[str]:
+        """
+        The DOIs of the papers with `ids` (missing ids are skipped).
+        """
+        dois: List[str] = []
+        for chunk in chunked(list(set(ids))):
+            dois.extend(self.session.scalars(select(Paper.doi).where(Paper.id.in_(chunk))))
+        return dois
@@ -1,6 +1,11 @@
-from flask import Blueprint, request, jsonify
-from app.modules.papers.service import PaperService
-from app.modules.papers.schemas import PaperCreateDTO
+from flask import Blueprint, current_app, request, jsonify
+from app.common.error_handler import AppError
+from app.modules.papers.service import PAPER_FIELDS, PAPER_LIST_FIELDS, PaperService
+from app.modules.papers.schemas import PaperCreateDTO, PaperResponseDTO
+from app.common.cache import cached
+from app.common.pagination import parse_fields, parse_keys, parse_limit, parse_page_args, set_page_headers
+from app.common.serialization import dump_json, json_response, projection
+from app.common.export import export_response
 from pydantic import ValidationError
 
 papers_bp = Blueprint("papers", __name__)
@@ -12,19 +17,81 @@ def create_paper():
     try:
         data = request.get_json()
         dto = PaperCreateDTO(**data)
-        result = service.create_paper(dto)
-        return jsonify(result.model_dump()), 201
+        result, created = service.create_paper(dto)
+        return jsonify(result.model_dump()), 201 if created else 200
     except ValidationError as e:
         return jsonify(e.errors()), 400
 
 
+@papers_bp.route("/batch", methods=["POST"])
+def create_papers_batch():
+    data = request.get_json()
+    items = data.get("items") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise AppError("Expected a JSON array of papers or an object with an 'items' array", 400)
+
+    max_items = current_app.config["PAPER_BATCH_MAX_ITEMS"]
+    if len(items) > max_items:
+        raise AppError(f"Batch exceeds the maximum of {max_items} papers", 413)
+
+    result = service.create_papers_batch(items)
+    status_code = 201 if result.created else 200
+    return jsonify(result.model_dump()), status_code
+
+
+@papers_bp.route("/search", methods=["GET"])
+def search_papers():
+    query = request.args.get("q", "").strip()
+    if not query:
+        raise AppError("Query parameter 'q' is required", 400)
+    limit = parse_limit(request.args, default=10, maximum=100)
+    mode = request.args.get("mode", "semantic")
+    if mode == "semantic":
+        results = service.search_papers(query, limit)
+    elif mode == "keyword":
+        results = service.keyword_search_papers(query, limit)
+    else:
+        raise AppError("mode must be 'semantic' or 'keyword'", 400)
+    return jsonify([r.model_dump() for r in results]), 200
+
+
+@papers_bp.route("/export", methods=["GET"])
+def export_papers():
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    return export_response(
+        lambda: service.export_papers(batch_size), PaperResponseDTO, request.args.get("format", "ndjson"), "papers"
+    )
+
+
+@papers_bp.route("/by-doi", methods=["GET"])
+@cached("papers")
+def get_papers_by_doi():
+    dois = parse_keys(request.args, "dois", current_app.config["LOOKUP_MAX_KEYS"], separator=None)
+    return jsonify(service.get_papers_by_doi(dois).model_dump()), 200
+
+
+# Also answers HEAD, as an existence check
+@papers_bp.route("/by-doi/<path:doi>", methods=["GET"])
+def get_paper_by_doi(doi):
+    result = service.get_paper_by_doi(doi)
+    return jsonify(result.model_dump()), 200
+
+
 @papers_bp.route("/<int:id>", methods=["GET"])
+@cached("papers", item="id")
 def get_paper(id):
     result = service.get_paper(id)
     return jsonify(result.model_dump()), 200
 
 
 @papers_bp.route("/", methods=["GET"])
+@cached("papers")
 def get_papers():
-    results = service.get_all_papers()
-    return jsonify([r.model_dump() for r in results]), 200
+    if "ids" in request.args:
+        ids = parse_keys(request.args, "ids", current_app.config["LOOKUP_MAX_KEYS"], int)
+        return jsonify(service.get_papers(ids).model_dump()), 200
+    limit, after, include_total = parse_page_args(request.args)
+    fields = parse_fields(request.args, PAPER_FIELDS, PAPER_LIST_FIELDS)
+    page = service.get_all_papers(limit=limit, after=after, include_total=include_total, fields=fields)
+    response = json_response(dump_json(page.items, projection(PaperResponseDTO, fields)))
+    return set_page_headers(response, page), 200
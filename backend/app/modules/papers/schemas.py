@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict, Field, BeforeValidator
-from typing import Optional, Annotated
+from typing import Optional, Annotated, List, Literal
 
 STRIP_WS = BeforeValidator(lambda v: v.strip() if isinstance(v, str) else v)
 
@@ -18,3 +18,22 @@ class PaperResponseDTO(PaperBaseDTO):
     id: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class PaperBatchItemResultDTO(BaseModel):
+    index: int
+    status: Literal["created", "existing", "error"]
+    paper: Optional[PaperResponseDTO] = None
+    error: Optional[str] = None
+
+
+class PaperBatchResponseDTO(BaseModel):
+    created: int
+    existing: int
+    errors: int
+    results: List[PaperBatchItemResultDTO]
+
+
+class PaperSearchResultDTO(BaseModel):
+    paper: PaperResponseDTO
+    score: float
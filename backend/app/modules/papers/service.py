@@ -1,29 +1,247 @@
-from typing import List, Optional
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from app.modules.papers.models import Paper
 from app.modules.papers.repository import PaperRepository
-from app.modules.papers.schemas import PaperCreateDTO, PaperResponseDTO
+from app.modules.papers.schemas import (
+    PaperBatchItemResultDTO,
+    PaperBatchResponseDTO,
+    PaperCreateDTO,
+    PaperResponseDTO,
+    PaperSearchResultDTO,
+)
 from app.common.error_handler import AppError
+from app.common.pagination import DEFAULT_PAGE_SIZE, Lookup, Page, decode_cursor, encode_cursor
+from app.common.serialization import dto_columns, projection
+from flask import current_app, has_app_context
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 
 from app.modules.authors.service import AuthorService
 
 
+# List responses leave out the unbounded abstract unless `fields` asks for it
+PAPER_FIELDS = tuple(PaperResponseDTO.model_fields)
+PAPER_LIST_FIELDS = tuple(name for name in PAPER_FIELDS if name != "abstract")
+
+
+def paper_lookup(keys: List, papers: Dict[Any, Paper]) -> Lookup:
+    """
+    The found `papers` in the order of `keys`, and the keys that were not found.
+    """
+    return Lookup.model_construct(
+        items=[PaperResponseDTO.model_validate(papers[key]) for key in keys if key in papers],
+        missing=[key for key in keys if key not in papers],
+    )
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}" for err in error.errors()
+    )
+
+
 class PaperService:
-    def __init__(self, repository=None, author_service=None):
+    def __init__(
+        self,
+        repository=None,
+        author_service=None,
+        embedding_repository=None,
+        embedder=None,
+        text_search_repository=None,
+        doi_filter=None,
+    ):
         self.repository = repository or PaperRepository()
         self.author_service = author_service or AuthorService()
+        # The search stack (NumPy, in-process indexes) loads on first use, not at
+        # boot, with the settings and session in effect now
+        self._search_config = current_app.config if has_app_context() else {}
+        self._embedding_repository = embedding_repository
+        self._embedder = embedder
+        self._text_search_repository = text_search_repository
+        self._doi_filter = doi_filter
+        self._search_lock = threading.Lock()
+
+    @property
+    def embedding_repository(self):
+        if self._embedding_repository is None:
+            with self._search_lock:
+                if self._embedding_repository is None:
+                    from app.modules.papers.embedding_repository import create_embedding_repository
+
+                    embedding_repository = create_embedding_repository(self._search_config)
+                    embedding_repository.session = self.repository.session
+                    self._embedding_repository = embedding_repository
+        return self._embedding_repository
 
-    def create_paper(self, data: PaperCreateDTO) -> PaperResponseDTO:
-        # Validate author existence via service
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            from app.modules.papers.embeddings import HashingEmbedder
+
+            self._embedder = HashingEmbedder()
+        return self._embedder
+
+    @property
+    def text_search_repository(self):
+        if self._text_search_repository is None:
+            with self._search_lock:
+                if self._text_search_repository is None:
+                    from app.modules.papers.text_search_repository import create_text_search_repository
+
+                    text_search_repository = create_text_search_repository(self._search_config)
+                    text_search_repository.session = self.repository.session
+                    self._text_search_repository = text_search_repository
+        return self._text_search_repository
+
+    @property
+    def doi_filter(self):
+        """
+        The DOI membership filter, or None where every DOI is looked up: with
+        DOI_FILTER_ENABLED off, and on mirrors serving a snapshot.
+        """
+        if self._doi_filter is None:
+            if not self._search_config.get("DOI_FILTER_ENABLED", True):
+                return None
+            with self._search_lock:
+                if self._doi_filter is None:
+                    from app.modules.papers.doi_filter import DoiFilter
+
+                    config = self._search_config
+                    self._doi_filter = DoiFilter(
+                        self.repository,
+                        capacity=config.get("DOI_FILTER_CAPACITY", 100000),
+                        error_rate=config.get("DOI_FILTER_ERROR_RATE", 0.01),
+                        refresh_seconds=config.get("DOI_FILTER_REFRESH_SECONDS", 1.0),
+                        path=config.get("DOI_FILTER_PATH", ""),
+                        save_seconds=config.get("DOI_FILTER_SAVE_SECONDS", 300.0),
+                    )
+        if has_app_context() and current_app.extensions.get("snapshot"):
+            return None
+        return self._doi_filter
+
+    def create_paper(self, data: PaperCreateDTO) -> Tuple[PaperResponseDTO, bool]:
+        """
+        Creates the paper, or returns the existing one for an already-ingested DOI.
+        A DOI the filter may contain is read first, which is all a resubmission
+        costs; anything else is one conflict-driven insert, where the author
+        foreign key rejects unknown authors.
+        Returns the paper and whether it was newly created.
+        """
+        doi_filter = self.doi_filter
+        if doi_filter is not None and doi_filter.may_contain(data.doi):
+            paper = self.repository.get_by_doi(data.doi)
+            if paper is not None:
+                return PaperResponseDTO.model_validate(paper), False
+            doi_filter.false_positives()
         try:
-            self.author_service.get_author(data.author_id)
-        except AppError:
+            paper, created = self.repository.get_or_create("doi", **data.model_dump())
+        except IntegrityError:
             raise AppError("Author not found", 404)
+        if created:
+            self.text_search_repository.index_papers([paper])
+            if doi_filter is not None:
+                doi_filter.add([paper.doi])
+        return PaperResponseDTO.model_validate(paper), created
 
-        if self.repository.get_by_doi(data.doi):
-            existing = self.repository.get_by_doi(data.doi)
-            return PaperResponseDTO.model_validate(existing)
+    def create_papers_batch(self, items: List[Any]) -> PaperBatchResponseDTO:
+        """
+        Ingests many raw paper payloads with a fixed number of queries: one author-id
+        lookup, one DOI lookup (of just the DOIs the filter may contain) and one
+        multi-row insert. Each item gets its own result;
+        a DOI that already exists (or repeats within the batch) resolves to the
+        existing record, as in `create_paper`.
+        """
+        results: List[Optional[PaperBatchItemResultDTO]] = [None] * len(items)
 
-        paper = self.repository.create(**data.model_dump())
-        return PaperResponseDTO.model_validate(paper)
+        valid: List[Tuple[int, PaperCreateDTO]] = []
+        for index, item in enumerate(items):
+            try:
+                valid.append((index, PaperCreateDTO.model_validate(item)))
+            except ValidationError as e:
+                results[index] = PaperBatchItemResultDTO(
+                    index=index, status="error", error=_format_validation_error(e)
+                )
+
+        known_authors = self.author_service.existing_author_ids(dto.author_id for _, dto in valid)
+        doi_filter = self.doi_filter
+        dois = [dto.doi for _, dto in valid]
+        if doi_filter is not None:
+            # DOIs the filter rules out go straight to the insert, which also
+            # resolves any that were written in the meantime
+            dois = doi_filter.may_contain_many(dois)
+        existing = self.repository.get_by_dois(dois)
+        if doi_filter is not None:
+            doi_filter.false_positives(len(dois) - len(existing))
+
+        to_insert: List[Tuple[int, PaperCreateDTO]] = []
+        repeated: List[Tuple[int, str]] = []
+        pending_index: Dict[str, int] = {}
+        for index, dto in valid:
+            if dto.author_id not in known_authors:
+                results[index] = PaperBatchItemResultDTO(index=index, status="error", error="Author not found")
+            elif dto.doi in existing:
+                results[index] = PaperBatchItemResultDTO(
+                    index=index, status="existing", paper=PaperResponseDTO.model_validate(existing[dto.doi])
+                )
+            elif dto.doi in pending_index:
+                repeated.append((index, dto.doi))
+            else:
+                pending_index[dto.doi] = index
+                to_insert.append((index, dto))
+
+        rows = self.repository.bulk_create([dto.model_dump() for _, dto in to_insert], skip_conflicts_on="doi")
+        self.text_search_repository.index_papers(rows)
+        if doi_filter is not None:
+            doi_filter.add(row.doi for row in rows)
+        created_by_doi: Dict[str, PaperResponseDTO] = {row.doi: PaperResponseDTO.model_validate(row) for row in rows}
+
+        # DOIs skipped by the insert were written by a concurrent ingest in the meantime
+        raced = self.repository.get_by_dois(dto.doi for _, dto in to_insert if dto.doi not in created_by_doi)
+        for index, dto in to_insert:
+            if dto.doi in created_by_doi:
+                results[index] = PaperBatchItemResultDTO(index=index, status="created", paper=created_by_doi[dto.doi])
+            else:
+                results[index] = PaperBatchItemResultDTO(
+                    index=index, status="existing", paper=PaperResponseDTO.model_validate(raced[dto.doi])
+                )
+
+        for index, doi in repeated:
+            results[index] = PaperBatchItemResultDTO(
+                index=index, status="existing", paper=results[pending_index[doi]].paper
+            )
+
+        return PaperBatchResponseDTO(
+            created=sum(r.status == "created" for r in results),
+            existing=sum(r.status == "existing" for r in results),
+            errors=sum(r.status == "error" for r in results),
+            results=results,
+        )
+
+    def search_papers(self, query: str, limit: int = 10) -> List[PaperSearchResultDTO]:
+        """
+        Semantic search: ranks papers by cosine similarity between the query
+        embedding and their title + abstract embeddings. Embeddings are written
+        by the background embedding worker, so new papers show up once it has
+        processed their job.
+        """
+        hits = self.embedding_repository.search(self.embedder.encode([query]), limit)
+        return self._search_results(hits)
+
+    def keyword_search_papers(self, query: str, limit: int = 10) -> List[PaperSearchResultDTO]:
+        """
+        Keyword search: BM25 ranking over titles and abstracts. Quoted phrases
+        must appear verbatim; new papers are searchable as soon as they are created.
+        """
+        hits = self.text_search_repository.search(query, limit)
+        return self._search_results(hits)
+
+    def _search_results(self, hits: List[Tuple[int, float]]) -> List[PaperSearchResultDTO]:
+        papers = self.repository.get_by_ids(paper_id for paper_id, _ in hits)
+        return [
+            PaperSearchResultDTO(paper=PaperResponseDTO.model_validate(papers[paper_id]), score=score)
+            for paper_id, score in hits
+            if paper_id in papers
+        ]
 
     def get_paper(self, paper_id: int) -> PaperResponseDTO:
         paper = self.repository.get_by_id(paper_id)
@@ -31,6 +249,57 @@ class PaperService:
             raise AppError("Paper not found", 404)
         return PaperResponseDTO.model_validate(paper)
 
-    def get_all_papers(self) -> List[PaperResponseDTO]:
-        papers = self.repository.get_all()
-        return [PaperResponseDTO.model_validate(p) for p in papers]
+    def get_paper_by_doi(self, doi: str) -> PaperResponseDTO:
+        """
+        The paper with `doi`, from the unique index. The DOI filter is not
+        consulted: it lags behind other workers' writes, and only ingest, where
+        the conflict-driven insert resolves a DOI it missed, can act on its negatives.
+        """
+        paper = self.repository.get_by_doi(doi)
+        if not paper:
+            raise AppError("Paper not found", 404)
+        return PaperResponseDTO.model_validate(paper)
+
+    def get_papers(self, paper_ids: List[int]) -> Lookup[int, PaperResponseDTO]:
+        """
+        The papers with `paper_ids`, in that order, from one IN query; ids without
+        a paper are listed as missing.
+        """
+        papers = self.repository.get_by_ids(paper_ids)
+        return paper_lookup(paper_ids, papers)
+
+    def get_papers_by_doi(self, dois: List[str]) -> Lookup[str, PaperResponseDTO]:
+        """
+        `get_papers` keyed by DOI.
+        """
+        papers = self.repository.get_by_dois(dois)
+        return paper_lookup(dois, papers)
+
+    def get_all_papers(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[str] = None,
+        include_total: bool = False,
+        fields: Tuple[str, ...] = PAPER_LIST_FIELDS,
+    ) -> Page:
+        """
+        One keyset page whose items are column rows of just `fields`, shaped like
+        `projection(PaperResponseDTO, fields)` and ready for `dump_json`.
+        """
+        rows, next_id = self.repository.get_page_rows(
+            dto_columns(Paper, projection(PaperResponseDTO, fields)),
+            limit=limit,
+            after=decode_cursor(after) if after else None,
+        )
+        # Rows are trusted database output; the page itself needs no validation either
+        return Page.model_construct(
+            items=rows,
+            next_cursor=encode_cursor(next_id) if next_id is not None else None,
+            total_estimate=self.repository.estimate_count() if include_total else None,
+        )
+
+    def export_papers(self, batch_size: int) -> Iterator[List]:
+        """
+        Every paper as column rows shaped like `PaperResponseDTO`, in batches.
+        """
+        return self.repository.stream_rows(dto_columns(Paper, PaperResponseDTO), batch_size=batch_size)
@@ -0,0 +1,165 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, has_app_context
+from sqlalchemy import select, text
+
+from app.common.base_repository import BaseRepository, chunked
+from app.common.text_index import InvertedIndex, parse_query
+from app.modules.changes.repository import ChangeRepository
+from app.modules.papers.embeddings import paper_text
+from app.modules.papers.models import Paper
+
+LOAD_BATCH_SIZE = 10000
+CATCH_UP_BATCH_SIZE = 1000
+
+
+class TextSearchRepository(BaseRepository[Paper], ABC):
+    """
+    Keyword search over paper titles and abstracts.
+    Queries accept free terms and "quoted phrases".
+    """
+
+    def __init__(self):
+        super().__init__(Paper)
+
+    def index_papers(self, papers) -> None:
+        """
+        Makes freshly written papers searchable; a no-op where the database indexes them.
+        """
+
+    @abstractmethod
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        """
+        Returns up to `k` (paper_id, score) pairs, best first.
+        """
+
+
+class InMemoryTextSearchRepository(TextSearchRepository):
+    """
+    BM25 over an in-process inverted index. Built from `papers` on first search,
+    updated directly for papers created by this process and caught up from the
+    change feed (inserts, updates and deletes by other processes) at most every
+    `refresh_seconds`. Phrases are matched on the index's token positions, so
+    searching never reads the database.
+    """
+
+    def __init__(self, index: Optional[InvertedIndex] = None, refresh_seconds: float = 5.0):
+        self.changes = ChangeRepository()
+        super().__init__()
+        self.index = index if index is not None else InvertedIndex()
+        self.refresh_seconds = refresh_seconds
+        self._position: Optional[Tuple[int, int]] = None
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def session(self):
+        return self._session
+
+    @session.setter
+    def session(self, session) -> None:
+        # The change feed is read through the same session as the papers
+        self._session = session
+        self.changes.session = session
+
+    def index_papers(self, papers) -> None:
+        for paper in papers:
+            self.index.add(paper.id, paper_text(paper.title, paper.abstract))
+
+    def refresh(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and self._refreshed_at is not None and now - self._refreshed_at < self.refresh_seconds:
+            return
+        with self._refresh_lock:
+            if self._position is None:
+                self._load()
+            if not self._catch_up():
+                # Changes were pruned before this process saw them: rebuild
+                self.index = InvertedIndex(self.index.k1, self.index.b)
+                self._load()
+                self._catch_up()
+            if self.index.tombstones > len(self.index):
+                self.index.compact()
+            self._refreshed_at = now
+
+    def _load(self) -> None:
+        # Changes from this position on are replayed, so writes made while the
+        # table is being read are not missed
+        self._position = self.changes.head()
+        result = self.session.execute(
+            select(Paper.id, Paper.title, Paper.abstract)
+            .order_by(Paper.id)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+            self.index_papers(rows)
+
+    def _catch_up(self) -> bool:
+        """
+        Applies the changes since the last catch-up; False if some were pruned unseen.
+        """
+        while True:
+            changes = self.changes.get_after(self._position, CATCH_UP_BATCH_SIZE)
+            if not changes:
+                return True
+            if self.changes.expired(self._position):
+                return False
+            # The last change of each paper decides; its current row is read anyway
+            deleted: Dict[int, bool] = {}
+            for change in changes:
+                if change.entity == "papers":
+                    deleted[change.entity_id] = change.op == "delete"
+            written = [paper_id for paper_id, is_deleted in deleted.items() if not is_deleted]
+            found = set()
+            for chunk in chunked(written):
+                rows = self.session.execute(
+                    select(Paper.id, Paper.title, Paper.abstract).where(Paper.id.in_(chunk))
+                ).all()
+                self.index_papers(rows)
+                found.update(row.id for row in rows)
+            for paper_id in deleted:
+                if paper_id not in found:
+                    self.index.remove(paper_id)
+            self._position = (changes[-1].txid, changes[-1].seq)
+            if len(changes) < CATCH_UP_BATCH_SIZE:
+                return True
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        self.refresh()
+        terms, phrases = parse_query(query)
+        required = {term for phrase in phrases for term in phrase}
+        return self.index.search(terms, k, required=required, phrases=phrases)
+
+
+class PostgresTextSearchRepository(TextSearchRepository):
+    """
+    Full-text search on a generated, weighted `tsvector` column (title 'A',
+    abstract 'B') with a GIN index, both added by migration 0003.
+    `websearch_to_tsquery` handles the same free-term / "quoted phrase" syntax.
+    """
+
+    def search(self, query: str, k: int) -> List[Tuple[int, float]]:
+        rows = self.session.execute(
+            text(
+                "SELECT id, ts_rank_cd(search_vector, q) AS score "
+                "FROM papers, websearch_to_tsquery('english', :query) AS q "
+                "WHERE search_vector @@ q ORDER BY score DESC LIMIT :k"
+            ),
+            {"query": query, "k": k},
+        ).all()
+        return [(row.id, float(row.score)) for row in rows]
+
+
+def create_text_search_repository(config: Optional[dict] = None) -> TextSearchRepository:
+    if config is None:
+        config = current_app.config if has_app_context() else {}
+
+    backend = config.get("KEYWORD_SEARCH_BACKEND", "memory")
+    if backend == "postgres":
+        return PostgresTextSearchRepository()
+    if backend != "memory":
+        raise ValueError(f"Unknown KEYWORD_SEARCH_BACKEND: {backend}")
+    return InMemoryTextSearchRepository(refresh_seconds=config.get("SEARCH_REFRESH_SECONDS", 5.0))
@@ -0,0 +1,11 @@
+"""
+Async entry point: hypercorn asgi:app (see app.asgi for what it serves)
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.asgi import create_asgi_app
+
+app = create_asgi_app(os.environ.get("APP_CONFIG", "config.ProdConfig"))
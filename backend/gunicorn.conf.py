@@ -0,0 +1,67 @@
+"""
+Gunicorn settings for serving the API in production:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Each setting comes from the environment. GUNICORN_CMD_ARGS still overrides
+anything here.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# "sync" (one request at a time per worker), "gthread" (GUNICORN_THREADS per
+# worker) or "gevent" (GUNICORN_WORKER_CONNECTIONS greenlets per worker, needs
+# the gevent extra). Keep DB_POOL_SIZE + DB_MAX_OVERFLOW >= concurrent requests
+# per worker, or requests queue on the pool.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+# Recycle workers after this many requests (0 = never), jittered so they do not all restart at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 0))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 0))
+
+# Import the app once in the master; workers fork with it loaded (faster
+# start, shared memory pages) and re-initialise their own connections in post_fork
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# Heartbeat files on tmpfs: a disk-backed /tmp can stall workers (e.g. in Docker)
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+# The app writes its own (sampled) access log
+accesslog = None
+
+if worker_class == "gevent":
+    # Must run before the app and its database driver are imported
+    from gevent import monkey
+
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        pass
+    else:
+        # Lets psycopg2 yield to other greenlets while waiting on the server
+        patch_psycopg()
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import init_worker
+        from wsgi import app
+
+        init_worker(app)
+
+
+def post_worker_init(worker):
+    # Runs with or without preload_app, once the worker has loaded the app
+    from app import warm_worker
+
+    warm_worker(worker.wsgi)
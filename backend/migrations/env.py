@@ -0,0 +1,50 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+
+from app import db
+# Registers every table on db.metadata, for autogenerate
+import app.modules.authors.models  # noqa: F401
+import app.modules.changes.models  # noqa: F401
+import app.modules.papers.models  # noqa: F401
+from config import Config
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logging", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = db.metadata
+
+
+def database_url() -> str:
+    return config.get_main_option("sqlalchemy.url") or Config.SQLALCHEMY_DATABASE_URI
+
+
+def run_migrations_offline() -> None:
+    """
+    Emits the SQL instead of running it (`alembic upgrade head --sql`).
+    """
+    context.configure(url=database_url(), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    engine = create_engine(database_url())
+    with engine.connect() as connection:
+        # render_as_batch: SQLite can only alter tables by copying them
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
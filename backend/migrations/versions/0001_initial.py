@@ -0,0 +1,119 @@
+"""
+Initial schema: authors, papers, paper embeddings and the embedding job queue
+with its enqueue triggers, as `db.create_all()` created it before migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.types import UserDefinedType
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+EMBEDDING_DIM = 384
+
+
+class _Vector(UserDefinedType):
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return f"VECTOR({EMBEDDING_DIM})"
+
+
+ENQUEUE_UPSERT = """
+    INSERT INTO embedding_jobs (paper_id, version, attempts, failed) VALUES (NEW.id, 1, 0, {false})
+    ON CONFLICT (paper_id) DO UPDATE SET
+        version = embedding_jobs.version + 1, attempts = 0, failed = {false},
+        available_at = NULL, claimed_at = NULL, last_error = NULL
+"""
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_enqueue_embedding_insert AFTER INSERT ON papers
+    BEGIN {ENQUEUE_UPSERT.format(false=0)}; END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS papers_enqueue_embedding_update AFTER UPDATE OF title, abstract ON papers
+    WHEN OLD.title IS NOT NEW.title OR OLD.abstract IS NOT NEW.abstract
+    BEGIN {ENQUEUE_UPSERT.format(false=0)}; END
+    """,
+]
+
+POSTGRES_TRIGGERS = [
+    f"""
+    CREATE OR REPLACE FUNCTION enqueue_paper_embedding() RETURNS trigger AS $$
+    BEGIN {ENQUEUE_UPSERT.format(false="false")}; RETURN NULL; END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER papers_enqueue_embedding_insert AFTER INSERT ON papers
+    FOR EACH ROW EXECUTE FUNCTION enqueue_paper_embedding()
+    """,
+    """
+    CREATE TRIGGER papers_enqueue_embedding_update AFTER UPDATE OF title, abstract ON papers
+    FOR EACH ROW WHEN (OLD.title IS DISTINCT FROM NEW.title OR OLD.abstract IS DISTINCT FROM NEW.abstract)
+    EXECUTE FUNCTION enqueue_paper_embedding()
+    """,
+]
+
+
+def upgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    if postgres:
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    op.create_table(
+        "authors",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("bio", sa.Text, nullable=True),
+        sa.Column("email", sa.String(120), nullable=False, unique=True),
+    )
+    op.create_table(
+        "papers",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("abstract", sa.Text, nullable=True),
+        sa.Column("doi", sa.String(100), nullable=False, unique=True),
+        sa.Column("author_id", sa.Integer, sa.ForeignKey("authors.id"), nullable=False),
+    )
+    op.create_table(
+        "paper_embeddings",
+        sa.Column("paper_id", sa.Integer, sa.ForeignKey("papers.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("embedding", _Vector() if postgres else sa.LargeBinary, nullable=False),
+        sa.Column("embedded_at", sa.DateTime, nullable=True),
+    )
+    op.create_index("ix_paper_embeddings_embedded_at", "paper_embeddings", ["embedded_at"])
+    op.create_table(
+        "embedding_jobs",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("paper_id", sa.Integer, sa.ForeignKey("papers.id", ondelete="CASCADE"), nullable=False, unique=True),
+        sa.Column("version", sa.Integer, nullable=False),
+        sa.Column("attempts", sa.Integer, nullable=False),
+        sa.Column("failed", sa.Boolean, nullable=False),
+        sa.Column("available_at", sa.DateTime, nullable=True),
+        sa.Column("claimed_at", sa.DateTime, nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+    )
+    for statement in POSTGRES_TRIGGERS if postgres else SQLITE_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS papers_enqueue_embedding_insert ON papers")
+        op.execute("DROP TRIGGER IF EXISTS papers_enqueue_embedding_update ON papers")
+        op.execute("DROP FUNCTION IF EXISTS enqueue_paper_embedding()")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS papers_enqueue_embedding_insert")
+        op.execute("DROP TRIGGER IF EXISTS papers_enqueue_embedding_update")
+    op.drop_table("embedding_jobs")
+    op.drop_index("ix_paper_embeddings_embedded_at", "paper_embeddings")
+    op.drop_table("paper_embeddings")
+    op.drop_table("papers")
+    op.drop_table("authors")
@@ -0,0 +1,28 @@
+"""
+Index papers.author_id, used by the author include queries and the foreign key.
+
+Built concurrently on Postgres, so papers stays writable meanwhile. IF NOT
+EXISTS covers databases where create_all() already added it.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_papers_author_id ON papers (author_id)")
+    else:
+        op.create_index("ix_papers_author_id", "papers", ["author_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_papers_author_id", "papers", if_exists=True)
@@ -0,0 +1,45 @@
+"""
+Search support on Postgres: the weighted tsvector column with its GIN index
+(KEYWORD_SEARCH_BACKEND=postgres) and the HNSW index on embeddings
+(SEARCH_BACKEND=pgvector). These were created on first search before.
+
+Adding the generated column rewrites papers under an exclusive lock; the
+indexes are built concurrently. Nothing to do on other databases, where
+search runs in process.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(
+        "ALTER TABLE papers ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(abstract, '')), 'B')) STORED"
+    )
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_papers_search_vector ON papers USING GIN (search_vector)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_paper_embeddings_hnsw "
+            "ON paper_embeddings USING hnsw (embedding vector_cosine_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("DROP INDEX IF EXISTS ix_paper_embeddings_hnsw")
+    op.execute("DROP INDEX IF EXISTS ix_papers_search_vector")
+    op.execute("ALTER TABLE papers DROP COLUMN IF EXISTS search_vector")
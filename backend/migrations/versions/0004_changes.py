@@ -0,0 +1,93 @@
+"""
+Change feed: the changes table, its triggers on authors and papers, and one
+insert change per existing row, so a consumer reading the feed from the start
+sees the whole catalog. Databases where create_all() already made the table
+keep their feed as it is.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = ("authors", "papers")
+
+SQLITE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_record_{op_name} AFTER {op_name.upper()} ON {table}
+    BEGIN INSERT INTO changes (entity, entity_id, op) VALUES ('{table}', {row}.id, '{op_name}'); END
+    """
+    for table in TRACKED_TABLES
+    for op_name, row in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD"))
+]
+
+POSTGRES_TRIGGERS = [
+    """
+    CREATE OR REPLACE FUNCTION record_change() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO changes (txid, entity, entity_id, op) VALUES (
+            txid_current(), TG_TABLE_NAME, CASE WHEN TG_OP = 'DELETE' THEN OLD.id ELSE NEW.id END, lower(TG_OP)
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    *(
+        statement
+        for table in TRACKED_TABLES
+        for statement in (
+            f"DROP TRIGGER IF EXISTS {table}_record_change ON {table}",
+            f"""
+            CREATE TRIGGER {table}_record_change AFTER INSERT OR UPDATE OR DELETE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION record_change()
+            """,
+        )
+    ),
+]
+
+
+def _has_changes_table() -> bool:
+    # With --sql there is no database to look at
+    if op.get_context().as_sql:
+        return False
+    return "changes" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    postgres = op.get_bind().dialect.name == "postgresql"
+    if not _has_changes_table():
+        op.create_table(
+            "changes",
+            sa.Column("seq", sa.BigInteger().with_variant(sa.Integer, "sqlite"), primary_key=True),
+            sa.Column("txid", sa.BigInteger, nullable=False, server_default="0"),
+            sa.Column("entity", sa.String(50), nullable=False),
+            sa.Column("entity_id", sa.Integer, nullable=False),
+            sa.Column("op", sa.String(10), nullable=False),
+            sqlite_autoincrement=True,
+        )
+        op.create_index("ix_changes_position", "changes", ["txid", "seq"])
+        # txid 0 puts the existing rows before every change made from here on
+        for table in TRACKED_TABLES:
+            op.execute(
+                f"INSERT INTO changes (entity, entity_id, op) SELECT '{table}', id, 'insert' FROM {table} ORDER BY id"
+            )
+    for statement in POSTGRES_TRIGGERS if postgres else SQLITE_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        for table in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_record_change ON {table}")
+        op.execute("DROP FUNCTION IF EXISTS record_change()")
+    else:
+        for table in TRACKED_TABLES:
+            for op_name in ("insert", "update", "delete"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_record_{op_name}")
+    op.drop_table("changes")
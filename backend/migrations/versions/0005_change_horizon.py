@@ -0,0 +1,36 @@
+"""
+Change feed retention: the change_horizon table, where pruning records the
+position of the last change it deleted.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _has_horizon_table() -> bool:
+    # With --sql there is no database to look at
+    if op.get_context().as_sql:
+        return False
+    return "change_horizon" in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade() -> None:
+    if not _has_horizon_table():
+        op.create_table(
+            "change_horizon",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("txid", sa.BigInteger, nullable=False),
+            sa.Column("seq", sa.BigInteger, nullable=False),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("change_horizon")
@@ -0,0 +1,87 @@
+"""
+Recall vs latency benchmark for the in-process vector indexes.
+
+    python scripts/bench_vector_search.py --size 1000000 --nlist 1024 --nprobe 4 8 16 32
+
+Vectors are clustered Gaussian noise in the embedding dimension; ground truth
+comes from the exact index.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add backend to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.common.vector_index import ExactVectorIndex, IVFVectorIndex, normalize
+from app.modules.papers.embeddings import EMBEDDING_DIM
+
+
+def clustered_vectors(size, dim, clusters, seed):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype(np.float32)
+    vectors = np.empty((size, dim), dtype=np.float32)
+    for start in range(0, size, 100000):
+        end = min(start + 100000, size)
+        noise = rng.normal(scale=0.6, size=(end - start, dim)).astype(np.float32)
+        vectors[start:end] = centers[rng.integers(0, clusters, end - start)] + noise
+    return normalize(vectors)
+
+
+def timed_search(index, queries, k):
+    latencies = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        ids, _ = index.search(query, k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results.append(ids[0])
+    return results, np.percentile(latencies, [50, 95, 99])
+
+
+def recall(truth, found, k):
+    return float(np.mean([len(set(t[:k]) & set(f[:k])) / k for t, f in zip(truth, found)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=2000)
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Generating {args.size} x {EMBEDDING_DIM} vectors...")
+    vectors = clustered_vectors(args.size, EMBEDDING_DIM, args.clusters, args.seed)
+    ids = np.arange(args.size)
+    queries = vectors[np.random.default_rng(args.seed + 1).choice(args.size, args.queries, replace=False)]
+
+    exact = ExactVectorIndex(EMBEDDING_DIM, initial_capacity=args.size)
+    started = time.perf_counter()
+    exact.add(ids, vectors)
+    print(f"exact  build={time.perf_counter() - started:.1f}s")
+    truth, (p50, p95, p99) = timed_search(exact, queries, args.k)
+    print(f"exact  recall@{args.k}=1.000 p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms")
+
+    ivf = IVFVectorIndex(EMBEDDING_DIM, nlist=args.nlist, seed=args.seed)
+    started = time.perf_counter()
+    ivf.add(ids, vectors)
+    ivf.train()
+    print(f"ivf    build={time.perf_counter() - started:.1f}s (nlist={args.nlist})")
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        found, (p50, p95, p99) = timed_search(ivf, queries, args.k)
+        print(
+            f"ivf    nprobe={nprobe:<4} recall@{args.k}={recall(truth, found, args.k):.3f} "
+            f"p50={p50:.2f}ms p95={p95:.2f}ms p99={p99:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Backend benchmark suite: ingest, lookup, list and search at scale.
+
+    python scripts/benchmark.py --sizes 10000 100000 --output bench.json
+    python scripts/benchmark.py --sizes 10000 --baseline bench.json   # exits 1 on regression
+    python scripts/benchmark.py --database-url postgresql://... --sizes 1000000
+
+Each size gets a freshly seeded database (SQLite files in a temp directory
+unless --database-url points at a disposable Postgres database, which is
+wiped), with every paper embedded for the semantic search scenarios. Every scenario is timed per call, once through the service layer and
+once through the Flask test client, and reports throughput, latency
+percentiles and SQL statements per call. The response cache is off unless
+--cache is given, so routes measure real work.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+from sqlalchemy import event
+
+# Add backend to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app, db
+from app.common.bulk_import import Checkpoint, run_import, synthetic_authors, synthetic_papers
+from app.common.cache import response_cache
+from app.common.pagination import encode_cursor
+from app.modules.authors.repository import AuthorRepository
+from app.modules.authors.schemas import AuthorCreateDTO
+from app.modules.authors.service import AuthorService
+from app.modules.papers.embedding_worker import EmbeddingWorker
+from app.modules.papers.repository import PaperRepository
+from app.modules.papers.schemas import PaperCreateDTO
+from app.modules.papers.service import PaperService
+from config import Config
+
+PAPERS_PER_AUTHOR = 10
+SEED = 0
+
+
+def bench_config(database_url, cache):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_url
+        CACHE_BACKEND = "memory" if cache else "none"
+        LOG_LEVEL = "WARNING"
+        LOG_ACCESS_SAMPLE_RATE = 0.0
+        LOG_SLOW_REQUEST_MS = float("inf")
+        SEARCH_BACKEND = "numpy"
+        KEYWORD_SEARCH_BACKEND = "memory"
+        SEARCH_REFRESH_SECONDS = 3600.0
+
+    return BenchConfig
+
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def seed(size):
+    authors = max(size // PAPERS_PER_AUTHOR, 1)
+    checkpoint = Checkpoint(None)
+    author_repository = AuthorRepository()
+    started = time.perf_counter()
+    run_import(
+        synthetic_authors(0, authors, SEED), AuthorCreateDTO, author_repository, "email", checkpoint, "authors"
+    )
+    run_import(
+        synthetic_papers(0, size, author_repository.all_ids(), SEED),
+        PaperCreateDTO, PaperRepository(), "doi", checkpoint, "papers",
+    )
+    elapsed = time.perf_counter() - started
+
+    # Semantic search needs vectors: the inserts queued an embedding job per
+    # paper, drained here with the deterministic hashing embedder
+    embed_started = time.perf_counter()
+    worker = EmbeddingWorker(processes=0)
+    try:
+        embedded = worker.drain()
+    finally:
+        worker.close()
+    return {
+        "rows": size + authors,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round((size + authors) / elapsed),
+        "embedded": embedded,
+        "embed_seconds": round(time.perf_counter() - embed_started, 3),
+    }
+
+
+def measure(call, iterations, warmup, queries):
+    # Warmup also builds lazily loaded state (search indexes, prepared caches)
+    for _ in range(warmup):
+        call()
+    latencies = np.empty(iterations)
+    before = queries.count
+    started = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        call()
+        latencies[i] = time.perf_counter() - t0
+    total = time.perf_counter() - started
+    p50, p95, p99 = np.percentile(latencies * 1000, [50, 95, 99])
+    return {
+        "iterations": iterations,
+        "ops_per_second": round(iterations / total, 1),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(latencies.max() * 1000, 3),
+        "queries_per_op": round((queries.count - before) / iterations, 2),
+    }
+
+
+def scenarios(client, size, rng):
+    papers = PaperService()
+    authors = AuthorService()
+    paper_ids = PaperRepository().all_ids()
+    author_ids = AuthorRepository().all_ids()
+    # Resume from the middle of the table for the deep-page scenarios
+    deep = encode_cursor(paper_ids[len(paper_ids) // 2])
+    counter = iter(range(10**9))
+
+    def new_paper():
+        i = next(counter)
+        return PaperCreateDTO(
+            title=f"Benchmark paper {i}", abstract="Measuring ingest latency under load.",
+            doi=f"10.9999/bench.{size}.{i}.{rng.random()}", author_id=rng.choice(author_ids),
+        )
+
+    def batch(n):
+        return [new_paper().model_dump() for _ in range(n)]
+
+    return {
+        "service.create_paper": lambda: papers.create_paper(new_paper()),
+        "service.create_papers_batch[100]": lambda: papers.create_papers_batch(batch(100)),
+        "service.get_paper": lambda: papers.get_paper(rng.choice(paper_ids)),
+        "service.get_all_papers[first]": lambda: papers.get_all_papers(limit=100),
+        "service.get_all_papers[deep]": lambda: papers.get_all_papers(limit=100, after=deep),
+        "service.get_author": lambda: authors.get_author(rng.choice(author_ids)),
+        "service.get_author[include=papers]": lambda: authors.get_author(
+            rng.choice(author_ids), include=frozenset({"papers"})
+        ),
+        "service.get_all_authors[include=papers]": lambda: authors.get_all_authors(
+            limit=100, include=frozenset({"papers"})
+        ),
+        "service.search_papers": lambda: papers.search_papers("synergy network", 10),
+        "service.keyword_search_papers": lambda: papers.keyword_search_papers("synergy network", 10),
+        "service.keyword_search_papers[phrase]": lambda: papers.keyword_search_papers('"zero tolerance"', 10),
+        "route.POST /api/papers/": lambda: client.post("/api/papers/", json=new_paper().model_dump()),
+        "route.GET /api/papers/<id>": lambda: client.get(f"/api/papers/{rng.choice(paper_ids)}"),
+        "route.GET /api/papers/": lambda: client.get("/api/papers/?limit=100"),
+        "route.GET /api/papers/ [deep]": lambda: client.get(f"/api/papers/?limit=100&after={deep}"),
+        "route.GET /api/authors/<id>?include=papers": lambda: client.get(
+            f"/api/authors/{rng.choice(author_ids)}?include=papers"
+        ),
+        "route.GET /api/authors/": lambda: client.get("/api/authors/?limit=100"),
+        "route.GET /api/papers/search?mode=semantic": lambda: client.get(
+            "/api/papers/search?q=synergy+network&mode=semantic"
+        ),
+        "route.GET /api/papers/search?mode=keyword": lambda: client.get(
+            "/api/papers/search?q=synergy+network&mode=keyword"
+        ),
+        "route.GET /api/papers/search?mode=keyword [phrase]": lambda: client.get(
+            "/api/papers/search?q=%22zero+tolerance%22&mode=keyword"
+        ),
+    }
+
+
+def run_size(args, size, workdir):
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, f'bench-{size}.db')}"
+    app = create_app(bench_config(database_url, args.cache))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(f"[{size}] seeding...", file=sys.stderr)
+        seeding = seed(size)
+        print(
+            f"[{size}] seeded {seeding['rows']} rows in {seeding['seconds']}s, "
+            f"embedded {seeding['embedded']} papers in {seeding['embed_seconds']}s",
+            file=sys.stderr,
+        )
+
+        queries = QueryCounter(db.engine)
+        rng = random.Random(SEED)
+        results = {"seed": seeding}
+        for name, call in scenarios(app.test_client(), size, rng).items():
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            results[name] = measure(call, args.iterations, args.warmup, queries)
+            r = results[name]
+            print(
+                f"[{size}] {name:<52} {r['ops_per_second']:>9.1f} op/s  p50={r['p50_ms']:.2f}ms "
+                f"p95={r['p95_ms']:.2f}ms p99={r['p99_ms']:.2f}ms  q/op={r['queries_per_op']}",
+                file=sys.stderr,
+            )
+        response_cache.clear()
+        db.session.remove()
+        if args.database_url:
+            db.drop_all()
+        db.engine.dispose()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Flags scenarios whose p50 grew by more than `threshold` (relative) or that
+    issue more queries per call than in the baseline.
+    """
+    regressions = []
+    for size, scenarios_at_size in results["results"].items():
+        for name, current in scenarios_at_size.items():
+            previous = baseline.get("results", {}).get(size, {}).get(name)
+            if name == "seed" or previous is None:
+                continue
+            if current["p50_ms"] > previous["p50_ms"] * (1 + threshold):
+                regressions.append(f"{size} {name}: p50 {previous['p50_ms']}ms -> {current['p50_ms']}ms")
+            if current["queries_per_op"] > previous["queries_per_op"]:
+                regressions.append(
+                    f"{size} {name}: queries/op {previous['queries_per_op']} -> {current['queries_per_op']}"
+                )
+    return regressions
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--database-url", help="Disposable database to use instead of SQLite files (it is wiped)")
+    parser.add_argument("--cache", action="store_true", help="Keep the GET response cache on")
+    parser.add_argument("--only", nargs="+", help="Run only scenarios whose name contains one of these")
+    parser.add_argument("--output", help="Write results as JSON here")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative p50 slowdown")
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": "postgresql" if args.database_url else "sqlite",
+            "cache": args.cache,
+            "iterations": args.iterations,
+        },
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            results["results"][str(size)] = run_size(args, size, workdir)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Bulk import CLI.
+
+    python scripts/bulk_import.py authors authors.ndjson
+    python scripts/bulk_import.py papers papers.csv --format csv --checkpoint papers.ckpt
+    python scripts/bulk_import.py synthetic --authors 10000 --papers 1000000
+"""
+import argparse
+import itertools
+import os
+import sys
+
+# Add backend to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app import create_app
+from app.common.bulk_import import (
+    DEFAULT_CHUNK_SIZE,
+    READERS,
+    Checkpoint,
+    run_import,
+    synthetic_authors,
+    synthetic_papers,
+)
+from app.modules.authors.repository import AuthorRepository
+from app.modules.authors.schemas import AuthorCreateDTO
+from app.modules.papers.repository import PaperRepository
+from app.modules.papers.schemas import PaperCreateDTO
+
+
+def known_authors_only(author_repository):
+    def prepare(rows):
+        known = author_repository.existing_ids(row["author_id"] for row in rows)
+        return [row for row in rows if row["author_id"] in known]
+    return prepare
+
+
+def import_file(args):
+    if args.input == "-":
+        stream = sys.stdin
+        key = f"{args.kind}:stdin"
+    else:
+        stream = open(args.input, newline="")
+        key = f"{args.kind}:{os.path.abspath(args.input)}"
+
+    checkpoint = Checkpoint(args.checkpoint)
+    format_name = args.format or ("csv" if args.input.endswith(".csv") else "ndjson")
+    records = READERS[format_name](stream)
+    skip = checkpoint.position(key)
+    if skip:
+        print(f"Resuming {key} after {skip} records", file=sys.stderr)
+    records = itertools.islice(records, skip, None)
+
+    with stream:
+        if args.kind == "authors":
+            progress = run_import(
+                records, AuthorCreateDTO, AuthorRepository(), "email", checkpoint, key, args.chunk_size
+            )
+        else:
+            progress = run_import(
+                records, PaperCreateDTO, PaperRepository(), "doi", checkpoint, key, args.chunk_size,
+                prepare=known_authors_only(AuthorRepository()),
+            )
+    print(f"Done: {progress.written} written, {progress.rejected} rejected", file=sys.stderr)
+
+
+def import_synthetic(args):
+    checkpoint = Checkpoint(args.checkpoint)
+    author_repository = AuthorRepository()
+
+    start = checkpoint.position("synthetic:authors")
+    run_import(
+        synthetic_authors(start, args.authors, args.seed, args.chunk_size),
+        AuthorCreateDTO, author_repository, "email", checkpoint, "synthetic:authors", args.chunk_size,
+    )
+
+    author_ids = author_repository.all_ids()
+    if not author_ids:
+        print("No authors available, skipping papers.", file=sys.stderr)
+        return
+
+    start = checkpoint.position("synthetic:papers")
+    run_import(
+        synthetic_papers(start, args.papers, author_ids, args.seed, args.chunk_size),
+        PaperCreateDTO, PaperRepository(), "doi", checkpoint, "synthetic:papers", args.chunk_size,
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Stream authors and papers into the database.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", help="Checkpoint file; re-running with it resumes the import")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for kind in ("authors", "papers"):
+        file_parser = commands.add_parser(kind, help=f"Import {kind} from an NDJSON or CSV file")
+        file_parser.add_argument("input", help="Path to the file, or - for stdin")
+        file_parser.add_argument("--format", choices=sorted(READERS), help="Defaults to the file extension")
+        file_parser.set_defaults(handler=import_file, kind=kind)
+
+    synthetic = commands.add_parser("synthetic", help="Generate fake data at a target scale")
+    synthetic.add_argument("--authors", type=int, default=1000)
+    synthetic.add_argument("--papers", type=int, default=100000)
+    synthetic.add_argument("--seed", type=int, default=0)
+    synthetic.set_defaults(handler=import_synthetic)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    app = create_app()
+    with app.app_context():
+        args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
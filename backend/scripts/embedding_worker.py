@@ -0,0 +1,71 @@
+"""
+Background embedding worker.
+
+    python scripts/embedding_worker.py                    # run until stopped
+    python scripts/embedding_worker.py --drain            # process the queue, then exit
+    python scripts/embedding_worker.py --backfill-all     # queue papers without embeddings, then drain
+    python scripts/embedding_worker.py --reembed-all      # queue every paper again, then drain
+"""
+import argparse
+import os
+import signal
+import sys
+import threading
+from datetime import timedelta
+
+# Add backend to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.modules.papers.embedding_repository import EmbeddingJobRepository
+from app.modules.papers.embedding_worker import EmbeddingWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    mode.add_argument("--backfill-all", action="store_true", help="Queue papers without embeddings, then drain")
+    mode.add_argument("--reembed-all", action="store_true", help="Queue every paper, then drain")
+    parser.add_argument("--batch-size", type=int, default=256, help="Jobs claimed per transaction")
+    parser.add_argument("--encode-batch-size", type=int, default=64, help="Texts per encoder call")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1, help="Encoder processes (0 = inline)")
+    parser.add_argument("--max-attempts", type=int, default=5)
+    parser.add_argument("--poll-interval", type=float, default=0.5, help="Seconds to wait when the queue is empty")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        jobs = EmbeddingJobRepository()
+        if args.backfill_all:
+            print(f"Queued {jobs.enqueue_missing()} papers without embeddings", file=sys.stderr)
+        elif args.reembed_all:
+            print(f"Queued {jobs.enqueue_all()} papers for re-embedding", file=sys.stderr)
+
+        worker = EmbeddingWorker(
+            job_repository=jobs,
+            batch_size=args.batch_size,
+            encode_batch_size=args.encode_batch_size,
+            processes=args.processes,
+            max_attempts=args.max_attempts,
+            retry_backoff=timedelta(seconds=10),
+            poll_interval=args.poll_interval,
+        )
+        try:
+            if args.drain or args.backfill_all or args.reembed_all:
+                print(f"Embedded {worker.drain()} papers", file=sys.stderr)
+            else:
+                stop = threading.Event()
+                signal.signal(signal.SIGTERM, lambda *_: stop.set())
+                signal.signal(signal.SIGINT, lambda *_: stop.set())
+                worker.run_forever(stop)
+        finally:
+            worker.close()
+
+
+if __name__ == "__main__":
+    main()
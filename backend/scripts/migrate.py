@@ -0,0 +1,90 @@
+"""
+Schema migrations (Alembic revisions in migrations/versions) for DATABASE_URL.
+
+    python scripts/migrate.py                      # upgrade to the latest revision
+    python scripts/migrate.py upgrade 0002
+    python scripts/migrate.py downgrade -1
+    python scripts/migrate.py current
+    python scripts/migrate.py history
+    python scripts/migrate.py revision -m "add papers.year"   # autogenerated from the models
+    python scripts/migrate.py upgrade --sql        # print the SQL instead of running it
+
+Run it once per deploy, before starting the new app version; the app itself
+never changes the schema outside development (see SCHEMA_AUTO_CREATE).
+Databases created by db.create_all() before migrations existed are stamped at
+the initial revision and then upgraded.
+"""
+import argparse
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, inspect
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+# Add backend to path to import app modules
+sys.path.append(BACKEND_DIR)
+
+INITIAL_REVISION = "0001"
+
+
+def alembic_config(database_url):
+    config = AlembicConfig(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", database_url.replace("%", "%%"))
+    return config
+
+
+def adopt_unversioned(config, database_url):
+    """
+    Stamps a database that has the tables but no migration history.
+    """
+    engine = create_engine(database_url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    if "alembic_version" not in tables and "papers" in tables:
+        print(f"Existing schema without migration history; stamping {INITIAL_REVISION}", file=sys.stderr)
+        command.stamp(config, INITIAL_REVISION)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("action", nargs="?", default="upgrade",
+                        choices=["upgrade", "downgrade", "current", "history", "stamp", "revision"])
+    parser.add_argument("target", nargs="?", help="Revision (default: head for upgrade)")
+    parser.add_argument("-m", "--message", help="Message of a new revision")
+    parser.add_argument("--sql", action="store_true", help="Print the SQL instead of running it")
+    parser.add_argument("--database-url", help="Overrides DATABASE_URL")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    from config import Config
+
+    database_url = args.database_url or Config.SQLALCHEMY_DATABASE_URI
+    config = alembic_config(database_url)
+
+    if args.action == "upgrade":
+        if not args.sql:
+            adopt_unversioned(config, database_url)
+        command.upgrade(config, args.target or "head", sql=args.sql)
+    elif args.action == "downgrade":
+        if not args.target:
+            parser.error("downgrade needs a target revision (e.g. -1 or 0001)")
+        command.downgrade(config, args.target, sql=args.sql)
+    elif args.action == "current":
+        command.current(config, verbose=True)
+    elif args.action == "history":
+        command.history(config)
+    elif args.action == "stamp":
+        command.stamp(config, args.target or "head")
+    elif args.action == "revision":
+        if not args.message:
+            parser.error("revision needs -m/--message")
+        command.revision(config, message=args.message, autogenerate=True)
+
+
+if __name__ == "__main__":
+    main()
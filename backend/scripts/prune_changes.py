@@ -0,0 +1,42 @@
+"""
+Deletes old change feed entries, keeping the newest CHANGES_RETENTION_ROWS
+(or --keep). Run it periodically, e.g. from cron:
+
+    python scripts/prune_changes.py
+    python scripts/prune_changes.py --keep 5000000 --batch-size 20000
+
+Readers whose cursor falls behind the pruned entries get 410 Gone from
+/api/changes/; the app's own readers rebuild what they keep in memory.
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add backend to path to import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app import create_app
+from app.modules.changes.repository import PRUNE_BATCH_SIZE, ChangeRepository
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep", type=int, default=None, help="Newest changes to keep (default: CHANGES_RETENTION_ROWS)")
+    parser.add_argument("--batch-size", type=int, default=PRUNE_BATCH_SIZE, help="Changes deleted per transaction")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    app = create_app()
+    with app.app_context():
+        keep = args.keep if args.keep is not None else app.config["CHANGES_RETENTION_ROWS"]
+        deleted = ChangeRepository().prune(keep, batch_size=args.batch_size)
+    print(f"Pruned {deleted} changes in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,25 @@
 
-import random
-from faker import Faker
 from app import create_app, db
-from app.modules.authors.service import AuthorService
-from app.modules.papers.service import PaperService
+from app.common.bulk_import import Checkpoint, run_import, synthetic_authors, synthetic_papers
+from app.modules.authors.repository import AuthorRepository
 from app.modules.authors.schemas import AuthorCreateDTO
+from app.modules.papers.repository import PaperRepository
 from app.modules.papers.schemas import PaperCreateDTO
+from app.modules.papers.embedding_worker import EmbeddingWorker
 from app.modules.authors.models import Author
 from app.modules.papers.models import Paper
-from app.common.error_handler import AppError
 
-fake = Faker()
+AUTHORS = 10
+PAPERS = 25
+
 
 def seed_database():
+    """
+    Small dev dataset through the bulk import pipeline.
+    For production-sized data use `scripts/bulk_import.py synthetic`.
+    """
     app = create_app()
     with app.app_context():
-        # Services
-        author_service = AuthorService()
-        paper_service = PaperService()
-
         # Clear existing data provided it's safe (dev only usually)
         print("Clearing existing data...")
 
@@ -26,20 +27,14 @@ def seed_database():
         Author.query.delete()
         db.session.commit()
 
+        checkpoint = Checkpoint(None)
+        author_repository = AuthorRepository()
+
         print("Seeding Authors...")
-        authors_ids = []
-        for _ in range(10):
-            dto = AuthorCreateDTO(
-                name=fake.name(),
-                bio=fake.text(max_nb_chars=200),
-                email=fake.unique.email()
-            )
-            try:
-                author_response = author_service.create_author(dto)
-                authors_ids.append(author_response.id)
-            except AppError as e:
-                print(f"Skipping author creation due to error: {e.message}")
-        
+        run_import(
+            synthetic_authors(0, AUTHORS), AuthorCreateDTO, author_repository, "email", checkpoint, "authors"
+        )
+        authors_ids = author_repository.all_ids()
         print(f"Created {len(authors_ids)} authors.")
 
         if not authors_ids:
@@ -47,22 +42,13 @@ def seed_database():
             return
 
         print("Seeding Papers...")
-        papers_count = 0
-        for _ in range(25):
-            author_id = random.choice(authors_ids)
-            dto = PaperCreateDTO(
-                title=fake.catch_phrase(),
-                abstract=fake.paragraph(nb_sentences=5),
-                doi=f"10.{fake.random_number(digits=4)}/{fake.uuid4()[:8]}",
-                author_id=author_id
-            )
-            try:
-                paper_service.create_paper(dto)
-                papers_count += 1
-            except AppError as e:
-                print(f"Skipping paper creation due to error: {e.message}")
-        
-        print(f"Created {papers_count} papers.")
+        progress = run_import(
+            synthetic_papers(0, PAPERS, authors_ids), PaperCreateDTO, PaperRepository(), "doi", checkpoint, "papers"
+        )
+        print(f"Created {progress.written} papers.")
+
+        print("Embedding abstracts for semantic search...")
+        print(f"Embedded {EmbeddingWorker().drain()} papers.")
         print("✅ Seeding complete!")
 
 if __name__ == "__main__":
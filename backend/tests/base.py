@@ -1,4 +1,10 @@
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
+
+from app import db
+from app.modules.papers.embedding_worker import EmbeddingWorker
 
 @pytest.mark.usefixtures("client_class")
 class BaseTestCase:
@@ -25,3 +31,26 @@ class BaseTestCase:
             "doi": doi,
             "author_id": author_id
         })
+
+    def run_embedding_worker(self):
+        """Helper to drain the embedding job queue in-process."""
+        return EmbeddingWorker().drain()
+
+    @contextmanager
+    def capture_statements(self, include_cache_sync=False):
+        """
+        Collects the SQL statements run on the engine inside the block, by
+        default without the response cache's change feed reads and the
+        savepoints the test session wraps them in.
+        """
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if include_cache_sync or ("FROM change" not in statement and "SAVEPOINT" not in statement):
+                statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
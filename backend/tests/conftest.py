@@ -6,6 +6,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import pytest
 from app import create_app, db
+from app.common.cache import response_cache
 from config import TestingConfig
 
 @pytest.fixture(scope='session')
@@ -36,7 +37,7 @@ def session(app):
         # Bind the session to the connection
         options = dict(bind=connection, binds={})
         from sqlalchemy.orm import scoped_session, sessionmaker
-        session_factory = sessionmaker(bind=connection)
+        session_factory = sessionmaker(bind=connection, join_transaction_mode="create_savepoint")
         session = scoped_session(session_factory)
         
         # Monkey patch db.session to use our test session
@@ -45,8 +46,9 @@ def session(app):
         
         yield session
         
-        # Cleanup
+        # Cleanup; the rollback bypasses the repositories' cache invalidation
         transaction.rollback()
+        response_cache.clear()
         connection.close()
         session.remove()
         db.session = old_session
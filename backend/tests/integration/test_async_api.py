@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("quart")
+pytest.importorskip("aiosqlite")
+
+from app.asgi import create_asgi_app  # noqa: E402
+from app.common.async_db import async_session  # noqa: E402
+from config import TestingConfig  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def async_app(tmp_path_factory):
+    class AsyncConfig(TestingConfig):
+        # Every aiosqlite connection to :memory: would get its own empty database
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path_factory.mktemp('async') / 'api.db'}"
+
+    return create_asgi_app(AsyncConfig)
+
+
+def run(async_app, scenario):
+    async def main():
+        async with async_app.test_app() as test_app:
+            return await scenario(test_app.test_client())
+
+    return asyncio.run(main())
+
+
+def test_async_crud_and_pages_match_the_sync_api(async_app):
+    async def scenario(client):
+        resp = await client.post("/api/authors/", json={"name": "Async Author", "email": "async@example.com"})
+        assert resp.status_code == 201
+        author = await resp.get_json()
+
+        duplicate = await client.post("/api/authors/", json={"name": "Again", "email": "async@example.com"})
+        assert duplicate.status_code == 409
+
+        for i in range(3):
+            resp = await client.post("/api/papers/", json={
+                "title": f"Async Paper {i}", "abstract": "A", "doi": f"10.1/async.{i}", "author_id": author["id"],
+            })
+            assert resp.status_code == 201
+        again = await client.post("/api/papers/", json={
+            "title": "Async Paper 0", "abstract": "A", "doi": "10.1/async.0", "author_id": author["id"],
+        })
+        assert again.status_code == 200
+        missing_author = await client.post("/api/papers/", json={
+            "title": "Orphan", "abstract": "A", "doi": "10.1/orphan", "author_id": 999999,
+        })
+        assert missing_author.status_code == 404
+
+        resp = await client.get(f"/api/authors/{author['id']}?include=papers")
+        detail = await resp.get_json()
+        assert detail["paper_count"] == 3
+        assert {p["doi"] for p in detail["papers"]} == {"10.1/async.0", "10.1/async.1", "10.1/async.2"}
+
+        first = await client.get("/api/papers/?limit=2")
+        assert [p["title"] for p in await first.get_json()] == ["Async Paper 2", "Async Paper 1"]
+        cursor = first.headers["X-Next-Cursor"]
+        rest = await client.get(f"/api/papers/?limit=2&after={cursor}")
+        assert [p["title"] for p in await rest.get_json()] == ["Async Paper 0"]
+        assert "X-Next-Cursor" not in rest.headers
+
+        resp = await client.get("/api/papers/by-doi?dois=10.1/async.2&dois=10.1/missing&dois=10.1/async.0")
+        lookup = await resp.get_json()
+        assert [p["title"] for p in lookup["items"]] == ["Async Paper 2", "Async Paper 0"]
+        assert lookup["missing"] == ["10.1/missing"]
+        resp = await client.get(f"/api/authors/?ids=999999,{author['id']}&include=paper_count")
+        lookup = await resp.get_json()
+        assert [a["paper_count"] for a in lookup["items"]] == [3]
+        assert lookup["missing"] == [999999]
+
+        assert (await client.get("/api/papers/999999")).status_code == 404
+        assert (await client.get("/api/authors/?include=bogus")).status_code == 400
+
+    run(async_app, scenario)
+    # Each request's session was closed and its connection returned
+    assert not async_session.registry.registry
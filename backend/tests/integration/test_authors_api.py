@@ -45,3 +45,108 @@ class TestAuthors(BaseTestCase):
         assert len(authors) >= 2
         emails = [a["email"] for a in authors]
         assert "a1@example.com" in emails
+
+    def test_list_authors_pagination(self):
+        """
+        A page limit caps the result and hands back a cursor for the next page.
+        """
+        for i in range(3):
+            self.create_author(name=f"P{i}", email=f"page{i}@example.com")
+
+        first = self.client.get("/api/authors/?limit=2")
+        assert first.status_code == 200
+        assert len(first.get_json()) == 2
+        cursor = first.headers["X-Next-Cursor"]
+
+        second = self.client.get(f"/api/authors/?limit=2&after={cursor}")
+        assert second.status_code == 200
+        first_ids = {a["id"] for a in first.get_json()}
+        assert all(a["id"] not in first_ids for a in second.get_json())
+        assert max(a["id"] for a in second.get_json()) < min(first_ids)
+
+    def test_duplicate_email_conflict(self):
+        assert self.create_author(email="dupe@example.com").status_code == 201
+        assert self.create_author(email="dupe@example.com").status_code == 409
+
+    def test_get_author_with_papers(self):
+        author_id = self.create_author(email="embed@example.com", bio=None).get_json()["id"]
+        self.create_paper(author_id, title="First", doi="10.0009/first")
+        self.create_paper(author_id, title="Second", doi="10.0009/second")
+
+        plain = self.client.get(f"/api/authors/{author_id}").get_json()
+        assert plain["bio"] is None
+        assert "papers" not in plain and "paper_count" not in plain
+
+        detail = self.client.get(f"/api/authors/{author_id}?include=papers,paper_count").get_json()
+        assert sorted(p["doi"] for p in detail["papers"]) == ["10.0009/first", "10.0009/second"]
+        assert detail["paper_count"] == 2
+
+        counted = self.client.get(f"/api/authors/{author_id}?include=paper_count").get_json()
+        assert counted["paper_count"] == 2 and "papers" not in counted
+
+        # Embedded papers are not served stale from the response cache
+        self.create_paper(author_id, title="Third", doi="10.0009/third")
+        detail = self.client.get(f"/api/authors/{author_id}?include=papers").get_json()
+        assert len(detail["papers"]) == 3
+
+        assert self.client.get(f"/api/authors/{author_id}?include=coauthors").status_code == 400
+
+    def test_list_authors_sparse_fieldsets(self):
+        """
+        Lists leave the bio out unless asked, with or without embedded papers.
+        """
+        author_id = self.create_author(name="Fields", email="fields@example.com", bio="A long bio").get_json()["id"]
+        self.create_paper(author_id, title="Fielded", doi="10.0011/fields")
+
+        assert set(self.client.get("/api/authors/?limit=1").get_json()[0]) == {"id", "name", "email"}
+        assert self.client.get("/api/authors/?limit=1&fields=bio").get_json() == [{"id": author_id, "bio": "A long bio"}]
+
+        embedded = self.client.get("/api/authors/?limit=1&include=papers&fields=name").get_json()[0]
+        assert set(embedded) == {"id", "name", "papers", "paper_count"}
+        assert embedded["papers"][0]["title"] == "Fielded"
+
+        assert self.client.get("/api/authors/?fields=password").status_code == 400
+
+    def test_multi_get_authors(self):
+        """
+        ?ids= returns the authors in request order, with includes, and lists missing ids.
+        """
+        first = self.create_author(name="First", email="first@example.com").get_json()["id"]
+        second = self.create_author(name="Second", email="second@example.com").get_json()["id"]
+        self.create_paper(second, title="Second's paper", doi="10.0014/second")
+
+        body = self.client.get(f"/api/authors/?ids={second},{first},424242").get_json()
+        assert [a["name"] for a in body["items"]] == ["Second", "First"]
+        assert "papers" not in body["items"][0]
+        assert body["missing"] == [424242]
+
+        body = self.client.get(f"/api/authors/?ids={second},{first}&include=papers").get_json()
+        assert [a["paper_count"] for a in body["items"]] == [1, 0]
+        assert body["items"][0]["papers"][0]["title"] == "Second's paper"
+
+        assert self.client.get("/api/authors/?ids=").status_code == 400
+
+    def test_list_authors_with_papers_uses_constant_queries(self):
+        """
+        Embedding papers and counts costs the same number of queries for 1 or many authors.
+        """
+        for i in range(4):
+            author_id = self.create_author(name=f"N{i}", email=f"nplus{i}@example.com").get_json()["id"]
+            for j in range(i):
+                self.create_paper(author_id, title=f"P{i}.{j}", doi=f"10.0009/n{i}.{j}")
+
+        def count_queries(url):
+            with self.capture_statements() as statements:
+                resp = self.client.get(url)
+            assert resp.status_code == 200
+            return resp.get_json(), len(statements)
+
+        one, one_count = count_queries("/api/authors/?limit=1&include=papers")
+        many, many_count = count_queries("/api/authors/?limit=4&include=papers")
+        assert one_count == many_count
+        assert [a["paper_count"] for a in many] == [3, 2, 1, 0]
+        assert [len(a["papers"]) for a in many] == [3, 2, 1, 0]
+
+        counted, counted_queries = count_queries("/api/authors/?limit=4&include=paper_count")
+        assert counted_queries == one_count
+        assert [a["paper_count"] for a in counted] == [3, 2, 1, 0]
@@ -0,0 +1,86 @@
+from app.modules.authors.repository import AuthorRepository
+from app.modules.changes.routes import service
+from app.modules.changes.service import encode_position
+from tests.base import BaseTestCase
+
+
+class TestChanges(BaseTestCase):
+    def read_feed(self, since=None, limit=100):
+        url = f"/api/changes/?limit={limit}" + (f"&since={since}" if since else "")
+        resp = self.client.get(url)
+        assert resp.status_code == 200
+        return resp.get_json(), resp.headers["X-Next-Cursor"]
+
+    def test_feed_lists_every_write_in_order_and_resumes(self):
+        """
+        Creates, updates and deletes (tombstones) show up in order, whatever the write path.
+        """
+        _, start = self.read_feed()
+        author_id = self.create_author(name="Feed", email="feed@example.com").get_json()["id"]
+        paper_id = self.create_paper(author_id, title="Fed", doi="10.0015/fed").get_json()["id"]
+        self.client.post("/api/papers/batch", json=[
+            {"title": "Batched", "abstract": "A", "doi": "10.0015/batched", "author_id": author_id},
+        ])
+
+        repository = AuthorRepository()
+        author = repository.get_by_id(author_id)
+        repository.update(author, bio="Updated")
+        # Deleting the author cascades to its papers, which get tombstones too
+        repository.delete(author)
+
+        changes, cursor = self.read_feed(since=start)
+        assert [(c["entity"], c["op"]) for c in changes] == [
+            ("authors", "insert"),
+            ("papers", "insert"),
+            ("papers", "insert"),
+            ("authors", "update"),
+            ("papers", "delete"),
+            ("papers", "delete"),
+            ("authors", "delete"),
+        ]
+        assert changes[0]["entity_id"] == author_id and changes[1]["entity_id"] == paper_id
+        assert [c["seq"] for c in changes] == sorted(c["seq"] for c in changes)
+
+        # Pages resume where the previous one stopped, and an idle feed keeps its cursor
+        first, middle = self.read_feed(since=start, limit=3)
+        rest, end = self.read_feed(since=middle)
+        assert first + rest == changes
+        assert end == cursor
+        assert self.read_feed(since=cursor) == ([], cursor)
+
+    def test_catching_up_reads_only_new_changes(self):
+        """
+        Reading from a cursor is one indexed range query, however long the history,
+        plus the lookup of the pruning horizon.
+        """
+        for i in range(5):
+            self.create_author(name=f"History {i}", email=f"history{i}@example.com")
+        _, cursor = self.read_feed()
+        self.create_author(name="New", email="new@example.com")
+
+        with self.capture_statements(include_cache_sync=True) as statements:
+            changes, _ = self.read_feed(since=cursor)
+        assert [c["op"] for c in changes] == ["insert"]
+        assert len([s for s in statements if "FROM changes" in s]) == 1
+        assert len(statements) == 2
+
+    def test_cursor_behind_pruned_changes_is_gone(self):
+        """
+        Pruning keeps the newest changes; a cursor behind them gets 410 rather than a gap.
+        """
+        behind = encode_position(service.repository.head())
+        self.create_author(name="Pruned", email="pruned@example.com")
+        for i in range(3):
+            self.create_author(name=f"Kept {i}", email=f"kept{i}@example.com")
+        _, close_behind = self.read_feed(since=behind, limit=2)
+
+        assert service.repository.prune(keep=2) >= 2
+        resp = self.client.get(f"/api/changes/?since={behind}")
+        assert resp.status_code == 410
+        changes, cursor = self.read_feed(since=close_behind)
+        assert [c["op"] for c in changes] == ["insert", "insert"]
+        assert self.read_feed(since=cursor) == ([], cursor)
+
+    def test_invalid_cursor(self):
+        assert self.client.get("/api/changes/?since=bogus").status_code == 400
+        assert self.client.get("/api/changes/?limit=0").status_code == 400
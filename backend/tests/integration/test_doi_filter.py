@@ -0,0 +1,93 @@
+from app import warm_worker
+from app.modules.papers.doi_filter import FALSE_POSITIVES, DoiFilter
+from app.modules.papers.repository import PaperRepository
+from app.modules.papers.routes import service
+from tests.base import BaseTestCase
+
+
+class TestDoiFilter(BaseTestCase):
+    def test_existence_check_by_doi(self):
+        """
+        HEAD/GET by DOI answer from the table, even for papers the filter has not caught up with.
+        """
+        author_id = self.create_author(name="Exists", email="exists@test.com").get_json()["id"]
+        paper = self.create_paper(author_id, title="Here", doi="10.0017/here").get_json()
+
+        assert self.client.head("/api/papers/by-doi/10.0017/here").status_code == 200
+        assert self.client.get("/api/papers/by-doi/10.0017/here").get_json() == paper
+        assert self.client.head("/api/papers/by-doi/10.0017/absent").status_code == 404
+
+        # Written by another worker since this one's filter last caught up
+        doi_filter = service.doi_filter
+        doi_filter.refresh(force=True)
+        refresh_seconds, doi_filter.refresh_seconds = doi_filter.refresh_seconds, 3600.0
+        try:
+            PaperRepository().create(title="Elsewhere", abstract=None, doi="10.0017/other-worker", author_id=author_id)
+            assert self.client.head("/api/papers/by-doi/10.0017/other-worker").status_code == 200
+        finally:
+            doi_filter.refresh_seconds = refresh_seconds
+
+    def test_worker_start_builds_the_filter(self):
+        """
+        The filter is ready before the worker's first ingest request.
+        """
+        author_id = self.create_author(name="Warm", email="warm@test.com").get_json()["id"]
+        self.create_paper(author_id, title="Warm", doi="10.0017/warm")
+
+        previous, service._doi_filter = service._doi_filter, None
+        try:
+            warm_worker(self.client.application)
+            assert service._doi_filter._filter is not None
+            assert "10.0017/warm" in service._doi_filter._filter
+        finally:
+            service._doi_filter = previous
+
+    def test_ingest_only_looks_up_dois_the_filter_may_contain(self):
+        """
+        Resubmissions are read instead of inserted; new DOIs go straight to the insert.
+        """
+        author_id = self.create_author(name="Harvest", email="harvest@test.com").get_json()["id"]
+        first = self.create_paper(author_id, title="Harvested", doi="10.0017/harvested")
+
+        with self.capture_statements() as statements:
+            resp = self.create_paper(author_id, title="Again", doi="10.0017/harvested")
+        assert resp.status_code == 200 and resp.get_json() == first.get_json()
+        assert not any(s.lstrip().upper().startswith("INSERT") for s in statements)
+
+        items = [
+            {"title": "Known", "doi": "10.0017/harvested", "author_id": author_id},
+            {"title": "Fresh", "doi": "10.0017/fresh", "author_id": author_id},
+        ]
+        with self.capture_statements() as statements:
+            resp = self.client.post("/api/papers/batch", json=items)
+        assert [r["status"] for r in resp.get_json()["results"]] == ["existing", "created"]
+        lookups = [s for s in statements if "papers.doi IN" in s]
+        assert len(lookups) == 1 and lookups[0].count("?") == 1
+        assert service.doi_filter.may_contain("10.0017/fresh")
+
+        # A positive the lookup does not confirm is counted as a false positive
+        service.doi_filter.add(["10.0017/ghost"])
+        before = sum(FALSE_POSITIVES.snapshot().values())
+        assert self.create_paper(author_id, title="Ghost", doi="10.0017/ghost").status_code == 201
+        assert sum(FALSE_POSITIVES.snapshot().values()) == before + 1
+
+    def test_filter_catches_up_with_other_writers_and_is_saved(self, tmp_path):
+        """
+        Papers written elsewhere are picked up from the change feed; a saved filter is reused.
+        """
+        author_id = self.create_author(name="Elsewhere", email="elsewhere@test.com").get_json()["id"]
+        path = str(tmp_path / "dois.bloom")
+        doi_filter = DoiFilter(PaperRepository(), capacity=100, refresh_seconds=0.0, path=path)
+        assert not doi_filter.may_contain("10.0017/elsewhere")
+
+        PaperRepository().create(title="Elsewhere", abstract=None, doi="10.0017/elsewhere", author_id=author_id)
+        assert doi_filter.may_contain("10.0017/elsewhere")
+
+        # The saved copy is loaded and caught up instead of reading the table again
+        PaperRepository().create(title="Later", abstract=None, doi="10.0017/later", author_id=author_id)
+        reloaded = DoiFilter(PaperRepository(), refresh_seconds=0.0, path=path)
+        reloaded.repository.stream_rows = None
+        assert reloaded.may_contain_many(["10.0017/elsewhere", "10.0017/later", "10.0017/never"]) == {
+            "10.0017/elsewhere",
+            "10.0017/later",
+        }
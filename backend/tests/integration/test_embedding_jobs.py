@@ -0,0 +1,52 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+from app import db
+from app.modules.papers.embedding_repository import EmbeddingJobRepository
+from app.modules.papers.embedding_worker import EmbeddingWorker
+from app.modules.papers.models import EmbeddingJob, Paper, PaperEmbedding
+from tests.base import BaseTestCase
+
+
+class TestEmbeddingJobs(BaseTestCase):
+    def _paper(self, doi):
+        author_id = self.create_author(name="Queue", email=f"{doi.replace('/', '-')}@queue.com").get_json()["id"]
+        return self.create_paper(author_id, title="Queued paper", doi=doi).get_json()["id"]
+
+    def test_insert_and_change_enqueue_jobs(self):
+        """
+        Paper inserts queue an embedding job; a title change queues a re-embed.
+        """
+        paper_id = self._paper("10.0006/insert")
+        assert db.session.query(EmbeddingJob).filter_by(paper_id=paper_id).count() == 1
+
+        self.run_embedding_worker()
+        assert db.session.get(PaperEmbedding, paper_id) is not None
+        assert db.session.query(EmbeddingJob).filter_by(paper_id=paper_id).count() == 0
+
+        paper = db.session.get(Paper, paper_id)
+        paper.title = "Retitled paper"
+        db.session.commit()
+        assert db.session.query(EmbeddingJob).filter_by(paper_id=paper_id).count() == 1
+        self.run_embedding_worker()
+
+    def test_failed_batches_back_off_then_fail(self):
+        """
+        Encoder errors release the job with a backoff, and mark it failed after max attempts.
+        """
+        paper_id = self._paper("10.0006/retry")
+        embedder = Mock()
+        embedder.encode.side_effect = RuntimeError("model unavailable")
+        worker = EmbeddingWorker(embedder=embedder, max_attempts=2, retry_backoff=timedelta(0))
+
+        worker.drain()
+        job = db.session.query(EmbeddingJob).filter_by(paper_id=paper_id).one()
+        db.session.refresh(job)
+        assert job.failed and job.attempts == 2
+        assert "model unavailable" in job.last_error
+
+        # Backfill leaves the failed job alone; re-embed-all resets it
+        assert EmbeddingJobRepository().enqueue_all() >= 1
+        db.session.refresh(job)
+        assert not job.failed and job.attempts == 0
+        self.run_embedding_worker()
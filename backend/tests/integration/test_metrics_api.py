@@ -0,0 +1,16 @@
+from tests.base import BaseTestCase
+
+
+class TestMetrics(BaseTestCase):
+    def test_metrics_endpoint_reports_requests_and_sql(self):
+        author_id = self.create_author(email="metrics@example.com").get_json()["id"]
+        assert self.client.get(f"/api/authors/{author_id}").status_code == 200
+
+        resp = self.client.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.content_type.startswith("text/plain")
+        text = resp.get_data(as_text=True)
+        assert 'http_requests_total{endpoint="authors.get_author",method="GET",status="200"}' in text
+        assert 'http_request_duration_seconds_count{endpoint="authors.create_author",method="POST"}' in text
+        assert 'http_request_db_queries_bucket{endpoint="authors.create_author",le="+Inf"}' in text
+        assert 'db_query_duration_seconds_count{verb="INSERT"}' in text
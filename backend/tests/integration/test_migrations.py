@@ -0,0 +1,79 @@
+import os
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+
+from app import create_app, db
+from config import TestingConfig
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+import migrate  # noqa: E402
+
+
+def _inspect(url, read):
+    engine = create_engine(url)
+    try:
+        return read(inspect(engine))
+    finally:
+        engine.dispose()
+
+
+def _indexes(url, table):
+    return _inspect(url, lambda inspector: {index["name"] for index in inspector.get_indexes(table)})
+
+
+def test_upgrade_creates_the_schema_with_author_index(tmp_path):
+    url = f"sqlite:///{tmp_path / 'migrated.db'}"
+    migrate.main(["upgrade", "--database-url", url])
+    assert "ix_papers_author_id" in _indexes(url, "papers")
+
+    # The migrated schema serves the app without any startup schema work
+    class MigratedConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        SCHEMA_AUTO_CREATE = False
+        METRICS_ENABLED = False
+
+    client = create_app(MigratedConfig).test_client()
+    resp = client.post("/api/authors/", json={"name": "Migrated", "email": "migrated@example.com"})
+    assert resp.status_code == 201
+    assert client.get(f"/api/authors/{resp.get_json()['id']}?include=papers").get_json()["papers"] == []
+
+
+def test_databases_from_create_all_are_adopted(tmp_path):
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+
+    class LegacyConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        METRICS_ENABLED = False
+
+    app = create_app(LegacyConfig)
+    with app.app_context():
+        db.engine.dispose()
+
+    migrate.main(["upgrade", "--database-url", url])
+    assert "alembic_version" in _inspect(url, lambda inspector: inspector.get_table_names())
+    assert "ix_papers_author_id" in _indexes(url, "papers")
+
+
+def test_change_feed_starts_with_the_existing_rows(tmp_path):
+    url = f"sqlite:///{tmp_path / 'feed.db'}"
+    migrate.main(["upgrade", "0003", "--database-url", url])
+    engine = create_engine(url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO authors (id, name, email) VALUES (7, 'Before', 'before@example.com')"))
+    finally:
+        engine.dispose()
+    migrate.main(["upgrade", "--database-url", url])
+
+    class FeedConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = url
+        SCHEMA_AUTO_CREATE = False
+        METRICS_ENABLED = False
+
+    client = create_app(FeedConfig).test_client()
+    client.post("/api/authors/", json={"name": "After", "email": "after@example.com"})
+    changes = client.get("/api/changes/").get_json()
+    assert [(c["entity_id"], c["op"]) for c in changes][0] == (7, "insert")
+    assert len(changes) == 2
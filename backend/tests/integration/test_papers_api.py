@@ -1,3 +1,14 @@
+import csv
+import io
+import json
+
+from sqlalchemy import text
+
+from app.modules.changes.routes import service as changes_service
+from app.modules.papers.embedding_repository import NumpyEmbeddingRepository
+from app.modules.papers.embeddings import HashingEmbedder
+from app.modules.papers.repository import PaperRepository
+from app.modules.papers.text_search_repository import InMemoryTextSearchRepository
 from tests.base import BaseTestCase
 
 class TestPapers(BaseTestCase):
@@ -48,3 +59,304 @@ class TestPapers(BaseTestCase):
         })
         # Assuming DB constraint / app logic catches this
         assert invalid_resp.status_code == 404
+
+    def test_list_papers_keyset_pagination(self):
+        """
+        Walk the paper list with ?limit=&after= and check pages are disjoint and ordered.
+        """
+        author_id = self.create_author(name="Pager", email="pager@test.com").get_json()["id"]
+        created = [
+            self.create_paper(author_id, title=f"Paged {i}", doi=f"10.0002/page-{i}").get_json()["id"]
+            for i in range(5)
+        ]
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/papers/?limit=2" + (f"&after={cursor}" if cursor else "")
+            resp = self.client.get(url)
+            assert resp.status_code == 200
+            page = resp.get_json()
+            assert len(page) <= 2
+            seen.extend(p["id"] for p in page)
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+
+        assert seen == sorted(seen, reverse=True)
+        assert len(seen) == len(set(seen))
+        assert set(created) <= set(seen)
+
+    def test_list_papers_total_estimate_and_bad_cursor(self):
+        """
+        The approximate total is opt-in, and malformed cursors are rejected.
+        """
+        resp = self.client.get("/api/papers/?include_total=true")
+        assert resp.status_code == 200
+        assert int(resp.headers["X-Total-Estimate"]) >= len(resp.get_json())
+
+        assert self.client.get("/api/papers/?after=not-a-cursor").status_code == 400
+        assert self.client.get("/api/papers/?limit=0").status_code == 400
+
+    def test_list_papers_sparse_fieldsets(self):
+        """
+        Lists leave the abstract out unless asked, and ?fields= narrows the SELECT itself.
+        """
+        author_id = self.create_author(name="Sparse", email="sparse@test.com").get_json()["id"]
+        self.create_paper(author_id, title="Long read", doi="10.0012/long", abstract="word " * 1000)
+
+        default = self.client.get("/api/papers/?limit=1").get_json()[0]
+        assert set(default) == {"id", "title", "doi", "author_id"}
+
+        with self.capture_statements() as statements:
+            resp = self.client.get("/api/papers/?limit=1&fields=title")
+        assert resp.get_json() == [{"id": default["id"], "title": "Long read"}]
+        assert "abstract" not in statements[-1] and "doi" not in statements[-1]
+
+        full = self.client.get("/api/papers/?limit=1&fields=title,abstract,doi,author_id").get_json()[0]
+        assert full["abstract"] == ("word " * 1000).strip()
+
+        assert self.client.get("/api/papers/?fields=title,secret").status_code == 400
+
+    def test_multi_get_papers_by_ids_and_dois(self):
+        """
+        Multi-gets keep request order, list missing keys and use a single query.
+        """
+        author_id = self.create_author(name="Multi", email="multi@test.com").get_json()["id"]
+        ids = [
+            self.create_paper(author_id, title=f"Multi {i}", doi=f"10.0013/multi.{i}").get_json()["id"]
+            for i in range(3)
+        ]
+        self.session.expire_all()
+
+        with self.capture_statements() as statements:
+            resp = self.client.get(f"/api/papers/?ids={ids[2]},999999,{ids[0]}&ids={ids[2]}")
+        assert resp.status_code == 200
+        body = resp.get_json()
+        assert [p["title"] for p in body["items"]] == ["Multi 2", "Multi 0"]
+        assert body["missing"] == [999999]
+        assert len(statements) == 1
+
+        body = self.client.get(
+            "/api/papers/by-doi?dois=10.0013/multi.1&dois=10.0013/nope&dois=10.0013/multi.0"
+        ).get_json()
+        assert [p["id"] for p in body["items"]] == [ids[1], ids[0]]
+        assert body["missing"] == ["10.0013/nope"]
+
+        # DOIs may contain commas, so they are never split
+        comma_id = self.create_paper(author_id, title="Comma", doi="10.0013/a,b").get_json()["id"]
+        body = self.client.get("/api/papers/by-doi?dois=10.0013/a,b").get_json()
+        assert [p["id"] for p in body["items"]] == [comma_id] and body["missing"] == []
+
+        assert self.client.get("/api/papers/?ids=1,two").status_code == 400
+        assert self.client.get("/api/papers/by-doi").status_code == 400
+        too_many = ",".join(str(i) for i in range(1, self.client.application.config["LOOKUP_MAX_KEYS"] + 2))
+        assert self.client.get(f"/api/papers/?ids={too_many}").status_code == 400
+
+    def test_batch_create_papers(self):
+        """
+        Batch ingest reports created / existing / error per item and keeps DOI idempotency.
+        """
+        author_id = self.create_author(name="Batcher", email="batch@test.com").get_json()["id"]
+        self.create_paper(author_id, title="Already here", doi="10.0003/existing")
+
+        items = [
+            {"title": "New One", "doi": "10.0003/new-1", "author_id": author_id},
+            {"title": "Dup Existing", "doi": "10.0003/existing", "author_id": author_id},
+            {"title": "Ghost Author", "doi": "10.0003/ghost", "author_id": 99999},
+            {"title": "", "doi": "10.0003/invalid", "author_id": author_id},
+            {"title": "New One Again", "doi": "10.0003/new-1", "author_id": author_id},
+        ]
+        resp = self.client.post("/api/papers/batch", json=items)
+        assert resp.status_code == 201
+        body = resp.get_json()
+        assert (body["created"], body["existing"], body["errors"]) == (1, 2, 2)
+
+        statuses = [r["status"] for r in body["results"]]
+        assert statuses == ["created", "existing", "error", "error", "existing"]
+        assert body["results"][0]["paper"]["id"] == body["results"][4]["paper"]["id"]
+        assert body["results"][2]["error"] == "Author not found"
+
+        # Re-submitting the same batch creates nothing new
+        again = self.client.post("/api/papers/batch", json={"items": items[:2]})
+        assert again.status_code == 200
+        assert again.get_json()["created"] == 0
+
+    def test_batch_create_papers_rejects_non_list(self):
+        resp = self.client.post("/api/papers/batch", json={"title": "Not a batch"})
+        assert resp.status_code == 400
+
+    def test_resubmitting_doi_returns_existing(self):
+        """
+        Idempotency guardrail: the same DOI returns the existing record with 200 OK.
+        """
+        author_id = self.create_author(name="Idem", email="idem@test.com").get_json()["id"]
+        first = self.create_paper(author_id, title="Original", doi="10.0004/idem")
+        assert first.status_code == 201
+
+        second = self.create_paper(author_id, title="Resubmitted", doi="10.0004/idem")
+        assert second.status_code == 200
+        assert second.get_json()["id"] == first.get_json()["id"]
+        assert second.get_json()["title"] == "Original"
+
+    def test_semantic_search(self):
+        """
+        Search ranks the paper whose text matches the query first and returns scores.
+        """
+        author_id = self.create_author(name="Searcher", email="search@test.com").get_json()["id"]
+        self.create_paper(
+            author_id, title="Graph neural networks for molecules",
+            doi="10.0005/gnn", abstract="Message passing over molecular graphs predicts chemical properties.",
+        )
+        self.create_paper(
+            author_id, title="Medieval trade routes",
+            doi="10.0005/trade", abstract="Merchants crossed the Alps carrying salt and wool.",
+        )
+        assert self.run_embedding_worker() >= 2
+
+        resp = self.client.get("/api/papers/search?q=molecular graphs message passing&limit=2")
+        assert resp.status_code == 200
+        results = resp.get_json()
+        assert results[0]["paper"]["doi"] == "10.0005/gnn"
+        assert results[0]["score"] > results[1]["score"]
+
+        assert self.client.get("/api/papers/search").status_code == 400
+
+    def test_semantic_index_drops_deleted_papers(self):
+        """
+        Papers deleted by any process leave the in-process vector index on its next refresh.
+        """
+        author_id = self.create_author(name="Forgetful", email="forgetful@test.com").get_json()["id"]
+        ids = [
+            self.create_paper(author_id, title=f"Glacier survey {i}", doi=f"10.0005/glacier.{i}").get_json()["id"]
+            for i in range(2)
+        ]
+        self.run_embedding_worker()
+        embeddings = NumpyEmbeddingRepository(refresh_seconds=0.0)
+        query = HashingEmbedder().encode(["Glacier survey"])[0]
+        assert {paper_id for paper_id, _ in embeddings.search(query, 10)} >= set(ids)
+
+        repository = PaperRepository()
+        repository.delete(repository.get_by_id(ids[0]))
+        found = {paper_id for paper_id, _ in embeddings.search(query, 10)}
+        assert ids[0] not in found and ids[1] in found
+        assert ids[0] not in embeddings.index
+
+    def test_keyword_search(self):
+        """
+        Keyword search finds new papers immediately, ranks by BM25 and enforces quoted phrases.
+        """
+        author_id = self.create_author(name="Keyword", email="keyword@test.com").get_json()["id"]
+        self.create_paper(
+            author_id, title="Sparse retrieval with inverted indexes",
+            doi="10.0006/sparse", abstract="Inverted indexes make sparse retrieval fast.",
+        )
+        self.create_paper(
+            author_id, title="Dense retrieval",
+            doi="10.0006/dense", abstract="Indexes of dense vectors complement sparse methods.",
+        )
+
+        resp = self.client.get("/api/papers/search?q=sparse inverted indexes&mode=keyword")
+        assert resp.status_code == 200
+        results = resp.get_json()
+        assert [r["paper"]["doi"] for r in results] == ["10.0006/sparse", "10.0006/dense"]
+        assert results[0]["score"] > results[1]["score"]
+
+        resp = self.client.get('/api/papers/search?q="sparse methods"&mode=keyword')
+        assert [r["paper"]["doi"] for r in resp.get_json()] == ["10.0006/dense"]
+
+        assert self.client.get("/api/papers/search?q=sparse&mode=fuzzy").status_code == 400
+
+    def test_keyword_index_follows_writes_from_other_processes(self):
+        """
+        Papers inserted, updated or deleted elsewhere are caught up from the change feed.
+        """
+        author_id = self.create_author(name="Elsewhere", email="kw-elsewhere@test.com").get_json()["id"]
+        text_search = InMemoryTextSearchRepository(refresh_seconds=0.0)
+        assert text_search.search("zeppelin", 10) == []
+
+        repository = PaperRepository()
+        first = repository.create(title="Zeppelin flights", abstract=None, doi="10.0006/zeppelin", author_id=author_id)
+        second = repository.create(title="Balloons", abstract=None, doi="10.0006/balloons", author_id=author_id)
+        assert [paper_id for paper_id, _ in text_search.search("zeppelin", 10)] == [first.id]
+
+        repository.update(second, abstract="Not a zeppelin")
+        repository.delete(first)
+        assert [paper_id for paper_id, _ in text_search.search("zeppelin", 10)] == [second.id]
+
+    def test_keyword_index_rebuilds_when_changes_were_pruned_unseen(self):
+        """
+        An index that fell behind the pruned change feed reloads the table instead of missing writes.
+        """
+        author_id = self.create_author(name="Behind", email="kw-behind@test.com").get_json()["id"]
+        text_search = InMemoryTextSearchRepository(refresh_seconds=0.0)
+        repository = PaperRepository()
+        gone = repository.create(title="Quokka census", abstract=None, doi="10.0006/quokka", author_id=author_id)
+        kept = repository.create(title="Wombat census", abstract=None, doi="10.0006/wombat", author_id=author_id)
+        assert [paper_id for paper_id, _ in text_search.search("quokka", 10)] == [gone.id]
+
+        repository.delete(gone)
+        repository.update(kept, abstract="Counted again")
+        changes_service.repository.prune(keep=1)
+        assert text_search.search("quokka", 10) == []
+        assert [paper_id for paper_id, _ in text_search.search("census", 10)] == [kept.id]
+
+    def test_conditional_get_and_cache_invalidation(self):
+        """
+        GETs carry a strong ETag, If-None-Match answers 304, and writes invalidate cached lists.
+        """
+        author_id = self.create_author(name="Cached", email="cached@test.com").get_json()["id"]
+        paper_id = self.create_paper(author_id, doi="10.0007/cached").get_json()["id"]
+
+        resp = self.client.get(f"/api/papers/{paper_id}")
+        etag = resp.headers["ETag"]
+        assert resp.status_code == 200 and etag.startswith('"')
+        resp = self.client.get(f"/api/papers/{paper_id}", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+
+        listing = self.client.get("/api/papers/?limit=1")
+        assert listing.get_json()[0]["id"] == paper_id
+
+        newer_id = self.create_paper(author_id, doi="10.0007/cached-2").get_json()["id"]
+        listing = self.client.get("/api/papers/?limit=1", headers={"If-None-Match": listing.headers["ETag"]})
+        assert listing.status_code == 200
+        assert listing.get_json()[0]["id"] == newer_id
+        assert listing.headers["X-Next-Cursor"]
+
+        assert self.client.get("/api/papers/999999").status_code == 404
+
+    def test_cache_follows_writes_from_other_processes(self):
+        """
+        Writes that bypass this process's repositories reach the cache through the change feed.
+        """
+        author_id = self.create_author(name="Remote", email="remote@test.com").get_json()["id"]
+        paper_id = self.create_paper(author_id, title="Before", doi="10.0007/remote").get_json()["id"]
+        assert self.client.get(f"/api/papers/{paper_id}").get_json()["title"] == "Before"
+
+        self.session.execute(text("UPDATE papers SET title = 'After' WHERE id = :id"), {"id": paper_id})
+        self.session.commit()
+        assert self.client.get(f"/api/papers/{paper_id}").get_json()["title"] == "After"
+
+    def test_export_streams_ndjson_and_csv(self):
+        author_id = self.create_author(name="Exporter", email="export@test.com").get_json()["id"]
+        for i in range(3):
+            self.create_paper(author_id, title=f"Export, part {i}", doi=f"10.0010/export{i}")
+
+        resp = self.client.get("/api/papers/export")
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.mimetype == "application/x-ndjson"
+        records = [json.loads(line) for line in resp.get_data(as_text=True).splitlines()]
+        exported = [r for r in records if r["doi"].startswith("10.0010/")]
+        assert [r["title"] for r in exported] == ["Export, part 0", "Export, part 1", "Export, part 2"]
+        assert set(exported[0]) == {"id", "title", "abstract", "doi", "author_id"}
+
+        resp = self.client.get("/api/papers/export?format=csv")
+        assert resp.mimetype == "text/csv"
+        assert 'filename="papers.csv"' in resp.headers["Content-Disposition"]
+        rows = list(csv.DictReader(io.StringIO(resp.get_data(as_text=True))))
+        assert [r["title"] for r in rows if r["doi"].startswith("10.0010/")][0] == "Export, part 0"
+
+        assert self.client.get("/api/papers/export?format=xml").status_code == 400
+        assert self.client.get("/api/authors/export").status_code == 200
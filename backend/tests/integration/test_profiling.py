@@ -0,0 +1,73 @@
+import marshal
+
+import pytest
+
+from app import create_app, db
+from config import TestingConfig
+
+TOKEN = {"X-Profile": "s3cret"}
+
+
+class ProfilingConfig(TestingConfig):
+    PROFILING_ENABLED = True
+    PROFILING_TOKEN = "s3cret"
+    PROFILING_SLOW_QUERY_MS = 0.0
+    METRICS_ENABLED = False
+
+
+@pytest.fixture(scope="module")
+def profiling_client():
+    app = create_app(ProfilingConfig)
+    with app.app_context():
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_profiles_requests_on_demand(profiling_client):
+    resp = profiling_client.get("/api/papers/?limit=5")
+    assert "X-Profile-Url" not in resp.headers
+
+    resp = profiling_client.get("/api/papers/?limit=6", headers={**TOKEN, "X-Request-ID": "slow-list-1"})
+    assert resp.status_code == 200
+    url = resp.headers["X-Profile-Url"]
+    assert url.startswith("/api/debug/profiles/")
+
+    listing = profiling_client.get("/api/debug/profiles/", headers=TOKEN).get_json()
+    assert listing[0]["request_id"] == "slow-list-1"
+    assert listing[0]["path"] == "/api/papers/?limit=6"
+    assert "sql" not in listing[0]
+
+    capture = profiling_client.get(url, headers=TOKEN).get_json()
+    assert capture["query_count"] >= 1
+    select = next(q for q in capture["sql"] if q["statement"].lstrip().startswith("SELECT"))
+    assert select["plan"]
+    assert "cumulative" in capture["stats"]
+
+    resp = profiling_client.get(f"{url}/profile.prof", headers=TOKEN)
+    assert isinstance(marshal.loads(resp.data), dict)
+
+    assert profiling_client.get("/api/debug/profiles/unknown", headers=TOKEN).status_code == 404
+
+
+def test_captures_need_the_token_and_get_their_own_ids(profiling_client):
+    resp = profiling_client.get("/api/papers/", headers={"X-Profile": "guess", "X-Request-ID": "mine"})
+    assert "X-Profile-Url" not in resp.headers
+    assert profiling_client.get("/api/debug/profiles/").status_code == 403
+
+    # The same X-Request-ID twice makes two captures; neither replaces the other
+    first = profiling_client.get("/api/papers/", headers={**TOKEN, "X-Request-ID": "../etc/passwd"})
+    second = profiling_client.get("/api/papers/", headers={**TOKEN, "X-Request-ID": "../etc/passwd"})
+    assert first.headers["X-Profile-Url"] != second.headers["X-Profile-Url"]
+    assert "etc" not in first.headers["X-Profile-Url"]
+    assert profiling_client.get(first.headers["X-Profile-Url"], headers=TOKEN).status_code == 200
+
+
+def test_profiling_stays_off_without_a_token():
+    class NoTokenConfig(ProfilingConfig):
+        PROFILING_TOKEN = ""
+
+    client = create_app(NoTokenConfig).test_client()
+    resp = client.get("/api/papers/", headers={"X-Profile": "1"})
+    assert "X-Profile-Url" not in resp.headers
+    assert client.get("/api/debug/profiles/").status_code == 404
@@ -0,0 +1,83 @@
+import pytest
+from sqlalchemy import text
+
+from app import create_app, db
+from app.common.replicas import Replica, ReplicaSet
+from config import TestingConfig
+
+
+@pytest.fixture(scope="module")
+def replica_app(tmp_path_factory):
+    workdir = tmp_path_factory.mktemp("replicas")
+
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{workdir / 'primary.db'}"
+        SQLALCHEMY_REPLICA_URIS = [f"sqlite:///{workdir / 'replica.db'}"]
+        CACHE_BACKEND = "none"
+        METRICS_ENABLED = False
+
+    app = create_app(ReplicaConfig)
+    with app.app_context():
+        # The replica starts with the schema; its rows are written directly below
+        db.metadata.create_all(db.engines["replica_0"])
+    # No app context held open: each request gets its own session, as in production
+    yield app
+    with app.app_context():
+        db.drop_all()
+        db.metadata.drop_all(db.engines["replica_0"])
+
+
+def _on_replica(app, statement, **params):
+    with app.app_context(), db.engines["replica_0"].begin() as conn:
+        conn.execute(text(statement), params)
+
+
+def test_reads_use_the_replica_and_writers_read_their_writes(replica_app):
+    writer = replica_app.test_client()
+    resp = writer.post("/api/authors/", json={"name": "Primary Name", "email": "replica@example.com"})
+    assert resp.status_code == 201
+    author_id = resp.get_json()["id"]
+    assert "read_primary_until" in resp.headers["Set-Cookie"]
+
+    # Not replicated yet: a fresh client reads the replica and misses it
+    reader = replica_app.test_client()
+    assert reader.get(f"/api/authors/{author_id}").status_code == 404
+
+    _on_replica(
+        replica_app,
+        "INSERT INTO authors (id, name, email) VALUES (:id, 'Replica Name', 'replica@example.com')",
+        id=author_id,
+    )
+    assert reader.get(f"/api/authors/{author_id}").get_json()["name"] == "Replica Name"
+
+    # The client that wrote is pinned to the primary
+    assert writer.get(f"/api/authors/{author_id}").get_json()["name"] == "Primary Name"
+
+
+def test_failed_replica_reads_fall_back_to_the_primary(replica_app):
+    replicas = replica_app.extensions["replicas"]
+    resp = replica_app.test_client().post("/api/authors/", json={"name": "Fallback", "email": "fb@example.com"})
+    author_id = resp.get_json()["id"]
+
+    _on_replica(replica_app, "ALTER TABLE authors RENAME TO authors_broken")
+    try:
+        reader = replica_app.test_client()
+        resp = reader.get(f"/api/authors/{author_id}")
+        assert resp.status_code == 200
+        assert resp.get_json()["name"] == "Fallback"
+        assert replicas.choose() is None
+    finally:
+        _on_replica(replica_app, "ALTER TABLE authors_broken RENAME TO authors")
+        replicas.replicas[0].down_until = 0.0
+
+
+def test_lagging_replicas_are_skipped():
+    up, lagging = Replica("up", None), Replica("lagging", None)
+    replicas = ReplicaSet([lagging, up], max_lag=1.0, check_seconds=3600.0)
+    for replica in (up, lagging):
+        replica.checked_at = float("inf")
+    lagging.lag = 30.0
+    assert {replicas.choose().name for _ in range(4)} == {"up"}
+
+    up.lag = 30.0
+    assert replicas.choose() is None
@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+
+from app import create_app
+from app.common.cache import response_cache
+from config import TestingConfig
+from tests.base import BaseTestCase
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "scripts"))
+
+import build_snapshot  # noqa: E402
+
+URLS = [
+    "/api/papers/?limit=2",
+    "/api/papers/?limit=10&fields=title,abstract",
+    "/api/authors/?limit=10",
+    "/api/authors/?limit=10&include=paper_count",
+    "/api/authors/?limit=10&include=papers",
+    "/api/papers/by-doi?dois=10.0016/snap.1&dois=10.0016/none&dois=10.0016/unicode",
+]
+
+
+class TestSnapshot(BaseTestCase):
+    def snapshot_app(self, tmp_path, path):
+        class SnapshotConfig(TestingConfig):
+            SNAPSHOT_PATH = str(path)
+            SNAPSHOT_CHECK_SECONDS = 0.0
+            # Never created: serving a snapshot must not connect to it
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'unused.db'}"
+            SCHEMA_AUTO_CREATE = False
+            METRICS_ENABLED = False
+
+        return create_app(SnapshotConfig)
+
+    def test_snapshot_serves_the_same_responses_without_a_database(self, tmp_path):
+        """
+        Every read endpoint answers from the snapshot exactly as from the database.
+        """
+        author_id = self.create_author(name="Snap", email="snap@example.com", bio=None).get_json()["id"]
+        other_id = self.create_author(name="Other", email="other@example.com").get_json()["id"]
+        paper_ids = [
+            self.create_paper(author_id, title=f"Snap {i}", doi=f"10.0016/snap.{i}").get_json()["id"]
+            for i in range(3)
+        ]
+        self.create_paper(other_id, title="Ünïcode ✓", doi="10.0016/unicode", abstract=None)
+
+        urls = URLS + [
+            f"/api/papers/{paper_ids[1]}",
+            f"/api/papers/?ids={paper_ids[2]},999999,{paper_ids[0]}",
+            f"/api/authors/{author_id}?include=papers",
+            f"/api/authors/?ids={other_id},{author_id}&include=paper_count",
+        ]
+        expected = {url: self.client.get(url).get_json() for url in urls}
+        cursor = self.client.get("/api/papers/?limit=2").headers["X-Next-Cursor"]
+        expected_rest = self.client.get(f"/api/papers/?limit=2&after={cursor}")
+        expected_export = self.client.get("/api/papers/export").get_data(as_text=True)
+
+        path = tmp_path / "catalog.snapshot"
+        build_snapshot.build(str(path), batch_size=2)
+        response_cache.clear()
+        client = self.snapshot_app(tmp_path, path).test_client()
+
+        for url in urls:
+            resp = client.get(url)
+            assert resp.status_code == 200, url
+            assert resp.get_json() == expected[url], url
+        resp = client.get(f"/api/papers/?limit=2&after={cursor}")
+        assert resp.get_json() == expected_rest.get_json()
+        assert resp.headers.get("X-Next-Cursor") == expected_rest.headers.get("X-Next-Cursor")
+        export = client.get("/api/papers/export").get_data(as_text=True)
+        assert [json.loads(line) for line in export.splitlines()] == [
+            json.loads(line) for line in expected_export.splitlines()
+        ]
+
+        assert client.get("/api/papers/999999").status_code == 404
+        assert client.post("/api/authors/", json={"name": "No", "email": "no@example.com"}).status_code == 405
+        assert client.get("/api/changes/").status_code == 503
+        assert not (tmp_path / "unused.db").exists()
+
+    def test_new_snapshots_are_swapped_in(self, tmp_path):
+        """
+        Publishing a new file switches running apps over and expires their cached responses.
+        """
+        author_id = self.create_author(name="Swap", email="swap@example.com").get_json()["id"]
+        self.create_paper(author_id, title="First", doi="10.0016/first")
+        path = tmp_path / "catalog.snapshot"
+        build_snapshot.build(str(path))
+        before = self.client.get("/api/papers/").get_json()
+        response_cache.clear()
+        app = self.snapshot_app(tmp_path, path)
+        client = app.test_client()
+        assert client.get("/api/papers/").get_json() == before
+        old = app.extensions["snapshot"].snapshot
+
+        with self.client.application.app_context():
+            self.create_paper(author_id, title="Second", doi="10.0016/second")
+            build_snapshot.build(str(path))
+        after = client.get("/api/papers/").get_json()
+        assert after[0]["title"] == "Second" and after[1:] == before
+        assert app.extensions["snapshot"].snapshot is not old
+        assert client.get(f"/api/authors/{author_id}?include=paper_count").get_json()["paper_count"] == 2
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.common.base_repository import unit_of_work
+from app.common.group_commit import group_commit
+from app.modules.authors.repository import AuthorRepository
+from config import TestingConfig
+
+
+@pytest.fixture
+def group_commit_app(tmp_path):
+    class GroupCommitConfig(TestingConfig):
+        # Threads need a database they can share
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'group.db'}"
+        GROUP_COMMIT_WINDOW_MS = 200.0
+        METRICS_ENABLED = False
+
+    app = create_app(GroupCommitConfig)
+    yield app
+    # The coordinator is process-wide; later apps must not inherit the window
+    group_commit.window_seconds = 0.0
+    with app.app_context():
+        db.engine.dispose()
+
+
+def test_concurrent_posts_share_commits_and_keep_their_own_outcome(group_commit_app):
+    with group_commit_app.app_context():
+        commits = []
+        event.listen(db.engine, "commit", lambda conn: commits.append(1))
+
+    def post(payload):
+        resp = group_commit_app.test_client().post("/api/authors/", json=payload)
+        return resp.status_code
+
+    payloads = [{"name": f"Author {i}", "email": f"group{i}@example.com"} for i in range(8)]
+    payloads.append({"name": "Twin", "email": "group0@example.com"})
+    with ThreadPoolExecutor(max_workers=len(payloads)) as pool:
+        statuses = list(pool.map(post, payloads))
+
+    assert sorted(statuses) == [201] * 8 + [409]
+    assert len(commits) < 8
+
+    client = group_commit_app.test_client()
+    author_id = client.get("/api/authors/?limit=1").get_json()[0]["id"]
+
+    def post_paper(i):
+        resp = client.post("/api/papers/", json={
+            "title": f"Grouped {i}", "abstract": "A", "doi": f"10.1/group.{i}",
+            # The last one refers to an author that does not exist
+            "author_id": author_id if i < 4 else 999999,
+        })
+        return resp.status_code
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        assert list(pool.map(post_paper, range(5))) == [201, 201, 201, 201, 404]
+
+
+def test_unit_of_work_commits_once_and_keeps_instances_loaded(group_commit_app):
+    with group_commit_app.app_context():
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        repository = AuthorRepository()
+        with unit_of_work():
+            first = repository.create(name="First", email="uow1@example.com")
+            second = repository.create(name="Second", email="uow2@example.com")
+            repository.update(first, bio="Updated")
+        # Nothing is read back, neither by the commit nor on attribute access
+        assert not any(s.lstrip().upper().startswith("SELECT") for s in statements)
+        assert first.id and (first.bio, second.name) == ("Updated", "Second")
+        assert not any(s.lstrip().upper().startswith("SELECT") for s in statements)
+
+        with pytest.raises(RuntimeError):
+            with unit_of_work():
+                repository.create(name="Rolled back", email="uow3@example.com")
+                raise RuntimeError("abort")
+        assert repository.get_by_email("uow3@example.com") is None
+        db.session.remove()
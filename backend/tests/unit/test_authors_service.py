@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import Mock
 from app.modules.authors.service import AuthorService
 from app.modules.authors.schemas import AuthorCreateDTO, AuthorResponseDTO
+from app.common.error_handler import AppError
 
 
 @pytest.fixture
@@ -11,12 +12,11 @@ def mock_repo():
 
 def test_create_author_success(mock_repo):
     # Setup mock
-    mock_repo.get_by_email.return_value = None
     author = Mock(
         id=1, bio="Researcher", email="john@example.com"
     )
     author.name = "John Doe"
-    mock_repo.create.return_value = author
+    mock_repo.get_or_create.return_value = (author, True)
 
     service = AuthorService(repository=mock_repo)
     dto = AuthorCreateDTO(name="John Doe", bio="Researcher", email="john@example.com")
@@ -26,4 +26,17 @@ def test_create_author_success(mock_repo):
     # Assert
     assert result.id == 1
     assert result.email == "john@example.com"
-    mock_repo.create.assert_called_once()
+    mock_repo.get_or_create.assert_called_once()
+
+
+def test_create_author_duplicate_email(mock_repo):
+    author = Mock(id=1, bio=None, email="john@example.com")
+    author.name = "John Doe"
+    mock_repo.get_or_create.return_value = (author, False)
+
+    service = AuthorService(repository=mock_repo)
+    dto = AuthorCreateDTO(name="John Doe", email="john@example.com")
+
+    with pytest.raises(AppError) as exc:
+        service.create_author(dto)
+    assert exc.value.status_code == 409
@@ -0,0 +1,37 @@
+import pytest
+
+from app.common.bloom import ScalableBloomFilter
+
+
+def test_no_false_negatives_and_bounded_error_rate():
+    bloom = ScalableBloomFilter(initial_capacity=1000, error_rate=0.01)
+    dois = [f"10.1000/{i}" for i in range(20000)]
+    bloom.add_many(dois[:15000])
+    bloom.add_many(dois[10000:])
+    for doi in dois[:50]:
+        bloom.add(doi)
+
+    # Grown past the first filter without losing anything or counting repeats
+    assert len(bloom.filters) > 1 and len(bloom) <= 20000
+    assert bloom.contains_many(dois).all()
+    assert "10.1000/0" in bloom and "10.1000/nope" not in bloom
+
+    others = [f"10.2000/{i}" for i in range(50000)]
+    assert bloom.contains_many(others).mean() < 0.015
+    assert bloom.estimated_error_rate() <= 0.01
+
+
+def test_save_and_load(tmp_path):
+    bloom = ScalableBloomFilter(initial_capacity=100)
+    bloom.add_many(f"10.1000/{i}" for i in range(300))
+    path = str(tmp_path / "dois.bloom")
+    bloom.save(path, position=[0, 42])
+
+    loaded, meta = ScalableBloomFilter.load(path)
+    assert meta == {"position": [0, 42]}
+    assert loaded.contains_many([f"10.1000/{i}" for i in range(300)]).all()
+    assert len(loaded) == len(bloom) and loaded.estimated_error_rate() == bloom.estimated_error_rate()
+
+    (tmp_path / "other").write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        ScalableBloomFilter.load(str(tmp_path / "other"))
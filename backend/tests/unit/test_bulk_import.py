@@ -0,0 +1,39 @@
+from unittest.mock import Mock
+
+from app.common.bulk_import import Checkpoint, chunks, run_import, synthetic_papers, validate_chunk
+from app.modules.papers.schemas import PaperCreateDTO
+
+
+def test_validate_chunk_drops_only_bad_records():
+    chunk = [
+        {"title": "Good", "doi": "10.1/good", "author_id": 1},
+        {"title": "", "doi": "10.1/empty-title", "author_id": 1},
+        "not a record",
+    ]
+
+    rows, rejected = validate_chunk(chunk, PaperCreateDTO)
+
+    assert rejected == 2
+    assert [row["doi"] for row in rows] == ["10.1/good"]
+
+
+def test_run_import_resumes_from_checkpoint(tmp_path):
+    records = list(synthetic_papers(0, 10, author_ids=[1, 2, 3]))
+    repo = Mock()
+    repo.bulk_load.side_effect = lambda rows, conflict_column: len(rows)
+    checkpoint = Checkpoint(str(tmp_path / "import.ckpt"))
+
+    run_import(records[:6], PaperCreateDTO, repo, "doi", checkpoint, "papers", chunk_size=4)
+    assert Checkpoint(checkpoint.path).position("papers") == 6
+
+    resumed = Checkpoint(checkpoint.path)
+    progress = run_import(
+        records[resumed.position("papers"):], PaperCreateDTO, repo, "doi", resumed, "papers", chunk_size=4
+    )
+    assert progress.written == 4
+    assert resumed.position("papers") == 10
+    assert repo.bulk_load.call_count == 3
+
+
+def test_chunks_are_bounded():
+    assert [len(c) for c in chunks(range(10), 4)] == [4, 4, 2]
@@ -0,0 +1,51 @@
+import time
+
+from app.common.cache import CachedResponse, MemoryCacheBackend, ResponseCache
+
+
+def _entry(body=b"[]"):
+    return CachedResponse(body=body, mimetype="application/json", headers={"X-Next-Cursor": "abc"})
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_entries=2)
+    backend.set("a", _entry(b"a"), ttl=60)
+    backend.set("b", _entry(b"b"), ttl=60)
+    assert backend.get("a").body == b"a"
+    backend.set("c", _entry(b"c"), ttl=60)
+
+    assert backend.get("b") is None
+    assert backend.get("a").body == b"a"
+    assert len(backend) == 2
+
+
+def test_memory_backend_expires_entries():
+    backend = MemoryCacheBackend()
+    backend.set("a", _entry(), ttl=0.01)
+    time.sleep(0.02)
+    assert backend.get("a") is None
+
+
+def test_invalidation_scopes():
+    cache = ResponseCache()
+    cache.backend = MemoryCacheBackend()
+    cache.set(cache.key("papers", id=1), _entry(b"1"))
+    cache.set(cache.key("papers", query="limit=10"), _entry())
+    cache.set(cache.key("authors", id=1, query="include=papers", depends_on=["papers"]), _entry())
+    cache.set(cache.key("authors", id=1), _entry())
+
+    cache.invalidate("papers", inserted=True)
+    assert cache.get(cache.key("papers", query="limit=10")) is None
+    assert cache.get(cache.key("papers", id=1)) is not None
+    assert cache.get(cache.key("authors", id=1, query="include=papers", depends_on=["papers"])) is None
+    assert cache.get(cache.key("authors", id=1)) is not None
+
+    cache.invalidate("papers")
+    assert cache.get(cache.key("papers", id=1)) is None
+
+
+def test_cached_response_round_trips_and_has_stable_etag():
+    entry = _entry(b'{"id": 1}')
+    restored = CachedResponse.from_bytes(entry.to_bytes())
+    assert restored == entry
+    assert restored.etag == _entry(b'{"id": 1}').etag != _entry(b'{"id": 2}').etag
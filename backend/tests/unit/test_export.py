@@ -0,0 +1,30 @@
+import csv
+import io
+import json
+from collections import namedtuple
+
+from app.common.export import encode_csv, encode_ndjson
+from app.modules.authors.schemas import AuthorResponseDTO
+
+AuthorRow = namedtuple("AuthorRow", ["name", "bio", "email", "id"])
+
+
+def _batches():
+    yield [AuthorRow("Ada", None, "ada@example.com", 1), AuthorRow("Bo, Jr.", "Line\nbreak", "bo@example.com", 2)]
+    yield [AuthorRow("Cy", "", "cy@example.com", 3)]
+
+
+def test_ndjson_emits_one_chunk_per_batch():
+    chunks = list(encode_ndjson(_batches(), AuthorResponseDTO))
+    assert len(chunks) == 2
+    records = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+    assert records[0] == {"name": "Ada", "bio": None, "email": "ada@example.com", "id": 1}
+    assert records[1]["bio"] == "Line\nbreak"
+
+
+def test_csv_writes_header_once_and_quotes_values():
+    data = b"".join(encode_csv(_batches(), AuthorResponseDTO)).decode()
+    rows = list(csv.reader(io.StringIO(data)))
+    assert rows[0] == ["name", "bio", "email", "id"]
+    assert rows[2] == ["Bo, Jr.", "Line\nbreak", "bo@example.com", "2"]
+    assert len(rows) == 4
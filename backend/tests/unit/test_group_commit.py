@@ -0,0 +1,47 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.common.group_commit import GroupCommit
+
+
+def test_concurrent_items_are_written_together_with_their_own_results():
+    committer = GroupCommit(window_seconds=0.2, max_batch=100)
+    groups = []
+    lock = threading.Lock()
+
+    def write(items):
+        with lock:
+            groups.append(list(items))
+        return [ValueError(item) if item < 0 else item * 10 for item in items]
+
+    def submit(item):
+        try:
+            return committer.submit("papers", item, write)
+        except ValueError as e:
+            return f"error {e}"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(submit, [1, 2, -3, 4, 5, 6, 7, 8]))
+
+    assert results == [10, 20, "error -3", 40, 50, 60, 70, 80]
+    assert sorted(item for group in groups for item in group) == [-3, 1, 2, 4, 5, 6, 7, 8]
+    assert len(groups) < 8
+
+
+def test_full_groups_are_written_without_waiting_out_the_window():
+    committer = GroupCommit(window_seconds=30.0, max_batch=2)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(committer.submit, "authors", i, lambda items: items) for i in range(2)]
+        assert sorted(f.result(timeout=5) for f in futures) == [0, 1]
+
+
+def test_a_failed_write_fails_every_caller():
+    committer = GroupCommit(window_seconds=0.01)
+
+    def write(items):
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        committer.submit("papers", 1, write)
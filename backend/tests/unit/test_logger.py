@@ -0,0 +1,78 @@
+import json
+import logging
+import queue
+
+from flask import Flask
+
+from app.common import logger
+from app.common.logger import DroppingQueueHandler, JsonFormatter, restart_logging_after_fork, setup_logging
+from app.common.logging_middleware import parse_sample_rates, should_log
+
+
+def _record(msg="hello %s", args=("world",), exc_info=None, **extra):
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 10, msg, args, exc_info)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_keeps_extras_and_drops_record_internals():
+    output = json.loads(JsonFormatter().format(_record(request_id="abc", status_code=200)))
+    assert output["message"] == "hello world"
+    assert output["request_id"] == "abc" and output["status_code"] == 200
+    assert "args" not in output and "msecs" not in output and "thread" not in output
+    assert output["timestamp"].endswith("+00:00")
+
+
+def test_queue_handler_renders_exceptions_and_never_blocks():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        import sys
+        handler.handle(_record(exc_info=sys.exc_info()))
+    handler.handle(_record())
+    assert handler.dropped == 1
+
+    queued = handler.queue.get_nowait()
+    output = json.loads(JsonFormatter().format(queued))
+    assert "ValueError: boom" in output["exception"]
+    assert output["message"] == "hello world"
+
+    handler.handle(_record())
+    assert handler.queue.get_nowait().dropped_records == 1
+
+
+def test_queue_handler_keeps_counting_drops_while_the_queue_stays_full():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    for _ in range(10):
+        handler.handle(_record())
+    assert handler.dropped == 9
+
+    handler.queue.get_nowait()
+    handler.handle(_record())
+    assert handler.queue.get_nowait().dropped_records == 9
+    assert handler.dropped == 0
+
+
+def test_access_log_sampling():
+    rates = parse_sample_rates("papers.get_paper=0, authors.get_authors = 0.5")
+    assert rates == {"papers.get_paper": 0.0, "authors.get_authors": 0.5}
+    assert not should_log("papers.get_paper", 200, 5.0, rates, 1.0, 1000.0)
+    assert should_log("papers.get_paper", 404, 5.0, rates, 1.0, 1000.0)
+    assert should_log("papers.get_paper", 200, 1500.0, rates, 1.0, 1000.0)
+    assert should_log("papers.get_papers", 200, 5.0, rates, 1.0, 1000.0)
+
+
+def test_restart_after_fork_gives_handler_a_new_queue_and_listener(capsys):
+    setup_logging(Flask(__name__))
+    old_queue, old_listener = logger._queue_handler.queue, logger._listener
+
+    restart_logging_after_fork()
+    assert logger._queue_handler.queue is not old_queue
+    assert logger._listener is not old_listener
+    assert logger._listener.handlers == old_listener.handlers
+
+    logging.getLogger("worker.test").warning("after fork")
+    logger._stop_listener()
+    old_listener.stop()
+    assert "after fork" in capsys.readouterr().out
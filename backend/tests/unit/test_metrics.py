@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import uuid
+
+from app.common.metrics import ARCHIVE_FILE, Registry, SnapshotWriter, merge_snapshots
+
+
+def _registry():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests.", ("endpoint", "status"))
+    latency = registry.histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    return registry, requests, latency
+
+
+def test_render_counters_and_cumulative_histogram_buckets():
+    registry, requests, latency = _registry()
+    requests.inc("papers.get_paper", "200")
+    requests.inc("papers.get_paper", "200")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, 'quote"d')
+
+    text = registry.render(registry.snapshot())
+    assert 'requests_total{endpoint="papers.get_paper",status="200"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="quote\\"d",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{endpoint="quote\\"d",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{endpoint="quote\\"d",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{endpoint="quote\\"d"} 4' in text
+    assert 'latency_seconds_sum{endpoint="quote\\"d"} 3.65' in text
+
+
+def test_merge_sums_processes_and_ignores_stale_gauges():
+    registry, requests, latency = _registry()
+    requests.inc("a", "200")
+    latency.observe(0.5, "a")
+    registry.gauge("pool_checked_out", "Pool.", lambda: 2)
+    first = registry.snapshot()
+    stale = dict(first, written_at=first["written_at"] - 60)
+
+    merged = merge_snapshots([first, stale], gauge_max_age=15)
+    text = registry.render(merged)
+    assert 'requests_total{endpoint="a",status="200"} 2' in text
+    assert 'latency_seconds_count{endpoint="a"} 2' in text
+    assert "pool_checked_out 2" in text
+
+
+def test_exited_workers_are_archived_and_reused_pids_keep_their_counts(tmp_path):
+    registry, requests, _ = _registry()
+    requests.inc("a", "200")
+    snapshot = registry.snapshot()
+    exited_pid = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True).stdout
+    # An exited worker, and an earlier start of a worker whose pid is now reused by this process
+    for pid in (int(exited_pid), os.getpid()):
+        (tmp_path / f"metrics-{pid}-{uuid.uuid4().hex}.json").write_text(json.dumps(snapshot))
+
+    writer = SnapshotWriter(str(tmp_path), interval=5.0)
+    writer.maybe_write(force=True)
+    text = registry.render(merge_snapshots(writer.read_all()))
+    assert 'requests_total{endpoint="a",status="200"} 2' in text
+    assert sorted(os.listdir(tmp_path)) == sorted([ARCHIVE_FILE, ".metrics.lock", os.path.basename(writer.path)])
+
+    # Folding again counts nothing twice
+    assert registry.render(merge_snapshots(writer.read_all())) == text
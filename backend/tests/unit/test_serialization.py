@@ -0,0 +1,39 @@
+import json
+from collections import namedtuple
+
+import pytest
+from flask import Flask
+from pydantic import ValidationError
+
+from app.common.serialization import dump_json
+from app.modules.papers.schemas import PaperResponseDTO
+
+PaperRow = namedtuple("PaperRow", ["title", "abstract", "doi", "author_id", "id"])
+
+
+def _rows():
+    return [
+        PaperRow("Graphs", None, "10.1/a", 1, 2),
+        PaperRow("Ünïcode \"quoted\"", "Some abstract", "10.1/b", 1, 1),
+    ]
+
+
+def test_rows_match_dto_serialization():
+    expected = [PaperResponseDTO.model_validate(row._asdict()).model_dump() for row in _rows()]
+
+    assert json.loads(dump_json(_rows(), PaperResponseDTO)) == expected
+    assert json.loads(dump_json([PaperResponseDTO(**r) for r in expected], PaperResponseDTO)) == expected
+    assert dump_json([], PaperResponseDTO) == b"[]"
+
+
+def test_strict_mode_validates_rows():
+    app = Flask(__name__)
+    app.config["SERIALIZATION_STRICT"] = True
+    bad = [PaperRow("", None, "10.1/c", 1, 3)]
+
+    # The fast path trusts the row; strict mode rejects the empty title
+    assert json.loads(dump_json(bad, PaperResponseDTO))[0]["title"] == ""
+    with app.app_context():
+        assert json.loads(dump_json(_rows(), PaperResponseDTO))[0]["doi"] == "10.1/a"
+        with pytest.raises(ValidationError):
+            dump_json(bad, PaperResponseDTO)
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, insert, select
+
+from app.common.snapshot import RelationSpec, Snapshot, TableSpec, write_snapshot
+
+metadata = MetaData()
+shelves = Table("shelves", metadata, Column("id", Integer, primary_key=True), Column("label", String, nullable=False))
+books = Table(
+    "books",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("isbn", String, nullable=False, unique=True),
+    Column("note", String, nullable=True),
+    Column("shelf_id", Integer, nullable=False),
+)
+
+
+def _rows(engine, table):
+    with engine.connect() as conn:
+        return [conn.execute(select(table).order_by(table.c.id)).all()]
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    engine = create_engine("sqlite://")
+    metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(shelves), [{"id": 1, "label": "empty"}, {"id": 2, "label": "full"}])
+        conn.execute(insert(books), [
+            {"id": i * 3, "isbn": f"isbn-{i}", "note": None if i % 2 else f"note ✓ {i}", "shelf_id": 2}
+            for i in range(1, 2001)
+        ])
+    path = tmp_path / "test.snapshot"
+    write_snapshot(
+        str(path),
+        [
+            (TableSpec("shelves", list(shelves.c)), _rows(engine, shelves)),
+            (TableSpec("books", list(books.c), key="isbn"), _rows(engine, books)),
+        ],
+        relations=[RelationSpec("shelves", "books", "shelf_id", attribute="books", counts="book_counts")],
+    )
+    return Snapshot(str(path))
+
+
+def test_key_index_finds_every_row(snapshot):
+    books = snapshot.tables["books"]
+    for i in range(1, 2001):
+        assert books.get_by_isbn(f"isbn-{i}").id == i * 3
+    assert books.get_by_isbn("isbn-0") is None
+    assert set(books.get_by_isbns(["isbn-7", "nope"])) == {"isbn-7"}
+
+
+def test_columns_nulls_and_relations(snapshot):
+    books = snapshot.tables["books"]
+    assert books.get_by_id(6).note == "note ✓ 2"
+    assert books.get_by_id(3).note is None
+    assert books.get_by_id(4) is None
+
+    shelves = snapshot.tables["shelves"]
+    assert shelves.get_by_id(1).books == []
+    assert [book.id for book in shelves.get_by_id(2).books[:3]] == [3, 6, 9]
+    assert shelves.book_counts([1, 2, 99]) == {2: 2000}
+
+
+def test_keyset_pages_walk_ids_downwards(snapshot):
+    table = snapshot.tables["books"]
+    records, next_id = table.get_page(limit=2)
+    assert [record.id for record in records] == [6000, 5997]
+    rows, next_id = table.get_page_rows([books.c.id, books.c.isbn], limit=2, after=next_id)
+    assert [row._asdict() for row in rows] == [{"id": 5994, "isbn": "isbn-1998"}, {"id": 5991, "isbn": "isbn-1997"}]
+    records, next_id = table.get_page(limit=5, after=9)
+    assert [record.id for record in records] == [6, 3] and next_id is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.snapshot"
+    path.write_bytes(b"x" * 64)
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
@@ -0,0 +1,56 @@
+from app.common.text_index import InvertedIndex, parse_query
+
+
+def _index():
+    index = InvertedIndex()
+    index.add(1, "Graph neural networks for molecular property prediction")
+    index.add(2, "Neural machine translation with attention")
+    index.add(3, "Graph algorithms: shortest paths in sparse graph structures")
+    index.add(4, "Medieval trade routes across the Alps")
+    return index
+
+
+def test_parse_query_splits_terms_and_phrases():
+    terms, phrases = parse_query('the graph "Neural Networks" of molecules')
+    assert terms == ["graph", "molecules"]
+    assert phrases == [["neural", "networks"]]
+
+
+def test_bm25_ranks_by_term_frequency_and_rarity():
+    hits = _index().search(["graph"], k=10)
+    assert [id for id, _ in hits] == [3, 1]
+    assert hits[0][1] > hits[1][1]
+
+    hits = _index().search(["graph", "neural"], k=1)
+    assert hits[0][0] == 1
+
+
+def test_required_terms_and_phrases():
+    index = _index()
+    assert [id for id, _ in index.search(["graph"], k=10, required={"neural"})] == [1, 2]
+    assert index.search(["graph"], k=10, required={"unknown"}) == []
+
+    index.add(5, "Networks of neural cells")
+    phrase = ["neural", "networks"]
+    assert [id for id, _ in index.search([], k=10, required=phrase, phrases=[phrase])] == [1]
+    # Stopwords are not indexed, so they do not break adjacency
+    assert [id for id, _ in index.search([], k=10, required={"shortest", "paths"}, phrases=[["paths", "sparse"]])] == [3]
+    index.add(6, "Graph graph graph")
+    assert [id for id, _ in index.search([], k=10, required={"graph"}, phrases=[["graph", "graph", "graph"]])] == [6]
+
+
+def test_replace_remove_and_compact():
+    index = _index()
+    index.add(2, "Graph transformers")
+    index.remove(4)
+    assert len(index) == 3
+    assert index.tombstones == 2
+    assert index.search(["medieval"], k=10) == []
+
+    before = index.search(["graph"], k=10)
+    phrase = ["graph", "transformers"]
+    index.compact()
+    assert index.tombstones == 0
+    assert index.search(["graph"], k=10) == before
+    assert [id for id, _ in index.search([], k=10, required=phrase, phrases=[phrase])] == [2]
+    assert index.search(["translation"], k=10) == []
@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.common.vector_index import ExactVectorIndex, IVFVectorIndex, normalize
+
+
+def _clustered(n, dim=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    return normalize(centers[rng.integers(0, clusters, n)] + 0.1 * rng.normal(size=(n, dim)))
+
+
+def test_exact_index_matches_brute_force():
+    vectors = _clustered(2000)
+    index = ExactVectorIndex(32, initial_capacity=8)
+    index.add(list(range(100, 2100)), vectors)
+
+    ids, scores = index.search(vectors[:5], k=10)
+
+    expected = np.argsort(-(vectors[:5] @ vectors.T), axis=1)[:, :10] + 100
+    assert np.array_equal(np.sort(ids, axis=1), np.sort(expected, axis=1))
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)
+    assert ids[0, 0] == 100
+
+
+def test_exact_index_replace_and_remove():
+    vectors = _clustered(10)
+    index = ExactVectorIndex(32)
+    index.add(list(range(10)), vectors)
+    index.remove([0, 5])
+    index.add([3], vectors[7])
+
+    assert len(index) == 8
+    ids, _ = index.search(vectors[0], k=10)
+    assert 0 not in ids and 5 not in ids
+
+
+def test_ivf_index_recall():
+    vectors = _clustered(5000)
+    exact = ExactVectorIndex(32)
+    ivf = IVFVectorIndex(32, nlist=32, nprobe=8)
+    exact.add(list(range(5000)), vectors)
+    ivf.add(list(range(5000)), vectors)
+    ivf.train()
+
+    queries = vectors[:50]
+    truth, _ = exact.search(queries, k=10)
+    found, _ = ivf.search(queries, k=10)
+
+    recall = np.mean([len(set(t) & set(f)) / 10 for t, f in zip(truth, found)])
+    assert ivf.is_trained and len(ivf) == 5000
+    assert recall >= 0.9
@@ -22,7 +22,7 @@ const AuthorListSchema = z.array(AuthorResponseSchema);
 export const useAuthors = () => {
   return useQuery({
     queryKey: authorKeys.all,
-    queryFn: () => fetchTyped("/authors/", AuthorListSchema),
+    queryFn: () => fetchTyped("/authors/?fields=name,bio,email", AuthorListSchema),
   });
 };
 
@@ -21,7 +21,7 @@ const PaperListSchema = z.array(PaperResponseSchema);
 export const usePapers = () => {
   return useQuery({
     queryKey: paperKeys.all,
-    queryFn: () => fetchTyped("/papers/", PaperListSchema),
+    queryFn: () => fetchTyped("/papers/?fields=title,abstract,doi,author_id", PaperListSchema),
   });
 };
 